@@ -0,0 +1,54 @@
+"""Add materialized absolute times to transcriptions
+
+Revision ID: 3f9c2b7d41e6
+Revises: 5befe308fa8b
+Create Date: 2026-10-18 10:12:41.512734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2b7d41e6'
+down_revision = '5befe308fa8b'
+branch_labels = None
+depends_on = None
+
+
+# Rows backfilled per UPDATE, each committed on its own to keep locks and WAL bursts short
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    op.add_column('transcriptions', sa.Column('absolute_start_time', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('transcriptions', sa.Column('absolute_end_time', sa.DateTime(timezone=True), nullable=True))
+
+    # The backfill and the index build run outside the migration transaction, so the table is not
+    # locked for their whole duration. Both can be re-run after an interruption.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        min_id, max_id = bind.execute(sa.text("SELECT min(id), max(id) FROM transcriptions")).one()
+        if min_id is not None:
+            # Backfill from the session start times by id range; rows without a known session stay NULL
+            for batch_start in range(min_id, max_id + 1, BACKFILL_BATCH_SIZE):
+                bind.execute(sa.text("""
+                    UPDATE transcriptions AS t
+                    SET absolute_start_time = s.session_start_time + t.start_time * interval '1 second',
+                        absolute_end_time = s.session_start_time + t.end_time * interval '1 second'
+                    FROM meeting_sessions AS s
+                    WHERE t.id >= :batch_start AND t.id < :batch_end
+                      AND t.absolute_start_time IS NULL
+                      AND s.meeting_id = t.meeting_id AND s.session_uid = t.session_uid
+                """), {"batch_start": batch_start, "batch_end": batch_start + BACKFILL_BATCH_SIZE})
+        op.create_index(
+            'ix_transcription_meeting_absolute_start', 'transcriptions', ['meeting_id', 'absolute_start_time'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_transcription_meeting_absolute_start', table_name='transcriptions', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('transcriptions', 'absolute_end_time')
+    op.drop_column('transcriptions', 'absolute_start_time')
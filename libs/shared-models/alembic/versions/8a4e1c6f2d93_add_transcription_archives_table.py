@@ -0,0 +1,38 @@
+"""Add transcription_archives table
+
+Revision ID: 8a4e1c6f2d93
+Revises: 3f9c2b7d41e6
+Create Date: 2026-10-18 14:37:05.208311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e1c6f2d93'
+down_revision = '3f9c2b7d41e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'transcription_archives',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('meeting_id', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(length=50), nullable=False),
+        sa.Column('segment_count', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['meeting_id'], ['meetings.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_transcription_archives_id'), 'transcription_archives', ['id'], unique=False)
+    op.create_index(op.f('ix_transcription_archives_meeting_id'), 'transcription_archives', ['meeting_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_transcription_archives_meeting_id'), table_name='transcription_archives')
+    op.drop_index(op.f('ix_transcription_archives_id'), table_name='transcription_archives')
+    op.drop_table('transcription_archives')
@@ -1,5 +1,5 @@
 import sqlalchemy
-from sqlalchemy import (Column, String, Text, Integer, DateTime, Float, ForeignKey, Index, UniqueConstraint)
+from sqlalchemy import (Column, String, Text, Integer, DateTime, Float, ForeignKey, Index, UniqueConstraint, LargeBinary)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func, text
 from sqlalchemy.orm import declarative_base, relationship
@@ -96,9 +96,26 @@ class Transcription(Base):
     meeting = relationship("Meeting", back_populates="transcriptions")
     
     session_uid = Column(String, nullable=True, index=True) # Link to the specific bot session
+    # Session start + relative times, resolved by the collector when the segment is written
+    absolute_start_time = Column(sqlalchemy.DateTime(timezone=True), nullable=True)
+    absolute_end_time = Column(sqlalchemy.DateTime(timezone=True), nullable=True)
 
     # Index for efficient querying by meeting_id and start_time
-    __table_args__ = (Index('ix_transcription_meeting_start', 'meeting_id', 'start_time'),)
+    __table_args__ = (
+        Index('ix_transcription_meeting_start', 'meeting_id', 'start_time'),
+        # Ordered transcript reads
+        Index('ix_transcription_meeting_absolute_start', 'meeting_id', 'absolute_start_time'),
+    )
+
+# Cold storage of a finished meeting's segments, moved out of transcriptions
+class TranscriptionArchive(Base):
+    __tablename__ = "transcription_archives"
+    id = Column(Integer, primary_key=True, index=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), nullable=False, unique=True, index=True)
+    format = Column(String(50), nullable=False) # Blob encoding, see shared_models.transcript_archive
+    segment_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 # New table to store session start times
 class MeetingSession(Base):
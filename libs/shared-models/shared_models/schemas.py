@@ -266,6 +266,9 @@ class TranscriptionResponse(BaseModel): # Doesn't inherit MeetingResponse to avo
     end_time: Optional[datetime]
     # ---
     segments: List[TranscriptionSegment] = Field(..., description="List of transcript segments")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor to pass as 'cursor' for the next page; None on the last page")
+    change_cursor: Optional[str] = Field(None, description="Pass as 'since' to get only the segments created or changed after this response")
+    removed_start_times: Optional[List[float]] = Field(None, description="With 'since': start times of segments dropped from the transcript after that cursor (e.g. filtered out as noise); remove them")
 
     class Config:
         orm_mode = True # Allows creation from ORM models (e.g., joined query result)
@@ -0,0 +1,57 @@
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+# Value of TranscriptionArchive.format for blobs written by encode_segments
+ARCHIVE_FORMAT = "zlib-json-columns-v1"
+
+# Transcription columns kept in an archive, in blob column order
+_TEXT_COLUMNS = ("text", "speaker", "language", "session_uid")
+_FLOAT_COLUMNS = ("start_time", "end_time")
+_TIME_COLUMNS = ("absolute_start_time", "absolute_end_time", "created_at")
+# Stored as naive UTC in the transcriptions table, and returned the same way
+_NAIVE_TIME_COLUMNS = ("created_at",)
+
+
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _from_epoch(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+
+def encode_segments(rows: Iterable[Any]) -> bytes:
+    """Packs Transcription rows (or objects with the same attributes) into one compressed blob.
+
+    The segments are stored column by column, which keeps similar values (speaker names,
+    languages, session UIDs, increasing times) next to each other and compresses far better
+    than row-wise JSON.
+    """
+    columns: Dict[str, List[Any]] = {name: [] for name in _FLOAT_COLUMNS + _TEXT_COLUMNS + _TIME_COLUMNS}
+    for row in rows:
+        for name in _FLOAT_COLUMNS + _TEXT_COLUMNS:
+            columns[name].append(getattr(row, name))
+        for name in _TIME_COLUMNS:
+            columns[name].append(_to_epoch(getattr(row, name)))
+    payload = json.dumps({"format": ARCHIVE_FORMAT, "columns": columns}, separators=(",", ":"))
+    return zlib.compress(payload.encode("utf-8"), 9)
+
+
+def decode_segments(blob: bytes) -> List[Dict[str, Any]]:
+    """Unpacks a blob written by encode_segments into one dict per segment, keyed by Transcription column name."""
+    payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+    if payload.get("format") != ARCHIVE_FORMAT:
+        raise ValueError(f"Unsupported transcript archive format: {payload.get('format')!r}")
+    columns = payload["columns"]
+    for name in _TIME_COLUMNS:
+        columns[name] = [_from_epoch(value) for value in columns[name]]
+    for name in _NAIVE_TIME_COLUMNS:
+        columns[name] = [value.replace(tzinfo=None) if value else None for value in columns[name]]
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*(columns[name] for name in names))]
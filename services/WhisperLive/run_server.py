@@ -43,6 +43,8 @@ if __name__ == "__main__":
 
     # Minimum audio for transcription
     parser.add_argument('--min_audio_s', type=float, default=settings.MIN_AUDIO_S)
+    parser.add_argument('--max_audio_wait_s', type=float, default=settings.MAX_AUDIO_WAIT_S)
+    parser.add_argument('--min_new_audio_s', type=float, default=settings.MIN_NEW_AUDIO_S)
 
     # VAD settings
     parser.add_argument('--vad_onset', type=float, default=settings.VAD_ONSET)
@@ -53,6 +55,21 @@ if __name__ == "__main__":
     parser.add_argument('--show_prev_out_thresh_s', type=float, default=settings.SHOW_PREV_OUT_THRESH_S)
     parser.add_argument('--add_pause_thresh_s', type=float, default=settings.ADD_PAUSE_THRESH_S)
 
+    # Cross-client batched inference (faster_whisper, single model only)
+    parser.add_argument('--batch_inference', action='store_true', default=settings.BATCH_INFERENCE,
+                        help='Decode the pending audio of all connected clients together in batches.')
+    parser.add_argument('--batch_max_size', type=int, default=settings.BATCH_MAX_SIZE)
+    parser.add_argument('--batch_max_wait_ms', type=float, default=settings.BATCH_MAX_WAIT_MS)
+
+    # Model pool (faster_whisper, single model only)
+    parser.add_argument('--model_pool_size', type=int, default=settings.MODEL_POOL_SIZE,
+                        help='Number of warm models shared by all connections, transcriptions go to the least loaded one.')
+
+    # asyncio server mode
+    parser.add_argument('--async_server', action='store_true', default=settings.ASYNC_SERVER,
+                        help='Serve all connections from one asyncio event loop with a bounded pool of transcription workers.')
+    parser.add_argument('--async_workers', type=int, default=settings.ASYNC_WORKERS)
+
     args = parser.parse_args()
 
     if args.backend == "tensorrt":
@@ -78,10 +95,18 @@ if __name__ == "__main__":
             "clip_if_no_segment_s": args.clip_if_no_segment_s,
             "clip_retain_s": args.clip_retain_s,
             "min_audio_s": args.min_audio_s,
+            "max_audio_wait_s": args.max_audio_wait_s,
+            "min_new_audio_s": args.min_new_audio_s,
             "vad_onset": args.vad_onset,
             "vad_no_speech_thresh": args.vad_no_speech_thresh,
             "same_output_threshold": args.same_output_threshold,
             "show_prev_out_thresh_s": args.show_prev_out_thresh_s,
             "add_pause_thresh_s": args.add_pause_thresh_s,
+            "batch_inference": args.batch_inference,
+            "batch_max_size": args.batch_max_size,
+            "batch_max_wait_ms": args.batch_max_wait_ms,
+            "model_pool_size": args.model_pool_size,
+            "async_server": args.async_server,
+            "async_workers": args.async_workers,
         }
     )
@@ -1,15 +1,19 @@
+import asyncio
 import subprocess
+import threading
 import time
 import json
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import numpy as np
 import jiwer
 
 from websockets.exceptions import ConnectionClosed
-from whisper_live.server import TranscriptionServer, BackendType, ClientManager
+from whisper_live.server import TranscriptionServer, BackendType, ClientManager, AudioRingBuffer, AsyncWebSocketAdapter, ModelPool, ServerMetrics, ServeClientBase, ServeClientFasterWhisper, BatchInferenceScheduler
 from whisper_live.client import Client, TranscriptionClient, TranscriptionTeeClient
+from whisper_live.transcriber import BatchedInferencePipeline, TranscriptionOptions
 from whisper.normalizers import EnglishTextNormalizer
 
 
@@ -39,6 +43,327 @@ class TestGetWaitTime(unittest.TestCase):
         self.assertAlmostEqual(self.server.client_manager.get_wait_time(), expected_wait_time, places=2)
 
 
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_append_and_view(self):
+        buffer = AudioRingBuffer(capacity=10)
+        buffer.append(np.arange(4, dtype=np.float32))
+        buffer.append(np.arange(4, 8, dtype=np.float32))
+        self.assertEqual(len(buffer), 8)
+        np.testing.assert_array_equal(buffer.view(), np.arange(8, dtype=np.float32))
+        np.testing.assert_array_equal(buffer.view(5), np.arange(5, 8, dtype=np.float32))
+
+    def test_wraparound_is_contiguous(self):
+        buffer = AudioRingBuffer(capacity=10)
+        buffer.append(np.arange(8, dtype=np.float32))
+        buffer.discard(6)
+        buffer.append(np.arange(8, 14, dtype=np.float32))
+        view = buffer.view()
+        self.assertTrue(np.shares_memory(view, buffer.storage))
+        np.testing.assert_array_equal(view, np.arange(6, 14, dtype=np.float32))
+
+    def test_overflow_drops_oldest(self):
+        buffer = AudioRingBuffer(capacity=10)
+        buffer.append(np.arange(8, dtype=np.float32))
+        dropped = buffer.append(np.arange(8, 12, dtype=np.float32))
+        self.assertEqual(dropped, 2)
+        np.testing.assert_array_equal(buffer.view(), np.arange(2, 12, dtype=np.float32))
+
+
+class TestAsyncWebSocketAdapter(unittest.TestCase):
+    def test_send_and_close_are_scheduled_on_loop(self):
+        loop = asyncio.new_event_loop()
+        try:
+            websocket = mock.AsyncMock()
+            adapter = AsyncWebSocketAdapter(websocket, loop)
+            adapter.send("hello")
+            adapter.close()
+            loop.run_until_complete(asyncio.sleep(0.01))
+            websocket.send.assert_awaited_once_with("hello")
+            websocket.close.assert_awaited_once()
+        finally:
+            loop.close()
+
+
+class TestModelPool(unittest.TestCase):
+    def test_dispatches_to_least_loaded_model(self):
+        pool = ModelPool(["model_a", "model_b"])
+        with pool.acquire() as first:
+            with pool.acquire() as second:
+                self.assertNotEqual(first, second)
+                self.assertEqual(pool.loads, [1, 1])
+        self.assertEqual(pool.loads, [0, 0])
+
+
+class TestGetDevice(unittest.TestCase):
+    @mock.patch.dict("sys.modules", {"torch": None})
+    def test_falls_back_to_ctranslate2_without_torch(self):
+        with mock.patch("ctranslate2.get_cuda_device_count", return_value=0):
+            self.assertEqual(ServeClientFasterWhisper.get_device(), ("cpu", "default"))
+        with mock.patch("ctranslate2.get_cuda_device_count", return_value=1), \
+                mock.patch("ctranslate2.get_supported_compute_types", return_value={"float32", "float16", "int8"}):
+            self.assertEqual(ServeClientFasterWhisper.get_device(), ("cuda", "float16"))
+
+    def test_uses_torch_when_installed(self):
+        torch = mock.Mock()
+        torch.cuda.is_available.return_value = True
+        torch.cuda.get_device_capability.return_value = (6, 1)
+        with mock.patch.dict("sys.modules", {"torch": torch}):
+            self.assertEqual(ServeClientFasterWhisper.get_device(), ("cuda", "float32"))
+
+
+class TestTranscriptionPassThrottle(unittest.TestCase):
+    def setUp(self):
+        # a faster_whisper client without a model
+        self.client = ServeClientFasterWhisper.__new__(ServeClientFasterWhisper)
+        ServeClientBase.__init__(self.client, mock.Mock(), client_uid="throttle-client", server_options={})
+        self.client.language = "en"
+        self.client.min_audio_s = 1.0
+        self.client.min_new_audio_s = 1.0
+        self.client.last_pass_end = None
+        # the window is decoded but nothing is committed, as for a sentence still being spoken
+        self.client.transcribe_audio = mock.Mock(return_value=["segment"])
+        self.client.handle_transcription_output = mock.Mock()
+
+    def add_audio(self, seconds):
+        self.client.add_frames(np.zeros(int(seconds * self.client.RATE), dtype=np.float32))
+
+    def test_skips_pass_until_enough_new_audio(self):
+        self.add_audio(2.0)
+        self.assertEqual(self.client.transcription_pass(), 0)
+        self.assertEqual(self.client.transcribe_audio.call_count, 1)
+
+        self.add_audio(0.5)
+        # waits until the 2.5s window has grown by the missing 0.5s
+        self.assertAlmostEqual(self.client.transcription_pass(), 3.0)
+        self.assertEqual(self.client.transcribe_audio.call_count, 1)
+
+        self.add_audio(0.5)
+        self.assertEqual(self.client.transcription_pass(), 0)
+        self.assertEqual(self.client.transcribe_audio.call_count, 2)
+        self.assertEqual(self.client.transcribe_audio.call_args[0][0].shape[0], 3 * self.client.RATE)
+
+    def test_zero_disables_throttle(self):
+        self.client.min_new_audio_s = 0
+        self.add_audio(2.0)
+        self.client.transcription_pass()
+        self.add_audio(0.1)
+        self.client.transcription_pass()
+        self.assertEqual(self.client.transcribe_audio.call_count, 2)
+
+
+class FakeSchedulerModel:
+    """Stands in for WhisperModel and BatchedInferencePipeline: an audio window of value v is transcribed to
+    "text-v", and a window of value -1 fails."""
+
+    def __init__(self):
+        self.batches = []
+        self.transcribe_calls = 0
+
+    @staticmethod
+    def decode(audio):
+        if audio[0] == -1:
+            raise RuntimeError("bad window")
+        return [f"text-{int(audio[0])}"]
+
+    def transcribe_batch(self, audios, batch_size, **options):
+        self.batches.append(len(audios))
+        return [(self.decode(audio), "batch-info") for audio in audios]
+
+    def transcribe(self, audio, **options):
+        self.transcribe_calls += 1
+        # faster_whisper returns a lazy generator
+        return iter(self.decode(audio)), "info"
+
+
+class TestBatchInferenceScheduler(unittest.TestCase):
+    def setUp(self):
+        self.model = FakeSchedulerModel()
+        self.scheduler = BatchInferenceScheduler(self.model, max_batch_size=4, max_wait_ms=200)
+        self.scheduler.pipeline = self.model
+        self.addCleanup(self.scheduler.stop)
+
+    def submit_all(self, values, language):
+        with ThreadPoolExecutor(max_workers=len(values)) as executor:
+            futures = [
+                executor.submit(self.scheduler.submit, np.full(16000, value, dtype=np.float32), language=language)
+                for value in values
+            ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except RuntimeError as e:
+                results.append(e)
+        return results
+
+    def test_requests_with_same_options_share_a_model_call(self):
+        results = self.submit_all([1, 2, 3], language="en")
+        self.assertEqual(results, [(["text-1"], "batch-info"), (["text-2"], "batch-info"), (["text-3"], "batch-info")])
+        self.assertEqual(self.model.batches, [3])
+        self.assertEqual(self.model.transcribe_calls, 0)
+
+    def test_failed_batch_only_fails_the_bad_request(self):
+        results = self.submit_all([1, -1, 3], language="en")
+        self.assertEqual(results[0], (["text-1"], "info"))
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2], (["text-3"], "info"))
+        self.assertEqual(self.model.transcribe_calls, 3)
+
+    def test_language_detection_requests_are_decoded_one_by_one(self):
+        results = self.submit_all([-1, 2], language=None)
+        self.assertIsInstance(results[0], RuntimeError)
+        # the segments are decoded on the scheduler thread, not left as a generator
+        self.assertEqual(results[1], (["text-2"], "info"))
+        self.assertEqual(self.model.batches, [])
+
+
+class TestBatchedTemperatureFallback(unittest.TestCase):
+    def make_options(self, **overrides):
+        values = dict(
+            beam_size=5, best_of=5, patience=1, length_penalty=1, repetition_penalty=1, no_repeat_ngram_size=0,
+            log_prob_threshold=-1.0, no_speech_threshold=0.6, compression_ratio_threshold=2.4,
+            condition_on_previous_text=True, prompt_reset_on_temperature=0.5, temperatures=[0.0, 0.2],
+            initial_prompt=None, prefix=None, suppress_blank=True, suppress_tokens=[], without_timestamps=False,
+            max_initial_timestamp=1.0, word_timestamps=False, prepend_punctuations="", append_punctuations="",
+            multilingual=False, max_new_tokens=None, clip_timestamps=[], hallucination_silence_threshold=None,
+            hotwords=None,
+        )
+        values.update(overrides)
+        return TranscriptionOptions(**values)
+
+    def chunk(self, text, avg_logprob=-0.2, no_speech_prob=0.1):
+        return [dict(text=text, avg_logprob=avg_logprob, no_speech_prob=no_speech_prob)]
+
+    def test_same_thresholds_as_sequential_decoding(self):
+        options = self.make_options()
+        needs_fallback = BatchedInferencePipeline._needs_fallback
+        self.assertFalse(needs_fallback(self.chunk("hello there"), options))
+        self.assertTrue(needs_fallback(self.chunk("hello there", avg_logprob=-1.5), options))
+        self.assertTrue(needs_fallback(self.chunk("again " * 50), options))
+        # a low log probability with a high no speech probability is silence, not a failure
+        self.assertFalse(needs_fallback(self.chunk("hello there", avg_logprob=-1.5, no_speech_prob=0.9), options))
+        self.assertFalse(needs_fallback([], options))
+        self.assertFalse(needs_fallback(self.chunk("again " * 50), self.make_options(compression_ratio_threshold=None)))
+
+
+class TestServerMetrics(unittest.TestCase):
+    def test_render_and_remove_client(self):
+        server_metrics = ServerMetrics()
+        server_metrics.add_client("client1")
+        server_metrics.record_transcription("client1", audio_duration=2.0, processing_time=0.5, wait_time=0.1)
+        output = server_metrics.render()
+        self.assertIn("# TYPE whisperlive_audio_transcribed_seconds_total counter", output)
+        self.assertIn('whisperlive_client_realtime_factor{client_uid="client1"} 0.25', output)
+        self.assertIn("whisperlive_model_wait_seconds_total 0.1", output)
+
+        server_metrics.remove_client("client1")
+        output = server_metrics.render()
+        self.assertNotIn("client1", output)
+        self.assertIn("whisperlive_audio_transcribed_seconds_total 2.0", output)
+
+    def test_ignores_records_after_remove_client(self):
+        server_metrics = ServerMetrics()
+        server_metrics.add_client("client1")
+        server_metrics.remove_client("client1")
+        # a transcription still in flight when the client left
+        server_metrics.record_transcription("client1", audio_duration=2.0, processing_time=0.5)
+        server_metrics.set_client("buffer_depth_seconds", "client1", 1.0)
+        output = server_metrics.render()
+        self.assertNotIn("client1", output)
+        self.assertIn("whisperlive_transcribe_calls_total 1.0", output)
+
+    def test_escapes_label_values(self):
+        server_metrics = ServerMetrics()
+        client_uid = 'a"b\\c\nd'
+        server_metrics.add_client(client_uid)
+        server_metrics.inc_client("transcribe_calls_total", client_uid)
+        self.assertIn('whisperlive_client_transcribe_calls_total{client_uid="a\\"b\\\\c\\nd"} 1.0', server_metrics.render())
+
+
+class FakeAsyncWebSocket:
+    """asyncio connection yielding the connection options, then `frames`."""
+
+    def __init__(self, options, frames):
+        self.options = options
+        self.frames = frames
+        self.sent = []
+        self.closed = False
+
+    async def recv(self):
+        return self.options
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+    async def __aiter__(self):
+        for frame in self.frames:
+            yield frame
+            # lets the transcription task run between frames
+            await asyncio.sleep(0.05)
+
+
+class FakeTranscriptionClient(ServeClientBase):
+    """Records the audio each transcription pass sees and the thread it ran on."""
+
+    def __init__(self, websocket, **kwargs):
+        super().__init__(websocket, server_options={"async_server": True, "max_audio_wait_s": 0.1}, **kwargs)
+        self.passes = []
+
+    def transcription_pass(self):
+        with self.lock:
+            self.passes.append((threading.current_thread().name, self.unprocessed_samples()))
+            self.timestamp_offset += self.unprocessed_samples() / self.RATE
+        return 0.5
+
+
+class TestAsyncServer(unittest.TestCase):
+    def setUp(self):
+        self.server = TranscriptionServer()
+        self.server.backend = BackendType.FASTER_WHISPER
+        self.server.client_manager = ClientManager(max_clients=4, max_connection_time=600)
+        self.server.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="transcription")
+        self.collector_client = mock.MagicMock()
+        self.publish_threads = []
+        self.collector_client.publish_speaker_event.side_effect = lambda payload: self.publish_threads.append(threading.current_thread().name) or True
+        self.clients = []
+
+        def initialize_client(websocket, options, *args):
+            client = FakeTranscriptionClient(websocket, client_uid=options["uid"], collector_client_ref=self.collector_client)
+            self.clients.append(client)
+            self.server.client_manager.add_client(websocket, client)
+
+        patcher = mock.patch.object(self.server, "initialize_client", side_effect=initialize_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.server.executor.shutdown)
+
+    def test_drives_client_through_async_server(self):
+        options = json.dumps({"uid": "client1", "platform": "google_meet", "meeting_url": "https://meet.google.com/abc",
+                              "token": "token", "meeting_id": "abc"})
+        speaker_event = json.dumps({"type": "speaker_activity", "payload": {"event_type": "SPEAKER_START", "participant_name": "Alice"}})
+        audio = np.zeros(16000, dtype=np.float32).tobytes()
+        websocket = FakeAsyncWebSocket(options, [speaker_event, audio, audio, b"END_OF_AUDIO"])
+
+        asyncio.run(asyncio.wait_for(self.server.recv_audio_async(websocket), timeout=5))
+
+        client = self.clients[0]
+        self.assertTrue(client.exit)
+        self.assertTrue(websocket.closed)
+        self.assertEqual(self.server.client_manager.clients, {})
+        self.assertIn(json.dumps({"status": "SERVER_READY", "uid": "client1"}), websocket.sent)
+        # the blocking Redis publish ran on the executor, not on the event loop
+        self.assertEqual(len(self.publish_threads), 1)
+        self.assertTrue(self.publish_threads[0].startswith("transcription"))
+        # the received audio was handed to passes running on the executor
+        self.assertTrue(client.passes)
+        self.assertTrue(all(thread.startswith("transcription") for thread, _ in client.passes))
+        self.assertGreater(sum(samples for _, samples in client.passes), 0)
+        self.assertIsNone(client.wakeup_samples)
+
+
 class TestServerConnection(unittest.TestCase):
     def setUp(self):
         self.server = TranscriptionServer()
@@ -1,7 +1,7 @@
 import unittest
 import numpy as np
 from whisper_live.tensorrt_utils import load_audio
-from whisper_live.vad import VoiceActivityDetector
+from whisper_live.vad import VoiceActivityDetector, BatchedVoiceActivityDetector
 
 
 class TestVoiceActivityDetection(unittest.TestCase):
@@ -24,3 +24,30 @@ class TestVoiceActivityDetection(unittest.TestCase):
         audio_tensor = load_audio("assets/jfk.flac")
         is_speech_present = self.vad(audio_tensor)
         self.assertTrue(is_speech_present, "VAD failed to identify speech segment.")
+
+
+class TestBatchedVoiceActivityDetection(unittest.TestCase):
+    def setUp(self):
+        self.vad = BatchedVoiceActivityDetector()
+        self.sample_rate = 16000
+
+    def test_streams_are_batched_independently(self):
+        speech = load_audio("assets/jfk.flac")[:3 * self.sample_rate]
+        silence = np.zeros(3 * self.sample_rate, dtype=np.float32)
+        frame_size = 4096
+        speech_detected = {"speech": False, "silence": False}
+        for start in range(0, 3 * self.sample_rate, frame_size):
+            probs = self.vad.speech_probs({
+                "speech": speech[start:start + frame_size],
+                "silence": silence[start:start + frame_size],
+            })
+            for stream_id, stream_probs in probs.items():
+                speech_detected[stream_id] |= bool(np.any(stream_probs > self.vad.threshold))
+        self.assertTrue(speech_detected["speech"], "Batched VAD failed to identify speech segment.")
+        self.assertFalse(speech_detected["silence"], "Batched VAD incorrectly identified silence as speech.")
+
+    def test_partial_window_is_carried_over(self):
+        probs = self.vad.speech_probs({"uid": np.zeros(700, dtype=np.float32)})
+        self.assertEqual(probs["uid"].shape[0], 1)
+        probs = self.vad.speech_probs({"uid": np.zeros(400, dtype=np.float32)})
+        self.assertEqual(probs["uid"].shape[0], 1)
@@ -3,19 +3,23 @@ import time
 import threading
 import json
 import functools
+import contextlib
 import logging
+import queue
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
 from typing import List, Optional
 import datetime
 import websocket
 import sys # Added sys import
 
-import torch
 import numpy as np
 from websockets.sync.server import serve
+from websockets.asyncio.server import serve as serve_async
 from websockets.exceptions import ConnectionClosed
-from whisper_live.vad import VoiceActivityDetector
-from whisper_live.transcriber import WhisperModel
+from whisper_live.vad import BatchedVoiceActivityDetector
+from whisper_live.transcriber import WhisperModel, BatchedInferencePipeline
 try:
     from whisper_live.transcriber_tensorrt import WhisperTRTLLM
     TENSORRT_AVAILABLE = True
@@ -47,6 +51,121 @@ logger = logging.getLogger("transcription")
 logger.setLevel(logging.INFO)
 logger.addHandler(file_handler)
 
+class ServerMetrics:
+    """
+    In-process counters and gauges exposed in the Prometheus text format on `/metrics`.
+
+    Every per-client value is recorded twice: as an aggregate series (`whisperlive_<name>`) that
+    keeps counting after clients disconnect, and as a `whisperlive_client_<name>{client_uid=...}`
+    series that is dropped when the client leaves. Per-client series are only recorded for clients
+    registered with `add_client`, so a model call finishing after its client left does not bring
+    the series back.
+    """
+
+    METRICS = {
+        "audio_received_seconds_total": ("counter", "Seconds of audio received from clients."),
+        "audio_transcribed_seconds_total": ("counter", "Seconds of audio sent through the model."),
+        "transcribe_duration_seconds_total": ("counter", "Time spent in model calls."),
+        "transcribe_calls_total": ("counter", "Number of model calls."),
+        "realtime_factor": ("gauge", "Processing time divided by audio duration of the last model call."),
+        "model_wait_seconds_total": ("counter", "Time spent waiting for the shared model lock or a pooled model."),
+        "model_waits_total": ("counter", "Number of waits for the shared model lock or a pooled model."),
+        "buffer_depth_seconds": ("gauge", "Buffered audio after the last committed segment."),
+        "vad_duration_seconds_total": ("counter", "Time spent in server-side voice activity detection."),
+        "vad_calls_total": ("counter", "Number of server-side voice activity detection calls."),
+        "collector_xadd_duration_seconds_total": ("counter", "Time spent in XADD calls to the collector streams."),
+        "collector_xadd_total": ("counter", "Number of XADD calls to the collector streams."),
+        "collector_xadd_failures_total": ("counter", "Number of failed XADD calls to the collector streams."),
+        "connected_clients": ("gauge", "Number of connected clients."),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.clients = set()
+
+    def inc(self, name, value=1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = value
+
+    def inc_client(self, name, client_uid, value=1.0):
+        """Increments both the aggregate and the per-client series of `name`."""
+        self.inc(name, value)
+        key = (f"client_{name}", (("client_uid", client_uid),))
+        with self.lock:
+            if client_uid in self.clients:
+                self.values[key] = self.values.get(key, 0.0) + value
+
+    def set_client(self, name, client_uid, value):
+        """Sets the per-client series of `name`."""
+        with self.lock:
+            if client_uid in self.clients:
+                self.values[(f"client_{name}", (("client_uid", client_uid),))] = value
+
+    def add_client(self, client_uid):
+        """Starts recording the per-client series of a connected client."""
+        with self.lock:
+            self.clients.add(client_uid)
+
+    def remove_client(self, client_uid):
+        """Drops the per-client series of a disconnected client."""
+        with self.lock:
+            self.clients.discard(client_uid)
+            for key in [key for key in self.values if ("client_uid", client_uid) in key[1]]:
+                del self.values[key]
+
+    def record_transcription(self, client_uid, audio_duration, processing_time, wait_time=None):
+        """
+        Records a model call.
+
+        Args:
+            client_uid (str): The client the audio belongs to.
+            audio_duration (float): Seconds of audio transcribed.
+            processing_time (float): Seconds spent in the model call, excluding `wait_time`.
+            wait_time (float, optional): Seconds spent waiting for the model.
+        """
+        self.inc_client("audio_transcribed_seconds_total", client_uid, audio_duration)
+        self.inc_client("transcribe_duration_seconds_total", client_uid, processing_time)
+        self.inc_client("transcribe_calls_total", client_uid)
+        if audio_duration > 0:
+            self.set_client("realtime_factor", client_uid, processing_time / audio_duration)
+            self.set("realtime_factor", processing_time / audio_duration)
+        if wait_time is not None:
+            self.inc_client("model_wait_seconds_total", client_uid, wait_time)
+            self.inc_client("model_waits_total", client_uid)
+
+    @staticmethod
+    def escape_label_value(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def render(self):
+        """Returns all series in the Prometheus text exposition format."""
+        with self.lock:
+            values = sorted(self.values.items())
+        lines = []
+        described = set()
+        for (name, labels), value in values:
+            base_name = name[len("client_"):] if name.startswith("client_") else name
+            metric_type, help_text = self.METRICS.get(base_name, ("untyped", ""))
+            full_name = f"whisperlive_{name}"
+            if full_name not in described:
+                described.add(full_name)
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {metric_type}")
+            label_str = ",".join(f'{k}="{self.escape_label_value(v)}"' for k, v in labels)
+            lines.append(f"{full_name}{{{label_str}}} {value}" if label_str else f"{full_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = ServerMetrics()
+
+
 class TranscriptionCollectorClient:
     """Client that maintains connection to Redis on a separate thread
     and attempts auto-reconnection when the connection is lost."""
@@ -153,6 +272,21 @@ class TranscriptionCollectorClient:
             time.sleep(retry_delay)
             retry_delay = min(retry_delay * 2, max_retry_delay)
     
+    def _xadd(self, stream_key, message):
+        """XADD to `stream_key`, recording latency and failures in the server metrics."""
+        start = time.time()
+        try:
+            result = self.redis_client.xadd(stream_key, message)
+        except Exception:
+            metrics.inc("collector_xadd_failures_total", stream=stream_key)
+            raise
+        finally:
+            metrics.inc("collector_xadd_duration_seconds_total", time.time() - start, stream=stream_key)
+            metrics.inc("collector_xadd_total", stream=stream_key)
+        if not result:
+            metrics.inc("collector_xadd_failures_total", stream=stream_key)
+        return result
+
     def disconnect(self):
         """Disconnect from Redis and stop the connection thread."""
         with self.connection_lock:
@@ -216,7 +350,7 @@ class TranscriptionCollectorClient:
                 "payload": json.dumps(payload)
             }
             
-            result = self.redis_client.xadd(
+            result = self._xadd(
                 self.stream_key,
                 message
             )
@@ -265,7 +399,7 @@ class TranscriptionCollectorClient:
             # (typically strings, numbers, or booleans)
             # For simplicity, we assume the structure is already flat as per planstate.md
             
-            result = self.redis_client.xadd(
+            result = self._xadd(
                 self.speaker_events_stream_key,
                 redis_message_payload 
             )
@@ -314,7 +448,7 @@ class TranscriptionCollectorClient:
                 "end_timestamp": timestamp_iso
             }
             message = {"payload": json.dumps(payload)}
-            result = self.redis_client.xadd(self.stream_key, message)
+            result = self._xadd(self.stream_key, message)
             if result:
                 logging.info(f"Published session_end event for UID {session_uid} to {self.stream_key}")
                 # Remove from published starts if present, as session is now considered ended
@@ -376,7 +510,7 @@ class TranscriptionCollectorClient:
                 "payload": json.dumps(payload) 
             }
             
-            result = self.redis_client.xadd(
+            result = self._xadd(
                 self.stream_key, 
                 message
             )
@@ -392,6 +526,40 @@ class TranscriptionCollectorClient:
             logging.error(f"Error publishing transcription for UID {session_uid} to {self.stream_key}: {e}")
             return False
 
+class AsyncWebSocketAdapter:
+    """
+    Gives the client objects the blocking websocket interface (`send`, `close`) of an asyncio connection.
+
+    Calls come from executor threads as well as from the event loop itself, so they only schedule the
+    coroutine on the loop and return without waiting for it to complete.
+    """
+
+    def __init__(self, websocket, loop):
+        self.websocket = websocket
+        self.loop = loop
+
+    def send(self, message):
+        self._schedule(self.websocket.send(message))
+
+    def close(self):
+        self._schedule(self.websocket.close())
+
+    def _schedule(self, coro):
+        if self.loop.is_closed():
+            coro.close()
+            return
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        future.add_done_callback(self._log_error)
+
+    @staticmethod
+    def _log_error(future):
+        if future.cancelled():
+            return
+        e = future.exception()
+        if e is not None and not isinstance(e, ConnectionClosed):
+            logging.error(f"[ERROR]: Sending data to client: {e}")
+
+
 class ClientManager:
     def __init__(self, max_clients=4, max_connection_time=3600):
         """
@@ -406,6 +574,8 @@ class ClientManager:
         self.start_times = {}
         self.max_clients = max_clients
         self.max_connection_time = max_connection_time
+        # guards `clients` against readers on other threads, such as the metrics endpoint
+        self.lock = threading.Lock()
 
     def add_client(self, websocket, client):
         """
@@ -415,8 +585,9 @@ class ClientManager:
             websocket: The websocket associated with the client to add.
             client: The client object to be added and tracked.
         """
-        self.clients[websocket] = client
-        self.start_times[websocket] = time.time()
+        with self.lock:
+            self.clients[websocket] = client
+            self.start_times[websocket] = time.time()
 
     def get_client(self, websocket):
         """
@@ -440,10 +611,16 @@ class ClientManager:
         Args:
             websocket: The websocket associated with the client to be removed.
         """
-        client = self.clients.pop(websocket, None)
+        with self.lock:
+            client = self.clients.pop(websocket, None)
+            self.start_times.pop(websocket, None)
         if client:
             client.cleanup()
-        self.start_times.pop(websocket, None)
+
+    def snapshot(self):
+        """Returns the connected clients as a list that is safe to iterate on any thread."""
+        with self.lock:
+            return list(self.clients.values())
 
     def get_wait_time(self):
         """
@@ -521,6 +698,7 @@ class TranscriptionServer:
         self.client_manager = None
         self.no_voice_activity_chunks = 0
         self.use_vad = True
+        self.vad_detector = None
         self.single_model = False
         
         # Instantiate TranscriptionCollectorClient here
@@ -538,6 +716,7 @@ class TranscriptionServer:
             logging.warning("REDIS_STREAM_URL not set. TranscriptionCollectorClient will not be initialized in TranscriptionServer.")
 
         self.is_healthy = False  # Represents WebSocket server readiness primarily
+        self.is_model_ready = False  # Set once the shared model is loaded and warmed up
         self.health_server = None
         self.backend = None # Initialize backend attribute
 
@@ -548,6 +727,9 @@ class TranscriptionServer:
         self.self_monitor_thread = None
         self._stop_self_monitor = threading.Event()
 
+        # asyncio server mode
+        self.executor = None
+
     def initialize_client(
         self, websocket, options, faster_whisper_custom_model_path,
         whisper_tensorrt_path, trt_multilingual
@@ -609,8 +791,24 @@ class TranscriptionServer:
         Returns:
             A numpy array containing the audio, or False if END_OF_AUDIO, or None if control message processed.
         """
-        frame_data = websocket.recv()
-        
+        return self.decode_frame(websocket, websocket.recv())
+
+    @staticmethod
+    def is_control_frame(frame_data):
+        """Whether a received websocket message is a JSON control message rather than audio."""
+        return isinstance(frame_data, str) or (isinstance(frame_data, bytes) and frame_data.startswith(b'{'))
+
+    def decode_frame(self, websocket, frame_data):
+        """
+        Dispatches a control message or decodes an audio frame received from the websocket.
+
+        Args:
+            websocket: The websocket the frame was received from.
+            frame_data (str or bytes): The received websocket message.
+
+        Returns:
+            A numpy array containing the audio, or False if END_OF_AUDIO, or None if control message processed.
+        """
         # Handle END_OF_AUDIO signal
         if frame_data == b"END_OF_AUDIO":
             return False
@@ -618,7 +816,7 @@ class TranscriptionServer:
         # Check if this is a JSON control message (string) or binary audio data
         try:
             # Try to decode as JSON string first
-            if isinstance(frame_data, str) or (isinstance(frame_data, bytes) and frame_data.startswith(b'{')):
+            if self.is_control_frame(frame_data):
                 # This is a JSON control message
                 if isinstance(frame_data, bytes):
                     frame_data = frame_data.decode('utf-8')
@@ -743,10 +941,11 @@ class TranscriptionServer:
             logging.error(f"Error processing audio chunk metadata: {e}")
 
     def handle_new_connection(self, websocket, faster_whisper_custom_model_path,
-                              whisper_tensorrt_path, trt_multilingual):
+                              whisper_tensorrt_path, trt_multilingual, options=None):
         try:
             logging.info("New client connected")
-            options = websocket.recv()
+            if options is None:
+                options = websocket.recv()
             logging.info(f"Received raw message from client: {options}")
             options = json.loads(options)
             
@@ -778,8 +977,9 @@ class TranscriptionServer:
                 websocket.close()
                 return False  # Indicates that the connection should not continue
 
-            if self.backend and self.backend.is_tensorrt(): # Check if self.backend is not None
-                self.vad_detector = VoiceActivityDetector(frame_rate=self.RATE)
+            if self.backend and self.backend.is_tensorrt() and self.vad_detector is None: # Check if self.backend is not None
+                # shared by all connections, frames of concurrent clients are batched into one model call
+                self.vad_detector = BatchedVoiceActivityDetector(frame_rate=self.RATE)
             self.initialize_client(websocket, options, faster_whisper_custom_model_path,
                                    whisper_tensorrt_path, trt_multilingual)
             return True
@@ -795,6 +995,9 @@ class TranscriptionServer:
 
     def process_audio_frames(self, websocket):
         frame_np = self.get_audio_from_websocket(websocket)
+        return self.handle_audio_frame(websocket, frame_np)
+
+    def handle_audio_frame(self, websocket, frame_np):
         client = self.client_manager.get_client(websocket)
         
         # Handle different return values from get_audio_from_websocket
@@ -868,8 +1071,27 @@ class TranscriptionServer:
         if redis_url_for_health_check:
             self.start_health_check_server(host, 9091)
 
+        # Load and warm up the shared model before accepting connections, so the first client
+        # doesn't wait for it. Clients choose the model themselves unless a custom one is set.
+        if self.backend.is_faster_whisper() and single_model and faster_whisper_custom_model_path:
+            logger.info(f"MODEL_PRELOAD: Loading {faster_whisper_custom_model_path}")
+            start = time.time()
+            ServeClientFasterWhisper.preload(faster_whisper_custom_model_path, self.server_options)
+            logger.info(f"MODEL_PRELOAD: Model loaded and warmed up in {time.time() - start:.2f}s")
+        self.is_model_ready = True
+
         logger.info(f"SERVER_START: host={host}, port={port}, backend={self.backend.value}, single_model={single_model}")
         
+        if self.server_options.get("async_server", False):
+            asyncio.run(self.serve_async(
+                host,
+                port,
+                faster_whisper_custom_model_path=faster_whisper_custom_model_path,
+                whisper_tensorrt_path=whisper_tensorrt_path,
+                trt_multilingual=trt_multilingual
+            ))
+            return
+
         with serve(
             functools.partial(
                 self.recv_audio,
@@ -883,16 +1105,144 @@ class TranscriptionServer:
         ) as server:
             self.is_healthy = True # WebSocket server is up
             logger.info(f"SERVER_RUNNING: WhisperLive server running on {host}:{port} with health check on {host}:9091/health")
-            
-            # Start self-monitoring thread
-            if self.self_monitor_thread is None:
-                self._stop_self_monitor.clear()
-                self.self_monitor_thread = threading.Thread(target=self._self_monitor, daemon=True)
-                self.self_monitor_thread.start()
-                logger.info(f"SELF_MONITOR: Started self-monitoring thread. Interval: {self.health_monitor_interval}s, Max Streak: {self.max_unhealthy_streak}")
-
+            self.start_self_monitor()
             server.serve_forever()
 
+    async def serve_async(self,
+                          host,
+                          port,
+                          faster_whisper_custom_model_path=None,
+                          whisper_tensorrt_path=None,
+                          trt_multilingual=False):
+        """
+        Serves connections from a single asyncio event loop.
+
+        Frame receipt, control message dispatch and outbound sends for all connections run on the loop.
+        Model work (client initialization and transcription passes) runs on a bounded thread pool of
+        `async_workers` threads instead of one receive thread and one transcription thread per client.
+        """
+        num_workers = self.server_options.get("async_workers", 8)
+        self.executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="transcription")
+        try:
+            async with serve_async(
+                functools.partial(
+                    self.recv_audio_async,
+                    faster_whisper_custom_model_path=faster_whisper_custom_model_path,
+                    whisper_tensorrt_path=whisper_tensorrt_path,
+                    trt_multilingual=trt_multilingual
+                ),
+                host,
+                port
+            ) as server:
+                self.is_healthy = True # WebSocket server is up
+                logger.info(f"SERVER_RUNNING: WhisperLive asyncio server running on {host}:{port} with {num_workers} transcription workers and health check on {host}:9091/health")
+                self.start_self_monitor()
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False)
+
+    async def recv_audio_async(self,
+                               websocket,
+                               faster_whisper_custom_model_path=None,
+                               whisper_tensorrt_path=None,
+                               trt_multilingual=False):
+        """
+        asyncio counterpart of `recv_audio`, handles a single connection on the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        client_websocket = AsyncWebSocketAdapter(websocket, loop)
+        try:
+            options = await websocket.recv()
+        except ConnectionClosed:
+            logging.info("Connection closed by client")
+            return
+
+        # creating the client may load a model, keep it off the event loop
+        connected = await loop.run_in_executor(
+            self.executor,
+            functools.partial(
+                self.handle_new_connection,
+                client_websocket,
+                faster_whisper_custom_model_path,
+                whisper_tensorrt_path,
+                trt_multilingual,
+                options=options
+            )
+        )
+        if not connected:
+            return
+
+        client = self.client_manager.get_client(client_websocket)
+        audio_available = asyncio.Event()
+        client.on_audio_available = lambda: loop.call_soon_threadsafe(audio_available.set)
+        transcription_task = asyncio.create_task(self.drive_transcription(client, audio_available))
+
+        try:
+            async for frame_data in websocket:
+                if self.client_manager.is_client_timeout(client_websocket):
+                    break
+                if self.is_control_frame(frame_data):
+                    # control handlers publish to Redis with the blocking client, keep them off the event loop
+                    frame_np = await loop.run_in_executor(
+                        self.executor, self.decode_frame, client_websocket, frame_data
+                    )
+                else:
+                    frame_np = self.decode_frame(client_websocket, frame_data)
+                if self.backend.is_tensorrt():
+                    # the TensorRT backend runs VAD on every frame
+                    keep_going = await loop.run_in_executor(
+                        self.executor, self.handle_audio_frame, client_websocket, frame_np
+                    )
+                else:
+                    keep_going = self.handle_audio_frame(client_websocket, frame_np)
+                if not keep_going:
+                    break
+        except ConnectionClosed:
+            logging.info("Connection closed by client")
+        except Exception as e:
+            logging.error(f"Unexpected error: {str(e)}")
+        finally:
+            if self.client_manager.get_client(client_websocket):
+                await loop.run_in_executor(self.executor, self.cleanup, client_websocket)
+            await websocket.close()
+            await transcription_task
+
+    async def drive_transcription(self, client, audio_available):
+        """
+        Runs the client's transcription passes on the executor until the client exits, waiting for
+        `audio_available` whenever a pass asks for more audio.
+
+        Args:
+            client (ServeClientBase): The client to transcribe.
+            audio_available (asyncio.Event): Set through `client.on_audio_available` by `add_frames`.
+        """
+        loop = asyncio.get_running_loop()
+        while not client.exit:
+            wait_s = await loop.run_in_executor(self.executor, client.transcription_pass)
+            if not wait_s or client.exit:
+                continue
+
+            audio_available.clear()
+            with client.lock:
+                client.wakeup_samples = int(wait_s * client.RATE)
+                ready = client.unprocessed_samples() >= client.wakeup_samples
+            if not ready:
+                try:
+                    await asyncio.wait_for(audio_available.wait(), timeout=client.max_audio_wait_s)
+                except asyncio.TimeoutError:
+                    pass
+            with client.lock:
+                client.wakeup_samples = None
+        logging.info("Exiting speech to text task")
+
+    def start_self_monitor(self):
+        """Starts the self-monitoring thread if it is not running yet."""
+        if self.self_monitor_thread is None:
+            self._stop_self_monitor.clear()
+            self.self_monitor_thread = threading.Thread(target=self._self_monitor, daemon=True)
+            self.self_monitor_thread.start()
+            logger.info(f"SELF_MONITOR: Started self-monitoring thread. Interval: {self.health_monitor_interval}s, Max Streak: {self.max_unhealthy_streak}")
+
     def _self_monitor(self):
         """Periodically checks internal health and exits if persistently unhealthy."""
         while not self._stop_self_monitor.is_set():
@@ -1007,10 +1357,14 @@ class TranscriptionServer:
                 after detecting no voice activity for more than three consecutive frames, it also triggers the
                 end-of-speech (EOS) flag for the client.
         """
-        if not self.vad_detector(frame_np):
+        client = self.client_manager.get_client(websocket)
+        start = time.time()
+        voice_active = self.vad_detector(client.client_uid, frame_np)
+        metrics.inc("vad_duration_seconds_total", time.time() - start)
+        metrics.inc("vad_calls_total")
+        if not voice_active:
             self.no_voice_activity_chunks += 1
             if self.no_voice_activity_chunks > 3:
-                client = self.client_manager.get_client(websocket)
                 if not client.eos:
                     client.set_eos(True)
                 time.sleep(0.1)    # Sleep 100m; wait some voice activity.
@@ -1024,8 +1378,27 @@ class TranscriptionServer:
         Args:
             websocket: The websocket associated with the client to be cleaned up.
         """
-        if self.client_manager.get_client(websocket):
+        client = self.client_manager.get_client(websocket)
+        if client:
             self.client_manager.remove_client(websocket)
+            if self.vad_detector is not None:
+                self.vad_detector.remove_stream(client.client_uid)
+
+    def render_metrics(self):
+        """
+        Updates the gauges derived from the connected clients and returns all metrics in the
+        Prometheus text format.
+        """
+        clients = self.client_manager.snapshot() if self.client_manager else []
+        metrics.set("connected_clients", len(clients))
+        total_depth = 0.0
+        for client in clients:
+            with client.lock:
+                depth = client.unprocessed_samples() / client.RATE
+            total_depth += depth
+            metrics.set_client("buffer_depth_seconds", client.client_uid, depth)
+        metrics.set("buffer_depth_seconds", total_depth)
+        return metrics.render()
 
     def start_health_check_server(self, host, port):
         """Start a simple HTTP server for health checks.
@@ -1042,7 +1415,16 @@ class TranscriptionServer:
                 super().__init__(*args, **kwargs)
             
             def do_GET(self):
+                if self.path == '/metrics':
+                    body = self.transcription_server_instance.render_metrics().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
                 server_websocket_healthy = self.transcription_server_instance.is_healthy
+                model_ready = self.transcription_server_instance.is_model_ready
                 
                 redis_healthy = False
                 redis_ping_error = "Collector client not initialized"
@@ -1067,13 +1449,15 @@ class TranscriptionServer:
                         redis_ping_error = "redis_collector.redis_client is None (implies not connected or error in worker)"
                 
                 if self.path == '/health':
-                    if server_websocket_healthy and redis_healthy:
+                    if server_websocket_healthy and model_ready and redis_healthy:
                         self.send_response(200)
                         self.send_header('Content-type', 'text/plain')
                         self.end_headers()
                         self.wfile.write(b'OK')
                     else:
                         unhealthy_reasons = []
+                        if not model_ready:
+                            unhealthy_reasons.append("Model not loaded")
                         if not server_websocket_healthy:
                             unhealthy_reasons.append("WebSocket server not ready")
                         if not redis_healthy:
@@ -1216,6 +1600,67 @@ class TranscriptionServer:
             logging.error(f"Error processing audio chunk metadata: {e}")
 
 
+class AudioRingBuffer(object):
+    """
+    Fixed-capacity float32 audio buffer with O(frame) appends and zero-copy reads.
+
+    The storage is mirrored: every sample is written twice, at `i` and `i + capacity`, so any
+    window of up to `capacity` samples is one contiguous slice of the storage and can be handed
+    out as a view without copying. A view stays valid until `capacity - len(view)` more samples
+    have been appended; callers that hold on to audio for longer must copy it.
+    """
+
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.storage = np.empty(2 * self.capacity, dtype=dtype)
+        self.start = 0  # absolute index of the oldest sample still in the buffer
+        self.end = 0    # absolute index one past the newest sample
+
+    def __len__(self):
+        return self.end - self.start
+
+    def append(self, frame):
+        """
+        Appends `frame` to the buffer.
+
+        Returns:
+            int: Number of the oldest samples that had to be dropped to make room, normally 0.
+        """
+        n = frame.shape[0]
+        if n == 0:
+            return 0
+        if n > self.capacity:
+            self.end += n - self.capacity
+            frame = frame[-self.capacity:]
+            n = self.capacity
+
+        pos = self.end % self.capacity
+        first = min(n, self.capacity - pos)
+        self.storage[pos:pos + first] = frame[:first]
+        self.storage[pos + self.capacity:pos + self.capacity + first] = frame[:first]
+        if first < n:
+            rest = n - first
+            self.storage[:rest] = frame[first:]
+            self.storage[self.capacity:self.capacity + rest] = frame[first:]
+        self.end += n
+
+        dropped = max(0, len(self) - self.capacity)
+        self.start += dropped
+        return dropped
+
+    def discard(self, num_samples):
+        """Drops up to `num_samples` of the oldest samples."""
+        self.start += max(0, min(int(num_samples), len(self)))
+
+    def view(self, offset=0):
+        """
+        Returns a zero-copy view of the buffered samples, starting `offset` samples after the oldest one.
+        """
+        offset = max(0, min(int(offset), len(self)))
+        pos = (self.start + offset) % self.capacity
+        return self.storage[pos:pos + len(self) - offset]
+
+
 class ServeClientBase(object):
     RATE = 16000
     SERVER_READY = "SERVER_READY"
@@ -1229,6 +1674,7 @@ class ServeClientBase(object):
         self.language = language
         self.task = task
         self.client_uid = client_uid or str(uuid.uuid4())
+        metrics.add_client(self.client_uid)
         self.platform = platform
         self.meeting_url = meeting_url
         self.token = token
@@ -1241,7 +1687,6 @@ class ServeClientBase(object):
         self.is_multilingual = True
         self.frames = b""
         self.timestamp_offset = 0.0
-        self.frames_np = None
         self.frames_offset = 0.0
         self.text = []
         self.current_out = ''
@@ -1255,6 +1700,9 @@ class ServeClientBase(object):
         self.discard_buffer_s = server_options.get("discard_buffer_s", 30)
         self.clip_if_no_segment_s = server_options.get("clip_if_no_segment_s", 25)
         self.clip_retain_s = server_options.get("clip_retain_s", 5)
+        self.max_audio_wait_s = server_options.get("max_audio_wait_s", 1.0)
+        # room for max_buffer_s plus the incoming audio that triggers the next discard
+        self.frames_np = AudioRingBuffer((self.max_buffer_s + self.discard_buffer_s) * self.RATE)
 
         self.show_prev_out_thresh = server_options.get("show_prev_out_thresh_s", 5)   # if pause(no output from whisper) show previous output for 5 seconds
         self.add_pause_thresh = server_options.get("add_pause_thresh_s", 3)       # add a blank to segment list as a pause(no speech) for 3 seconds
@@ -1266,6 +1714,12 @@ class ServeClientBase(object):
 
         # threading
         self.lock = threading.Lock()
+        # in the asyncio server mode the server drives transcription_pass on its executor instead
+        self.run_transcription_thread = not server_options.get("async_server", False)
+        self.on_audio_available = None
+        # signalled by add_frames once the transcription thread has enough new audio to work on
+        self.audio_available = threading.Condition(self.lock)
+        self.wakeup_samples = None
         
         # Send SERVER_READY message
         ready_message = json.dumps({"status": self.SERVER_READY, "uid": self.client_uid})
@@ -1278,6 +1732,38 @@ class ServeClientBase(object):
             logging.info(f"Published session_start event for client {self.client_uid}")
 
     def speech_to_text(self):
+        """
+        Process an audio stream in an infinite loop, continuously transcribing the speech.
+
+        This method continuously receives audio frames, performs real-time transcription, and sends
+        transcribed segments to the client via a WebSocket connection.
+
+        If the client's language is not detected, it waits for 30 seconds of audio input to make a language prediction.
+        It utilizes the Whisper ASR model to transcribe the audio, continuously processing and streaming results. Segments
+        are sent to the client in real-time, and a history of segments is maintained to provide context.Pauses in speech
+        (no output from Whisper) are handled by showing the previous output for a set duration. A blank segment is added if
+        there is no speech for a specified duration to indicate a pause.
+
+        Raises:
+            Exception: If there is an issue with audio processing or WebSocket communication.
+
+        """
+        while True:
+            if self.exit:
+                logging.info("Exiting speech to text thread")
+                break
+
+            wait_s = self.transcription_pass()
+            if wait_s:
+                self.wait_for_audio(wait_s)
+
+    def transcription_pass(self):
+        """
+        Runs one transcription pass over the unprocessed audio.
+
+        Returns:
+            float: Amount of new audio (in seconds) to wait for before the next pass, 0 to run it right away.
+        """
         raise NotImplementedError
 
     def transcribe_audio(self):
@@ -1295,28 +1781,55 @@ class ServeClientBase(object):
         to prevent excessive memory usage.
 
         If the buffer size exceeds a threshold (45 seconds of audio data), it discards the oldest 30 seconds
-        of audio data to maintain a reasonable buffer size. If the buffer is empty, it initializes it with the provided
-        audio frame. The audio stream buffer is used for real-time processing of audio data for transcription.
+        of audio data to maintain a reasonable buffer size. Frames are copied into a preallocated ring buffer,
+        so the cost of an append does not grow with the amount of buffered audio. The audio stream buffer is used
+        for real-time processing of audio data for transcription.
 
         Args:
             frame_np (numpy.ndarray): The audio frame data as a NumPy array.
 
         """
+        metrics.inc_client("audio_received_seconds_total", self.client_uid, frame_np.shape[0] / self.RATE)
         self.lock.acquire()
-        if self.frames_np is not None and self.frames_np.shape[0] > self.max_buffer_s * self.RATE:
+        if len(self.frames_np) > self.max_buffer_s * self.RATE:
             self.frames_offset += self.discard_buffer_s
-            self.frames_np = self.frames_np[int(self.discard_buffer_s * self.RATE):]
-            # check timestamp offset(should be >= self.frame_offset)
-            # this basically means that there is no speech as timestamp offset hasnt updated
-            # and is less than frame_offset
-            if self.timestamp_offset < self.frames_offset:
-                self.timestamp_offset = self.frames_offset
-        if self.frames_np is None:
-            self.frames_np = frame_np.copy()
-        else:
-            self.frames_np = np.concatenate((self.frames_np, frame_np), axis=0)
+            self.frames_np.discard(self.discard_buffer_s * self.RATE)
+        # a frame larger than the free space pushes the oldest samples out of the ring
+        self.frames_offset += self.frames_np.append(frame_np) / self.RATE
+        # check timestamp offset(should be >= self.frame_offset)
+        # this basically means that there is no speech as timestamp offset hasnt updated
+        # and is less than frame_offset
+        if self.timestamp_offset < self.frames_offset:
+            self.timestamp_offset = self.frames_offset
+        if self.wakeup_samples is not None and self.unprocessed_samples() >= self.wakeup_samples:
+            self.audio_available.notify()
+            if self.on_audio_available is not None:
+                self.on_audio_available()
         self.lock.release()
 
+    def unprocessed_samples(self):
+        """
+        Number of buffered samples after the current timestamp offset. The caller must hold `self.lock`.
+        """
+        samples_take = max(0, int((self.timestamp_offset - self.frames_offset) * self.RATE))
+        return max(0, len(self.frames_np) - samples_take)
+
+    def wait_for_audio(self, min_duration):
+        """
+        Blocks the transcription thread until at least `min_duration` seconds of unprocessed audio
+        are buffered, the client exits, or `max_audio_wait_s` has passed.
+
+        Args:
+            min_duration (float): Amount of new audio (in seconds) to wait for.
+        """
+        with self.audio_available:
+            self.wakeup_samples = int(min_duration * self.RATE)
+            self.audio_available.wait_for(
+                lambda: self.exit or self.unprocessed_samples() >= self.wakeup_samples,
+                timeout=self.max_audio_wait_s
+            )
+            self.wakeup_samples = None
+
     def clip_audio_if_no_valid_segment(self):
         """
         Update the timestamp offset based on audio buffer status.
@@ -1324,8 +1837,8 @@ class ServeClientBase(object):
         no valid segment for the last 30 seconds from whisper
         """
         with self.lock:
-            if self.frames_np[int((self.timestamp_offset - self.frames_offset)*self.RATE):].shape[0] > self.clip_if_no_segment_s * self.RATE:
-                duration = self.frames_np.shape[0] / self.RATE
+            if self.unprocessed_samples() > self.clip_if_no_segment_s * self.RATE:
+                duration = len(self.frames_np) / self.RATE
                 self.timestamp_offset = self.frames_offset + duration - self.clip_retain_s
 
     def get_audio_chunk_for_processing(self):
@@ -1335,16 +1848,17 @@ class ServeClientBase(object):
         Calculates which part of the audio data should be processed next, based on
         the difference between the current timestamp offset and the frame's offset, scaled by
         the audio sample rate (RATE). It then returns this chunk of audio data along with its
-        duration in seconds.
+        duration in seconds. The chunk is a view into the client's ring buffer and is only valid
+        until `discard_buffer_s` of new audio has arrived, copy it before holding on to it.
 
         Returns:
             tuple: A tuple containing:
-                - input_bytes (np.ndarray): The next chunk of audio data to be processed.
+                - input_bytes (np.ndarray): A view of the next chunk of audio data to be processed.
                 - duration (float): The duration of the audio chunk in seconds.
         """
         with self.lock:
             samples_take = max(0, (self.timestamp_offset - self.frames_offset) * self.RATE)
-            input_bytes = self.frames_np[int(samples_take):].copy()
+            input_bytes = self.frames_np.view(samples_take)
         duration = input_bytes.shape[0] / self.RATE
         return input_bytes, duration
 
@@ -1458,6 +1972,11 @@ class ServeClientBase(object):
         """
         logging.info("Cleaning up.")
         self.exit = True
+        metrics.remove_client(self.client_uid)
+        with self.audio_available:
+            self.audio_available.notify_all()
+        if self.on_audio_available is not None:
+            self.on_audio_available()
 
     def forward_to_collector(self, segments):
         """Forward transcriptions to the collector if available"""
@@ -1499,8 +2018,9 @@ class ServeClientTensorRT(ServeClientBase):
             self.create_model(model, multilingual)
 
         # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        if self.run_transcription_thread:
+            self.trans_thread = threading.Thread(target=self.speech_to_text)
+            self.trans_thread.start()
 
         self.websocket.send(json.dumps({
             "uid": self.client_uid,
@@ -1572,8 +2092,11 @@ class ServeClientTensorRT(ServeClientBase):
         Args:
             input_bytes (np.array): The audio chunk to transcribe.
         """
+        start = time.time()
+        wait_time = None
         if ServeClientTensorRT.SINGLE_MODEL:
             ServeClientTensorRT.SINGLE_MODEL_LOCK.acquire()
+            wait_time = time.time() - start
         logging.info(f"[WhisperTensorRT:] Processing audio with duration: {input_bytes.shape[0] / self.RATE}")
         mel, duration = self.transcriber.log_mel_spectrogram(input_bytes)
         last_segment = self.transcriber.transcribe(
@@ -1582,6 +2105,12 @@ class ServeClientTensorRT(ServeClientBase):
         )
         if ServeClientTensorRT.SINGLE_MODEL:
             ServeClientTensorRT.SINGLE_MODEL_LOCK.release()
+        metrics.record_transcription(
+            self.client_uid,
+            input_bytes.shape[0] / self.RATE,
+            time.time() - start - (wait_time or 0.0),
+            wait_time
+        )
         if last_segment:
             self.handle_transcription_output(last_segment, duration)
 
@@ -1615,45 +2144,30 @@ class ServeClientTensorRT(ServeClientBase):
             
             self.timestamp_offset += duration
 
-    def speech_to_text(self):
+    def transcription_pass(self):
         """
-        Process an audio stream in an infinite loop, continuously transcribing the speech.
-
-        This method continuously receives audio frames, performs real-time transcription, and sends
-        transcribed segments to the client via a WebSocket connection.
-
-        If the client's language is not detected, it waits for 30 seconds of audio input to make a language prediction.
-        It utilizes the Whisper ASR model to transcribe the audio, continuously processing and streaming results. Segments
-        are sent to the client in real-time, and a history of segments is maintained to provide context.Pauses in speech
-        (no output from Whisper) are handled by showing the previous output for a set duration. A blank segment is added if
-        there is no speech for a specified duration to indicate a pause.
-
-        Raises:
-            Exception: If there is an issue with audio processing or WebSocket communication.
+        Transcribes the unprocessed audio once at least 0.4 seconds of it are buffered.
 
+        Returns:
+            float: Amount of new audio (in seconds) to wait for before the next pass, 0 to run it right away.
         """
-        while True:
-            if self.exit:
-                logging.info("Exiting speech to text thread")
-                break
+        if len(self.frames_np) == 0:
+            return 0.4    # wait for any audio to arrive
 
-            if self.frames_np is None:
-                time.sleep(0.02)    # wait for any audio to arrive
-                continue
-
-            self.clip_audio_if_no_valid_segment()
+        self.clip_audio_if_no_valid_segment()
 
-            input_bytes, duration = self.get_audio_chunk_for_processing()
-            if duration < 0.4:
-                continue
+        input_bytes, duration = self.get_audio_chunk_for_processing()
+        if duration < 0.4:
+            return 0.4
 
-            try:
-                input_sample = input_bytes.copy()
-                logging.info(f"[WhisperTensorRT:] Processing audio with duration: {duration}")
-                self.transcribe_audio(input_sample)
+        try:
+            input_sample = input_bytes.copy()
+            logging.info(f"[WhisperTensorRT:] Processing audio with duration: {duration}")
+            self.transcribe_audio(input_sample)
 
-            except Exception as e:
-                logging.error(f"[ERROR]: {e}")
+        except Exception as e:
+            logging.error(f"[ERROR]: {e}")
+        return 0
 
     def format_segment(self, start, end, text, completed=False, language=None):
         """
@@ -1801,10 +2315,159 @@ class ServeClientTensorRT(ServeClientBase):
             # Log the language detection to file in a more readable format
             logger.info(f"LANGUAGE_DETECTION: client={self.client_uid}, language={self.language}, confidence={info.language_probability:.4f}")
 
+class BatchInferenceScheduler:
+    """
+    Runs the pending audio windows of all faster_whisper clients through a shared model in batches.
+
+    Without the scheduler every client thread takes SINGLE_MODEL_LOCK and decodes its own window, so N
+    connected meetings mean N sequential decodes. With it, client threads submit their window and block;
+    a single worker thread collects requests for up to `max_wait_ms` (or until `max_batch_size` are
+    queued) and decodes requests that share language, task and prompt in one batched model call.
+    """
+
+    def __init__(self, transcriber, max_batch_size=8, max_wait_ms=50):
+        """
+        Args:
+            transcriber (WhisperModel): The shared model.
+            max_batch_size (int): Maximum number of requests (and chunks per model call) in one batch.
+            max_wait_ms (float): How long the first request of a batch waits for others to join it.
+        """
+        self.transcriber = transcriber
+        self.pipeline = BatchedInferencePipeline(model=transcriber)
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.requests = queue.Queue()
+        self._stop = threading.Event()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+        logging.info(f"Batch inference scheduler started (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})")
+
+    def submit(self, audio, language=None, task="transcribe", initial_prompt=None,
+               vad_filter=True, vad_parameters=None):
+        """
+        Queues an audio window for transcription and blocks until its batch has been decoded.
+
+        Returns:
+            tuple: (segments, info) as returned by `WhisperModel.transcribe`.
+        """
+        future = Future()
+        options = {
+            "language": language,
+            "task": task,
+            "initial_prompt": initial_prompt,
+            "vad_filter": vad_filter,
+            "vad_parameters": dict(vad_parameters) if vad_parameters else None,
+        }
+        self.requests.put((future, audio, options))
+        return future.result()
+
+    def stop(self):
+        self._stop.set()
+
+    def _collect_batch(self):
+        try:
+            batch = [self.requests.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.time() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            # requests can only share a model call if they share the tokenizer and prompt
+            groups = {}
+            for request in batch:
+                options = request[2]
+                key = (
+                    options["language"], options["task"], options["initial_prompt"],
+                    options["vad_filter"], json.dumps(options["vad_parameters"], sort_keys=True)
+                )
+                groups.setdefault(key, []).append(request)
+
+            for requests in groups.values():
+                self._run_group(requests)
+
+    def _run_group(self, requests):
+        options = requests[0][2]
+        if options["language"] is not None:
+            try:
+                results = self.pipeline.transcribe_batch(
+                    [audio for _, audio, _ in requests],
+                    batch_size=self.max_batch_size,
+                    **options
+                )
+            except Exception as e:
+                logging.error(f"[ERROR]: Batched inference failed for {len(requests)} request(s), decoding them one by one: {e}")
+            else:
+                for (future, _, _), result in zip(requests, results):
+                    future.set_result(result)
+                return
+
+        # language detection is per window, and a failed batch is retried per request so that
+        # one bad window only fails its own client
+        for future, audio, request_options in requests:
+            try:
+                segments, info = self.transcriber.transcribe(audio, **request_options)
+                # decode here rather than in the client thread, which would run the model outside the scheduler
+                future.set_result((list(segments) if segments is not None else None, info))
+            except Exception as e:
+                logging.error(f"[ERROR]: Inference failed for a scheduled request: {e}")
+                future.set_exception(e)
+
+
+class ModelPool:
+    """
+    A fixed set of warm models shared by all clients.
+
+    Each model is used by one transcription at a time. Callers are dispatched to the model with the
+    fewest running and waiting transcriptions, so up to `len(models)` clients decode in parallel
+    while memory stays bounded by the pool size instead of the number of connections.
+    """
+
+    def __init__(self, models):
+        self.models = list(models)
+        self.model_locks = [threading.Lock() for _ in self.models]
+        self.loads = [0] * len(self.models)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.models)
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """
+        Context manager that yields the least loaded model for exclusive use.
+        """
+        with self.lock:
+            index = min(range(len(self.models)), key=self.loads.__getitem__)
+            self.loads[index] += 1
+        try:
+            with self.model_locks[index]:
+                yield self.models[index]
+        finally:
+            with self.lock:
+                self.loads[index] -= 1
+
+
 class ServeClientFasterWhisper(ServeClientBase):
 
     SINGLE_MODEL = None
     SINGLE_MODEL_LOCK = threading.Lock()
+    SINGLE_MODEL_LOAD_LOCK = threading.Lock()
+    INFERENCE_SCHEDULER = None
+    MODEL_POOL = None
 
     def __init__(self, websocket, task="transcribe", device=None, language=None, 
                  client_uid=None, model="small.en", initial_prompt=None, 
@@ -1831,17 +2494,15 @@ class ServeClientFasterWhisper(ServeClientBase):
 
         server_options = server_options or {}
         self.min_audio_s = server_options.get("min_audio_s", 1.0)
+        # re-decode the uncommitted window only after this much new audio arrived, 0 re-decodes right away
+        self.min_new_audio_s = server_options.get("min_new_audio_s", 1.0)
+        self.last_pass_end = None
         self.vad_parameters = vad_parameters or {"onset": server_options.get("vad_onset", 0.5)}
         self.no_speech_thresh = server_options.get("vad_no_speech_thresh", 0.45)
         self.same_output_threshold = server_options.get("same_output_threshold", 10)
         self.end_time_for_same_output = None
 
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        if device == "cuda":
-            major, _ = torch.cuda.get_device_capability(device)
-            self.compute_type = "float16" if major >= 7 else "float32"
-        else:
-            self.compute_type = "default" #"int8" #NOTE: maybe we use default here...
+        device, self.compute_type = self.get_device()
 
         if self.model_size_or_path is None:
             return
@@ -1849,11 +2510,7 @@ class ServeClientFasterWhisper(ServeClientBase):
     
         try:
             if single_model:
-                if ServeClientFasterWhisper.SINGLE_MODEL is None:
-                    self.create_model(device)
-                    ServeClientFasterWhisper.SINGLE_MODEL = self.transcriber
-                else:
-                    self.transcriber = ServeClientFasterWhisper.SINGLE_MODEL
+                self.transcriber = ServeClientFasterWhisper.preload(self.model_size_or_path, server_options)
             else:
                 self.create_model(device)
         except Exception as e:
@@ -1864,13 +2521,15 @@ class ServeClientFasterWhisper(ServeClientBase):
                 "message": f"Failed to load model: {str(self.model_size_or_path)}"
             }))
             self.websocket.close()
+            self.exit = True
             return
 
         self.use_vad = use_vad
 
         # threading
-        self.trans_thread = threading.Thread(target=self.speech_to_text)
-        self.trans_thread.start()
+        if self.run_transcription_thread:
+            self.trans_thread = threading.Thread(target=self.speech_to_text)
+            self.trans_thread.start()
         self.websocket.send(
             json.dumps(
                 {
@@ -1881,17 +2540,90 @@ class ServeClientFasterWhisper(ServeClientBase):
             )
         )
 
-    def create_model(self, device):
+    @staticmethod
+    def get_device():
         """
-        Instantiates a new model, sets it as the transcriber.
+        Returns the device to run the model on and the compute type to use on it.
         """
-        self.transcriber = WhisperModel(
-            self.model_size_or_path,
+        # torch is only needed here, and a CPU or ctranslate2-only install may not have it
+        try:
+            import torch
+        except ImportError:
+            torch = None
+        if torch is not None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        else:
+            import ctranslate2
+            device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        if device == "cuda":
+            if torch is not None:
+                major, _ = torch.cuda.get_device_capability(device)
+                compute_type = "float16" if major >= 7 else "float32"
+            else:
+                compute_type = "float16" if "float16" in ctranslate2.get_supported_compute_types("cuda") else "float32"
+        else:
+            compute_type = "default" #"int8" #NOTE: maybe we use default here...
+        return device, compute_type
+
+    @staticmethod
+    def load_model(model_size_or_path, device, compute_type):
+        return WhisperModel(
+            model_size_or_path,
             device=device,
-            compute_type=self.compute_type,
+            compute_type=compute_type,
             local_files_only=False,
         )
 
+    @classmethod
+    def warmup(cls, transcriber):
+        """
+        Runs a short dummy decode, the first inferences after loading a model are slow.
+        """
+        logging.info("[INFO:] Warming up faster_whisper model..")
+        transcriber.transcribe(np.zeros(cls.RATE, dtype=np.float32), language="en", vad_filter=False)
+
+    @classmethod
+    def preload(cls, model_size_or_path, server_options=None):
+        """
+        Loads and warms up the model shared by all clients in single model mode, together with the
+        model pool or batch scheduler enabled in `server_options`. Does nothing if it is already loaded.
+
+        Args:
+            model_size_or_path (str): The model to load.
+            server_options (dict, optional): The server options.
+
+        Returns:
+            WhisperModel: The shared model.
+        """
+        server_options = server_options or {}
+        with cls.SINGLE_MODEL_LOAD_LOCK:
+            if cls.SINGLE_MODEL is not None:
+                return cls.SINGLE_MODEL
+
+            device, compute_type = cls.get_device()
+            model_pool_size = max(1, server_options.get("model_pool_size", 1))
+            models = [cls.load_model(model_size_or_path, device, compute_type) for _ in range(model_pool_size)]
+            for model in models:
+                cls.warmup(model)
+
+            if model_pool_size > 1:
+                cls.MODEL_POOL = ModelPool(models)
+                logging.info(f"Loaded a pool of {model_pool_size} models")
+            elif server_options.get("batch_inference", False):
+                cls.INFERENCE_SCHEDULER = BatchInferenceScheduler(
+                    models[0],
+                    max_batch_size=server_options.get("batch_max_size", 8),
+                    max_wait_ms=server_options.get("batch_max_wait_ms", 50)
+                )
+            cls.SINGLE_MODEL = models[0]
+            return cls.SINGLE_MODEL
+
+    def create_model(self, device):
+        """
+        Instantiates a new model, sets it as the transcriber.
+        """
+        self.transcriber = self.load_model(self.model_size_or_path, device, self.compute_type)
+
     def check_valid_model(self, model_size):
         """
         Check if it's a valid whisper model size.
@@ -1955,17 +2687,33 @@ class ServeClientFasterWhisper(ServeClientBase):
             depends on the implementation of the `transcriber.transcribe` method but typically
             includes the transcribed text.
         """
-        if ServeClientFasterWhisper.SINGLE_MODEL:
-            ServeClientFasterWhisper.SINGLE_MODEL_LOCK.acquire()
-        result, info = self.transcriber.transcribe(
-            input_sample,
-            initial_prompt=self.initial_prompt,
-            language=self.language,
-            task=self.task,
-            vad_filter=self.use_vad,
-            vad_parameters=self.vad_parameters if self.use_vad else None)
-        if ServeClientFasterWhisper.SINGLE_MODEL:
-            ServeClientFasterWhisper.SINGLE_MODEL_LOCK.release()
+        options = {
+            "initial_prompt": self.initial_prompt,
+            "language": self.language,
+            "task": self.task,
+            "vad_filter": self.use_vad,
+            "vad_parameters": self.vad_parameters if self.use_vad else None,
+        }
+        start = time.time()
+        wait_time = None
+        if ServeClientFasterWhisper.INFERENCE_SCHEDULER is not None:
+            result, info = ServeClientFasterWhisper.INFERENCE_SCHEDULER.submit(input_sample, **options)
+        elif ServeClientFasterWhisper.MODEL_POOL is not None:
+            with ServeClientFasterWhisper.MODEL_POOL.acquire() as transcriber:
+                wait_time = time.time() - start
+                result, info = transcriber.transcribe(input_sample, **options)
+        elif ServeClientFasterWhisper.SINGLE_MODEL:
+            with ServeClientFasterWhisper.SINGLE_MODEL_LOCK:
+                wait_time = time.time() - start
+                result, info = self.transcriber.transcribe(input_sample, **options)
+        else:
+            result, info = self.transcriber.transcribe(input_sample, **options)
+        metrics.record_transcription(
+            self.client_uid,
+            input_sample.shape[0] / self.RATE,
+            time.time() - start - (wait_time or 0.0),
+            wait_time
+        )
 
         if self.language is None and info is not None:
             self.set_language(info)
@@ -2018,50 +2766,44 @@ class ServeClientFasterWhisper(ServeClientBase):
         if len(segments):
             self.send_transcription_to_client(segments)
 
-    def speech_to_text(self):
+    def transcription_pass(self):
         """
-        Process an audio stream in an infinite loop, continuously transcribing the speech.
-
-        This method continuously receives audio frames, performs real-time transcription, and sends
-        transcribed segments to the client via a WebSocket connection.
-
-        If the client's language is not detected, it waits for 30 seconds of audio input to make a language prediction.
-        It utilizes the Whisper ASR model to transcribe the audio, continuously processing and streaming results. Segments
-        are sent to the client in real-time, and a history of segments is maintained to provide context.Pauses in speech
-        (no output from Whisper) are handled by showing the previous output for a set duration. A blank segment is added if
-        there is no speech for a specified duration to indicate a pause.
-
-        Raises:
-            Exception: If there is an issue with audio processing or WebSocket communication.
+        Transcribes the unprocessed audio once at least `min_audio_s` of it is buffered.
 
+        Returns:
+            float: Amount of new audio (in seconds) to wait for before the next pass, 0 to run it right away.
         """
-        while True:
-            if self.exit:
-                logging.info("Exiting speech to text thread")
-                break
+        if len(self.frames_np) == 0:
+            return self.min_audio_s    # wait for any audio to arrive
 
-            if self.frames_np is None:
-                continue
+        self.clip_audio_if_no_valid_segment()
 
-            self.clip_audio_if_no_valid_segment()
+        input_bytes, duration = self.get_audio_chunk_for_processing()
+        if duration < self.min_audio_s:
+            return self.min_audio_s     # wait for audio chunks to arrive
 
-            input_bytes, duration = self.get_audio_chunk_for_processing()
-            if duration < self.min_audio_s:
-                time.sleep(0.1)     # wait for audio chunks to arrive
-                continue
-            try:
-                input_sample = input_bytes.copy()
-                result = self.transcribe_audio(input_sample)
+        # the part of the window up to last_pass_end was decoded by the previous pass without
+        # being committed, don't pay for it again until enough new audio has been appended
+        window_end = self.timestamp_offset + duration
+        if self.last_pass_end is not None and self.min_new_audio_s > 0:
+            new_audio_s = window_end - self.last_pass_end
+            if 0 <= new_audio_s < self.min_new_audio_s:
+                return duration + self.min_new_audio_s - new_audio_s
+        self.last_pass_end = window_end
 
-                if result is None or self.language is None:
-                    self.timestamp_offset += duration
-                    time.sleep(0.25)    # wait for voice activity, result is None when no voice activity
-                    continue
-                self.handle_transcription_output(result, duration)
+        try:
+            input_sample = input_bytes.copy()
+            result = self.transcribe_audio(input_sample)
 
-            except Exception as e:
-                logging.error(f"[ERROR]: Failed to transcribe audio chunk: {e}")
-                time.sleep(0.01)
+            if result is None or self.language is None:
+                self.timestamp_offset += duration
+                return self.min_audio_s    # wait for voice activity, result is None when no voice activity
+            self.handle_transcription_output(result, duration)
+
+        except Exception as e:
+            logging.error(f"[ERROR]: Failed to transcribe audio chunk: {e}")
+            time.sleep(0.01)
+        return 0
 
     def format_segment(self, start, end, text, completed=False, language=None):
         """
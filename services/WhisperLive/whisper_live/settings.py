@@ -49,6 +49,23 @@ CLIP_RETAIN_S = 5
 # lower latency but may result in less accurate, fragmented transcriptions.
 MIN_AUDIO_S = 1.0
 
+# The transcription thread sleeps until MIN_AUDIO_S of new audio has arrived.
+# This is the longest (in seconds) it waits before re-checking the buffer
+# anyway. It only bounds how long a missed wakeup can delay processing; idle
+# connections use no CPU while waiting.
+MAX_AUDIO_WAIT_S = 1.0
+
+# Every pass re-transcribes the audio after the last committed segment, so the
+# same seconds go through the model several times before they are committed.
+# A pass is only run once at least this much new audio (in seconds) has
+# arrived since the previous pass, which bounds how often the uncommitted
+# window is re-decoded. Without it a pass starts as soon as the previous one
+# ends, so a model faster than real time re-decodes the same window several
+# times per second of audio. 1 second matches MIN_AUDIO_S and
+# MAX_AUDIO_WAIT_S, so partial results still update about once per second.
+# 0 disables this and re-transcribes right away.
+MIN_NEW_AUDIO_S = 1.0
+
 
 # Voice Activity Detection (VAD) Settings
 # ---------------------------------------
@@ -83,4 +100,50 @@ SHOW_PREV_OUT_THRESH_S = 5
 # If there has been no speech for this duration (in seconds), an empty string is
 # added to the transcript. This helps to visually represent a pause in the
 # conversation.
-ADD_PAUSE_THRESH_S = 3 
\ No newline at end of file
+ADD_PAUSE_THRESH_S = 3 
+
+
+# Batched Inference Settings
+# --------------------------
+# These settings control cross-client batching for the faster_whisper backend.
+# Only used when a single model is shared between all connections.
+
+# If enabled, the pending audio windows of all connected clients are queued and
+# decoded together in one batched model call instead of one client at a time
+# behind the model lock. Clients that still need language detection are decoded
+# individually.
+BATCH_INFERENCE = False
+
+# The maximum number of client windows (and speech chunks per model call) that
+# are decoded together.
+BATCH_MAX_SIZE = 8
+
+# How long (in milliseconds) the first request of a batch waits for other clients
+# to join it. Higher values give larger batches at the cost of added latency.
+BATCH_MAX_WAIT_MS = 50
+
+
+# Model Pool Settings
+# -------------------
+
+# The number of warm faster_whisper models shared by all connections when a
+# single model is used. Each transcription is dispatched to the least loaded
+# model, so up to this many clients are decoded in parallel. Memory grows with
+# the pool size, not with the number of connections. Takes precedence over
+# BATCH_INFERENCE when larger than 1.
+MODEL_POOL_SIZE = 1
+
+
+# Server Mode Settings
+# --------------------
+# These settings control how the server handles its websocket connections.
+
+# If enabled, all connections are served from a single asyncio event loop
+# instead of a receive thread and a transcription thread per connection. Model
+# work is handed to a bounded pool of ASYNC_WORKERS threads. Use this when a
+# single process holds many mostly idle bot connections.
+ASYNC_SERVER = False
+
+# The number of worker threads that run client initialization and
+# transcription passes in the asyncio server mode.
+ASYNC_WORKERS = 8
@@ -6,7 +6,7 @@ import logging
 import os
 import zlib
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 from inspect import signature
 from math import ceil
 from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
@@ -222,20 +222,36 @@ class BatchedInferencePipeline:
             for i, language_token in enumerate(language_tokens):
                 prompts[i][language_token_index] = language_token
 
+        # same decoding parameters as WhisperModel.generate_with_fallback for this temperature
+        temperature = options.temperatures[0]
+        if temperature > 0:
+            kwargs = {
+                "beam_size": 1,
+                "num_hypotheses": options.best_of,
+                "sampling_topk": 0,
+                "sampling_temperature": temperature,
+            }
+        else:
+            kwargs = {
+                "beam_size": options.beam_size,
+                "patience": options.patience,
+            }
+
         results = self.model.model.generate(
             encoder_output,
             prompts,
-            beam_size=options.beam_size,
-            patience=options.patience,
             length_penalty=options.length_penalty,
             max_length=max_length,
             suppress_blank=options.suppress_blank,
             suppress_tokens=options.suppress_tokens,
             return_scores=True,
             return_no_speech_prob=True,
-            sampling_temperature=options.temperatures[0],
             repetition_penalty=options.repetition_penalty,
             no_repeat_ngram_size=options.no_repeat_ngram_size,
+            max_initial_timestamp_index=int(
+                round(options.max_initial_timestamp / self.model.time_precision)
+            ),
+            **kwargs,
         )
 
         output = []
@@ -553,6 +569,256 @@ class BatchedInferencePipeline:
 
         return segments, info
 
+    def transcribe_batch(
+        self,
+        audios: List[np.ndarray],
+        language: str,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        best_of: int = 5,
+        patience: float = 1,
+        length_penalty: float = 1,
+        repetition_penalty: float = 1,
+        no_repeat_ngram_size: int = 0,
+        temperature: Union[float, List[float], Tuple[float, ...]] = [
+            0.0,
+            0.2,
+            0.4,
+            0.6,
+            0.8,
+            1.0,
+        ],
+        compression_ratio_threshold: Optional[float] = 2.4,
+        log_prob_threshold: Optional[float] = -1.0,
+        no_speech_threshold: Optional[float] = 0.6,
+        condition_on_previous_text: bool = True,
+        prompt_reset_on_temperature: float = 0.5,
+        initial_prompt: Optional[str] = None,
+        suppress_blank: bool = True,
+        suppress_tokens: Optional[List[int]] = [-1],
+        without_timestamps: bool = False,
+        max_initial_timestamp: float = 1.0,
+        max_new_tokens: Optional[int] = None,
+        hotwords: Optional[str] = None,
+        vad_filter: bool = True,
+        vad_parameters: Optional[Union[dict, VadOptions]] = None,
+        batch_size: int = 8,
+    ) -> List[Tuple[Optional[List[Segment]], Optional[TranscriptionInfo]]]:
+        """Transcribe several independent audio buffers in shared batches.
+
+        Unlike `transcribe`, which batches the speech chunks of a single audio, this
+        collects the speech chunks of every buffer in `audios` and runs them through
+        the encoder/decoder together. All buffers must share the language, task and
+        prompt since they are decoded with the same tokenizer and prompt.
+
+        The decoding options and their defaults are those of `WhisperModel.transcribe`,
+        so a buffer decodes the same way whether or not it was batched, with one
+        difference: every speech chunk is decoded independently, so
+        `condition_on_previous_text` and `prompt_reset_on_temperature` have no effect
+        (a speech chunk is at most 30 seconds, the window `WhisperModel.transcribe`
+        conditions on, so this only matters for buffers with several chunks).
+
+        Arguments:
+            audios: List of 16kHz mono float32 waveforms.
+            language: The language spoken in all of the buffers. Language detection is
+                not supported here; run `WhisperModel.transcribe` for that.
+            task: Task to execute (transcribe or translate).
+            temperature: Temperature for sampling. As in `WhisperModel.transcribe`, a
+                chunk failing `compression_ratio_threshold` or `log_prob_threshold` is
+                decoded again with the next temperature; the failed chunks of all
+                buffers are retried together.
+            vad_filter: Split each buffer into speech chunks with the Silero VAD model.
+                If False, every buffer (which must be shorter than 30 seconds) is
+                decoded as a single chunk.
+            vad_parameters: Dictionary of Silero VAD parameters or VadOptions class.
+            batch_size: The maximum number of chunks sent to the model in one call.
+
+            See `WhisperModel.transcribe` for the other arguments.
+
+        Returns:
+          One `(segments, info)` tuple per input buffer, in order. As with
+          `WhisperModel.transcribe`, `(None, None)` is returned for a buffer in which
+          no speech was found.
+        """
+        sampling_rate = self.model.feature_extractor.sampling_rate
+        chunk_length = self.model.feature_extractor.chunk_length
+
+        if not self.model.model.is_multilingual and language != "en":
+            language = "en"
+
+        if vad_filter:
+            if vad_parameters is None:
+                vad_parameters = VadOptions(max_speech_duration_s=chunk_length)
+            elif isinstance(vad_parameters, dict):
+                vad_parameters = VadOptions(
+                    **vad_parameters, max_speech_duration_s=chunk_length
+                )
+
+        all_features = []
+        all_metadata = []
+        owners = []
+        infos: List[Optional[TranscriptionInfo]] = []
+
+        tokenizer = Tokenizer(
+            self.model.hf_tokenizer,
+            self.model.model.is_multilingual,
+            task=task,
+            language=language,
+        )
+        options = TranscriptionOptions(
+            beam_size=beam_size,
+            best_of=best_of,
+            patience=patience,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            no_repeat_ngram_size=no_repeat_ngram_size,
+            log_prob_threshold=log_prob_threshold,
+            no_speech_threshold=no_speech_threshold,
+            compression_ratio_threshold=compression_ratio_threshold,
+            temperatures=(
+                list(temperature)
+                if isinstance(temperature, (list, tuple))
+                else [temperature]
+            ),
+            initial_prompt=initial_prompt,
+            prefix=None,
+            suppress_blank=suppress_blank,
+            suppress_tokens=(
+                get_suppressed_tokens(tokenizer, suppress_tokens)
+                if suppress_tokens
+                else suppress_tokens
+            ),
+            prepend_punctuations="\"'“¿([{-",
+            append_punctuations="\"'.。,，!！?？:：”)]}、",
+            max_new_tokens=max_new_tokens,
+            hotwords=hotwords,
+            word_timestamps=False,
+            hallucination_silence_threshold=None,
+            condition_on_previous_text=condition_on_previous_text,
+            clip_timestamps=[],
+            prompt_reset_on_temperature=prompt_reset_on_temperature,
+            multilingual=False,
+            without_timestamps=without_timestamps,
+            max_initial_timestamp=max_initial_timestamp,
+        )
+
+        for index, audio in enumerate(audios):
+            duration = audio.shape[0] / sampling_rate
+            if vad_filter:
+                active_segments = get_speech_timestamps(audio, vad_parameters)
+                clip_timestamps = merge_segments(active_segments, vad_parameters)
+            else:
+                clip_timestamps = [{"start": 0, "end": audio.shape[0]}]
+
+            duration_after_vad = (
+                sum((segment["end"] - segment["start"]) for segment in clip_timestamps)
+                / sampling_rate
+            )
+            if not duration_after_vad:
+                infos.append(None)
+                continue
+
+            audio_chunks, chunks_metadata = collect_chunks(audio, clip_timestamps)
+            for chunk, chunk_metadata in zip(audio_chunks, chunks_metadata):
+                all_features.append(
+                    pad_or_trim(self.model.feature_extractor(chunk)[..., :-1])
+                )
+                all_metadata.append(chunk_metadata)
+                owners.append(index)
+
+            infos.append(
+                TranscriptionInfo(
+                    language=language,
+                    language_probability=1,
+                    duration=duration,
+                    duration_after_vad=duration_after_vad,
+                    transcription_options=options,
+                    vad_options=vad_parameters,
+                    all_language_probs=None,
+                )
+            )
+
+        # per chunk: (segment dicts, options of the temperature they were decoded with)
+        chunk_results = [None] * len(all_features)
+        pending = list(range(len(all_features)))
+        for temperature_index, temperature in enumerate(options.temperatures):
+            temperature_options = replace(options, temperatures=[temperature])
+            is_last_temperature = temperature_index == len(options.temperatures) - 1
+            failed = []
+            for i in range(0, len(pending), batch_size):
+                indices = pending[i : i + batch_size]
+                results = self.forward(
+                    np.stack([all_features[j] for j in indices]),
+                    tokenizer,
+                    [all_metadata[j] for j in indices],
+                    temperature_options,
+                )
+                for j, result in zip(indices, results):
+                    chunk_results[j] = (result, temperature_options)
+                    if not is_last_temperature and self._needs_fallback(result, options):
+                        failed.append(j)
+            if not failed:
+                break
+            pending = failed
+
+        segments_per_audio: List[List[Segment]] = [[] for _ in audios]
+        for owner, (result, chunk_options) in zip(owners, chunk_results):
+            for segment in result:
+                segments_per_audio[owner].append(
+                    self._to_segment(
+                        segment, len(segments_per_audio[owner]) + 1, chunk_options
+                    )
+                )
+
+        return [
+            (segments, info) if info is not None else (None, None)
+            for segments, info in zip(segments_per_audio, infos)
+        ]
+
+    @staticmethod
+    def _needs_fallback(result: List[dict], options: TranscriptionOptions) -> bool:
+        """Whether a chunk decoded by `forward` fails the thresholds `WhisperModel.generate_with_fallback`
+        retries at a higher temperature."""
+        if not result:
+            return False
+        avg_logprob = result[0]["avg_logprob"]
+        no_speech_prob = result[0]["no_speech_prob"]
+        low_logprob = (
+            options.log_prob_threshold is not None
+            and avg_logprob < options.log_prob_threshold
+        )
+        if (
+            low_logprob
+            and options.no_speech_threshold is not None
+            and no_speech_prob > options.no_speech_threshold
+        ):
+            return False  # silence
+        text = "".join(segment["text"] for segment in result).strip()
+        too_repetitive = (
+            options.compression_ratio_threshold is not None
+            and get_compression_ratio(text) > options.compression_ratio_threshold
+        )
+        return too_repetitive or low_logprob
+
+    def _to_segment(self, segment: dict, seg_idx: int, options: TranscriptionOptions):
+        return Segment(
+            seek=segment["seek"],
+            id=seg_idx,
+            text=segment["text"],
+            start=round(segment["start"], 3),
+            end=round(segment["end"], 3),
+            words=(
+                None
+                if not options.word_timestamps
+                else [Word(**word) for word in segment["words"]]
+            ),
+            tokens=segment["tokens"],
+            avg_logprob=segment["avg_logprob"],
+            no_speech_prob=segment["no_speech_prob"],
+            compression_ratio=segment["compression_ratio"],
+            temperature=options.temperatures[0],
+        )
+
     def _batched_segments_generator(
         self, features, tokenizer, chunks_metadata, batch_size, options, log_progress
     ):
@@ -569,23 +835,7 @@ class BatchedInferencePipeline:
             for result in results:
                 for segment in result:
                     seg_idx += 1
-                    yield Segment(
-                        seek=segment["seek"],
-                        id=seg_idx,
-                        text=segment["text"],
-                        start=round(segment["start"], 3),
-                        end=round(segment["end"], 3),
-                        words=(
-                            None
-                            if not options.word_timestamps
-                            else [Word(**word) for word in segment["words"]]
-                        ),
-                        tokens=segment["tokens"],
-                        avg_logprob=segment["avg_logprob"],
-                        no_speech_prob=segment["no_speech_prob"],
-                        compression_ratio=segment["compression_ratio"],
-                        temperature=options.temperatures[0],
-                    )
+                    yield self._to_segment(segment, seg_idx, options)
 
                 pbar.update(1)
 
@@ -1,6 +1,8 @@
 import os
+import queue
 import subprocess
-import torch
+import threading
+from concurrent.futures import Future
 import numpy as np
 import onnxruntime
 import warnings
@@ -30,10 +32,11 @@ class VoiceActivityDetection():
             self.sample_rates = [8000, 16000]
 
     def _validate_input(self, x, sr: int):
-        if x.dim() == 1:
-            x = x.unsqueeze(0)
-        if x.dim() > 2:
-            raise ValueError(f"Too many dimensions for input audio chunk {x.dim()}")
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+        if x.ndim > 2:
+            raise ValueError(f"Too many dimensions for input audio chunk {x.ndim}")
 
         if sr != 16000 and (sr % 16000 == 0):
             step = sr // 16000
@@ -48,8 +51,10 @@ class VoiceActivityDetection():
         return x, sr
 
     def reset_states(self, batch_size=1):
-        self._state = torch.zeros((2, batch_size, 128)).float()
-        self._context = torch.zeros(0)
+        self._state = np.zeros((2, batch_size, 128), dtype=np.float32)
+        # model input: the context carried over from the previous window followed by the current window
+        self._input = None
+        self._sr = None
         self._last_sr = 0
         self._last_batch_size = 0
 
@@ -71,42 +76,39 @@ class VoiceActivityDetection():
         if (self._last_batch_size) and (self._last_batch_size != batch_size):
             self.reset_states(batch_size)
 
-        if not len(self._context):
-            self._context = torch.zeros(batch_size, context_size)
+        if self._input is None:
+            self._input = np.zeros((batch_size, context_size + num_samples), dtype=np.float32)
+            self._sr = np.array(sr, dtype=np.int64)
+        else:
+            self._input[:, :context_size] = self._input[:, -context_size:]
+        self._input[:, context_size:] = x
 
-        x = torch.cat([self._context, x], dim=1)
         if sr in [8000, 16000]:
-            ort_inputs = {'input': x.numpy(), 'state': self._state.numpy(), 'sr': np.array(sr, dtype='int64')}
-            ort_outs = self.session.run(None, ort_inputs)
-            out, state = ort_outs
-            self._state = torch.from_numpy(state)
+            ort_inputs = {'input': self._input, 'state': self._state, 'sr': self._sr}
+            out, self._state = self.session.run(None, ort_inputs)
         else:
             raise ValueError()
 
-        self._context = x[..., -context_size:]
         self._last_sr = sr
         self._last_batch_size = batch_size
 
-        out = torch.from_numpy(out)
         return out
 
     def audio_forward(self, x, sr: int):
-        outs = []
         x, sr = self._validate_input(x, sr)
         self.reset_states()
         num_samples = 512 if sr == 16000 else 256
 
         if x.shape[1] % num_samples:
             pad_num = num_samples - (x.shape[1] % num_samples)
-            x = torch.nn.functional.pad(x, (0, pad_num), 'constant', value=0.0)
+            x = np.pad(x, ((0, 0), (0, pad_num)), 'constant', constant_values=0.0)
 
-        for i in range(0, x.shape[1], num_samples):
+        outs = np.empty((x.shape[0], x.shape[1] // num_samples), dtype=np.float32)
+        for window, i in enumerate(range(0, x.shape[1], num_samples)):
             wavs_batch = x[:, i:i+num_samples]
-            out_chunk = self.__call__(wavs_batch, sr)
-            outs.append(out_chunk)
+            outs[:, window] = self.__call__(wavs_batch, sr)[:, 0]
 
-        stacked = torch.cat(outs, dim=1)
-        return stacked.cpu()
+        return outs
 
     @staticmethod
     def download(model_url="https://github.com/snakers4/silero-vad/raw/v5.0/files/silero_vad.onnx"):
@@ -153,5 +155,146 @@ class VoiceActivityDetector:
             bool: True if the speech probability exceeds the threshold, indicating the presence of voice activity;
                   False otherwise.
         """
-        speech_probs = self.model.audio_forward(torch.from_numpy(audio_frame.copy()), self.frame_rate)[0]
-        return torch.any(speech_probs > self.threshold).item()
+        speech_probs = self.model.audio_forward(audio_frame, self.frame_rate)[0]
+        return bool(np.any(speech_probs > self.threshold))
+
+
+class VadStreamState:
+    """Recurrent state, context and not yet processed samples of one audio stream."""
+
+    def __init__(self, context_size):
+        self.state = np.zeros((2, 128), dtype=np.float32)
+        self.context = np.zeros(context_size, dtype=np.float32)
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.is_speech = False
+
+
+class BatchedVoiceActivityDetector:
+    def __init__(self, threshold=0.5, frame_rate=16000):
+        """
+        Runs Silero VAD for many audio streams at once.
+
+        Unlike `VoiceActivityDetector`, which resets the model for every frame, each stream keeps its
+        recurrent state and context between frames. The 512-sample windows of all streams are stacked
+        into a single batched ONNX call per window step, so the number of `session.run` calls does not
+        grow with the number of streams.
+
+        Args:
+            threshold (float, optional): The probability threshold for detecting voice activity. Defaults to 0.5.
+            frame_rate (int, optional): Sample rate of the audio streams. Defaults to 16000.
+        """
+        self.model = VoiceActivityDetection()
+        self.threshold = threshold
+        self.frame_rate = frame_rate
+        self.num_samples = 512 if frame_rate == 16000 else 256
+        self.context_size = 64 if frame_rate == 16000 else 32
+        self.sr = np.array(frame_rate, dtype=np.int64)
+        self.streams = {}
+        self.requests = queue.Queue()
+        self.run_lock = threading.Lock()
+
+    def remove_stream(self, stream_id):
+        """Drops the state kept for `stream_id`."""
+        with self.run_lock:
+            self.streams.pop(stream_id, None)
+
+    def speech_probs(self, frames):
+        """
+        Computes speech probabilities for one new frame of each stream in a batched ONNX call per window step.
+
+        Samples that do not fill a whole window are kept and prepended to the stream's next frame.
+        The caller must not run this concurrently, `__call__` takes care of that.
+
+        Args:
+            frames (dict): Maps stream ids to their new audio frame (np.ndarray of float32 samples).
+
+        Returns:
+            dict: Maps stream ids to an np.ndarray with the speech probability of each complete window.
+        """
+        stream_ids = list(frames)
+        streams = []
+        windows = []
+        for stream_id in stream_ids:
+            stream = self.streams.get(stream_id)
+            if stream is None:
+                stream = self.streams[stream_id] = VadStreamState(self.context_size)
+            audio = np.asarray(frames[stream_id], dtype=np.float32)
+            if stream.pending.shape[0]:
+                audio = np.concatenate((stream.pending, audio))
+            num_windows = audio.shape[0] // self.num_samples
+            stream.pending = audio[num_windows * self.num_samples:].copy()
+            streams.append(stream)
+            windows.append(audio[:num_windows * self.num_samples].reshape(num_windows, self.num_samples))
+
+        probs = [np.empty(w.shape[0], dtype=np.float32) for w in windows]
+        num_steps = max((w.shape[0] for w in windows), default=0)
+        for step in range(num_steps):
+            active = [i for i, w in enumerate(windows) if w.shape[0] > step]
+            x = np.empty((len(active), self.context_size + self.num_samples), dtype=np.float32)
+            state = np.empty((2, len(active), 128), dtype=np.float32)
+            for row, i in enumerate(active):
+                x[row, :self.context_size] = streams[i].context
+                x[row, self.context_size:] = windows[i][step]
+                state[:, row] = streams[i].state
+
+            out, state = self.model.session.run(None, {'input': x, 'state': state, 'sr': self.sr})
+
+            for row, i in enumerate(active):
+                streams[i].state = state[:, row].copy()
+                streams[i].context = x[row, -self.context_size:].copy()
+                probs[i][step] = out[row, 0]
+
+        return dict(zip(stream_ids, probs))
+
+    def __call__(self, stream_id, audio_frame):
+        """
+        Determines if the given audio frame of a stream contains speech.
+
+        Safe to call from the receive threads of many clients: whichever thread gets to run the model
+        processes the frames of all threads waiting at that moment in one batch.
+
+        Args:
+            stream_id: Identifies the audio stream (e.g. the client uid).
+            audio_frame (np.ndarray): The next audio frame of the stream.
+
+        Returns:
+            bool: True if the speech probability of any window exceeds the threshold. If the frame did not
+                  complete a window, the result for the stream's previous frame.
+        """
+        future = Future()
+        self.requests.put((stream_id, audio_frame, future))
+        with self.run_lock:
+            if not future.done():
+                self._run_pending()
+        return future.result()
+
+    def _run_pending(self):
+        requests = []
+        while True:
+            try:
+                requests.append(self.requests.get_nowait())
+            except queue.Empty:
+                break
+
+        # frames of the same stream have to go through the model in order, one per round
+        rounds = []
+        for request in requests:
+            for round_requests in rounds:
+                if request[0] not in round_requests:
+                    round_requests[request[0]] = request
+                    break
+            else:
+                rounds.append({request[0]: request})
+
+        for round_requests in rounds:
+            try:
+                probs = self.speech_probs({stream_id: frame for stream_id, (_, frame, _) in round_requests.items()})
+            except Exception as e:
+                for _, _, future in round_requests.values():
+                    future.set_exception(e)
+                continue
+            for stream_id, (_, _, future) in round_requests.items():
+                stream = self.streams[stream_id]
+                if probs[stream_id].shape[0]:
+                    stream.is_speech = bool(np.any(probs[stream_id] > self.threshold))
+                future.set_result(stream.is_speech)
@@ -2,6 +2,8 @@ import logging
 import secrets
 import string
 import os
+import json
+import redis.asyncio as aioredis
 from fastapi import FastAPI, APIRouter, Depends, HTTPException, status, Security, Response
 from fastapi.security import APIKeyHeader
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -29,6 +31,11 @@ logger = logging.getLogger("admin_api")
 # App initialization
 app = FastAPI(title="Vexa Admin API")
 
+# Redis is only used to tell other services to drop cached token lookups
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
+CACHE_INVALIDATION_CHANNEL = os.environ.get("CACHE_INVALIDATION_CHANNEL", "cache_invalidation")
+redis_client: aioredis.Redis = None
+
 # --- Pydantic Schemas for new endpoint ---
 class WebhookUpdate(BaseModel):
     webhook_url: HttpUrl
@@ -295,9 +302,15 @@ async def delete_token(token_id: int, db: AsyncSession = Depends(get_db)):
         )
         
     # Delete the token
+    token_value = db_token.token
     await db.delete(db_token)
     await db.commit()
     logger.info(f"Admin deleted token ID: {token_id}")
+    if redis_client:
+        try:
+            await redis_client.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"type": "token", "token": token_value}))
+        except Exception as e:
+            logger.error(f"Failed to publish cache invalidation for token ID {token_id}: {e}", exc_info=True)
     # No body needed for 204 response
     return 
 
@@ -342,10 +355,22 @@ async def list_meetings_with_users(
 # App events
 @app.on_event("startup")
 async def startup_event():
+    global redis_client
     logger.info("Admin API starting up. Skipping automatic DB initialization.")
     # The 'migrate-or-init' Makefile target is now responsible for all DB setup.
     # await init_db()
-    pass
+    try:
+        redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+        await redis_client.ping()
+        logger.info("Connected to Redis for cache invalidation messages.")
+    except Exception as e:
+        logger.error(f"Failed to connect to Redis on startup: {e}. Token revocations will only reach caches after their TTL.", exc_info=True)
+        redis_client = None
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if redis_client:
+        await redis_client.close()
 
 # Include the admin router
 app.include_router(admin_router)
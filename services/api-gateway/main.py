@@ -3,6 +3,8 @@ from fastapi import FastAPI, Request, Response, HTTPException, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import APIKeyHeader
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
 import os
 from dotenv import load_dotenv
@@ -185,6 +187,25 @@ async def forward_request(client: httpx.AsyncClient, method: str, url: str, requ
         print(f"DEBUG: Request error: {exc}")
         raise HTTPException(status_code=503, detail=f"Service unavailable: {exc}")
 
+async def forward_streaming_request(client: httpx.AsyncClient, method: str, url: str, request: Request) -> Response:
+    """Like forward_request, but relays the downstream body chunk by chunk instead of buffering it."""
+    headers = {}
+    for header in ("x-api-key", "last-event-id"):
+        value = request.headers.get(header)
+        if value:
+            headers[header] = value
+    forwarded_params = dict(request.query_params)
+    try:
+        print(f"DEBUG: Streaming {method} request to {url}")
+        downstream_request = client.build_request(method, url, headers=headers, params=forwarded_params or None, timeout=httpx.Timeout(10.0, read=None))
+        resp = await client.send(downstream_request, stream=True)
+    except httpx.RequestError as exc:
+        print(f"DEBUG: Request error: {exc}")
+        raise HTTPException(status_code=503, detail=f"Service unavailable: {exc}")
+    excluded_headers = {"content-length", "transfer-encoding", "connection"}
+    response_headers = {k: v for k, v in resp.headers.items() if k.lower() not in excluded_headers}
+    return StreamingResponse(resp.aiter_raw(), status_code=resp.status_code, headers=response_headers, background=BackgroundTask(resp.aclose))
+
 # --- Root Endpoint --- 
 @app.get("/", tags=["General"], summary="API Gateway Root")
 async def root():
@@ -272,14 +293,30 @@ async def get_meetings_proxy(request: Request):
 @app.get("/transcripts/{platform}/{native_meeting_id}",
         tags=["Transcriptions"],
         summary="Get transcript for a specific meeting",
-        description="Retrieves the transcript segments for a meeting specified by its platform and native ID.",
+        description="Retrieves the transcript segments for a meeting specified by its platform and native ID. "
+                    "Pass 'limit' (and 'cursor' from the previous page's 'next_cursor') to paginate, "
+                    "or 'format=ndjson' to stream the meeting and one segment per line.",
         response_model=TranscriptionResponse,
         dependencies=[Depends(api_key_scheme)])
 async def get_transcript_proxy(platform: Platform, native_meeting_id: str, request: Request):
     """Forward request to Transcription Collector to get a transcript."""
     url = f"{TRANSCRIPTION_COLLECTOR_URL}/transcripts/{platform.value}/{native_meeting_id}"
+    if request.query_params.get("format") == "ndjson":
+        return await forward_streaming_request(app.state.http_client, "GET", url, request)
     return await forward_request(app.state.http_client, "GET", url, request)
 
+@app.get("/transcripts/{platform}/{native_meeting_id}/live",
+        tags=["Transcriptions"],
+        summary="Subscribe to live transcript updates",
+        description="Server-Sent Events stream of the segments created or changed ('segments' events) and removed ('removed' events) in a meeting. "
+                    "Pass 'since' (the 'change_cursor' of a transcript response) to receive the changes made after it first; "
+                    "reconnecting EventSource clients resume from their Last-Event-ID.",
+        dependencies=[Depends(api_key_scheme)])
+async def get_live_transcript_proxy(platform: Platform, native_meeting_id: str, request: Request):
+    """Forward a live transcript subscription to Transcription Collector."""
+    url = f"{TRANSCRIPTION_COLLECTOR_URL}/transcripts/{platform.value}/{native_meeting_id}/live"
+    return await forward_streaming_request(app.state.http_client, "GET", url, request)
+
 @app.patch("/meetings/{platform}/{native_meeting_id}",
            tags=["Transcriptions"],
            summary="Update meeting data",
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared_models.models import Meeting, Transcription, TranscriptionArchive
+from shared_models.database import async_session_local
+from shared_models.transcript_archive import ARCHIVE_FORMAT, encode_segments, decode_segments
+
+from config import (
+    IMMUTABILITY_THRESHOLD,
+    REDIS_URL,
+    TRANSCRIPT_ARCHIVE_GRACE_PERIOD,
+    TRANSCRIPT_ARCHIVE_ENABLED,
+    TRANSCRIPT_ARCHIVE_FLUSH_TIMEOUT,
+    TRANSCRIPT_ARCHIVE_POLL_INTERVAL,
+    TRANSCRIPT_ARCHIVE_PENDING_KEY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows deleted per statement, below the PostgreSQL bind parameter limit
+DELETE_CHUNK_SIZE = 5000
+
+
+async def run(meeting: Meeting, db: AsyncSession):
+    """
+    Queues the transcript of a completed meeting for moving from the transcriptions table into one
+    compressed TranscriptionArchive blob.
+
+    The last segments reach PostgreSQL only after the collector's immutability threshold, so the
+    meeting is recorded in the TRANSCRIPT_ARCHIVE_PENDING_KEY sorted set (scored by queue time) and
+    archived by archive_pending_transcripts once its Redis segment hash is empty and it has been
+    queued for longer than IMMUTABILITY_THRESHOLD plus TRANSCRIPT_ARCHIVE_GRACE_PERIOD. The marker
+    lives in Redis, so pending archives survive a bot-manager restart. The collector queues a meeting
+    again when it persists rows for a meeting that already has an archive.
+    """
+    if not TRANSCRIPT_ARCHIVE_ENABLED:
+        return
+    if meeting.status != 'completed':
+        logger.info(f"Meeting {meeting.id} ended with status '{meeting.status}', not archiving its transcript.")
+        return
+    redis_c = aioredis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        await redis_c.zadd(TRANSCRIPT_ARCHIVE_PENDING_KEY, {str(meeting.id): time.time()}, nx=True)
+    finally:
+        await redis_c.close()
+    logger.info(f"Queued transcript archiving for meeting {meeting.id}.")
+
+
+async def archive_pending_transcripts(redis_c: aioredis.Redis):
+    """Background task archiving the queued meetings whose segments have all reached PostgreSQL.
+
+    A meeting stays queued until it is archived: failures are retried on the next pass, and a
+    meeting still holding segments in Redis after TRANSCRIPT_ARCHIVE_FLUSH_TIMEOUT is reported
+    (once per timeout period) but kept waiting.
+    """
+    logger.info("Starting transcript archive task...")
+    while True:
+        try:
+            await asyncio.sleep(TRANSCRIPT_ARCHIVE_POLL_INTERVAL)
+            pending = await redis_c.zrange(TRANSCRIPT_ARCHIVE_PENDING_KEY, 0, -1, withscores=True)
+            for meeting_id_str, queued_at in pending:
+                await archive_pending_meeting(redis_c, int(meeting_id_str), queued_at)
+        except asyncio.CancelledError:
+            logger.info("Transcript archive task cancelled.")
+            break
+        except redis.exceptions.ConnectionError as e:
+            logger.error(f"Redis connection error in transcript archive task: {e}. Retrying after delay...", exc_info=True)
+            await asyncio.sleep(5)
+        except Exception as e:
+            logger.error(f"Unhandled error in transcript archive task: {e}", exc_info=True)
+
+
+async def archive_pending_meeting(redis_c: aioredis.Redis, meeting_id: int, queued_at: float):
+    """Archives one queued meeting if the collector has flushed it, and removes it from the queue."""
+    # Segments still in flight (e.g. the bot's last stream messages) may reach the hash after it looked empty
+    if time.time() - queued_at <= IMMUTABILITY_THRESHOLD + TRANSCRIPT_ARCHIVE_GRACE_PERIOD:
+        return
+    if await redis_c.hlen(f"meeting:{meeting_id}:segments"):
+        if time.time() - queued_at > TRANSCRIPT_ARCHIVE_FLUSH_TIMEOUT:
+            logger.warning(f"Segments of meeting {meeting_id} still in Redis after {TRANSCRIPT_ARCHIVE_FLUSH_TIMEOUT}s, transcript archiving keeps waiting.")
+            # Re-scored so the warning repeats once per timeout period
+            await redis_c.zadd(TRANSCRIPT_ARCHIVE_PENDING_KEY, {str(meeting_id): time.time()}, xx=True)
+        return
+
+    async with async_session_local() as db:
+        try:
+            archived_count = await archive_meeting_transcript(db, meeting_id)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Failed to archive transcript of meeting {meeting_id}, retrying later: {e}", exc_info=True)
+            return
+    await redis_c.zrem(TRANSCRIPT_ARCHIVE_PENDING_KEY, str(meeting_id))
+    if archived_count:
+        logger.info(f"Archived {archived_count} transcript segments of meeting {meeting_id}.")
+
+
+async def archive_meeting_transcript(db: AsyncSession, meeting_id: int) -> int:
+    """
+    Packs the meeting's Transcription rows into its TranscriptionArchive (merging with an existing
+    archive, e.g. for segments persisted after an earlier run) and deletes the archived rows.
+    Returns the number of rows moved. The caller commits.
+    """
+    result = await db.execute(select(Transcription).where(Transcription.meeting_id == meeting_id))
+    rows = result.scalars().all()
+    if not rows:
+        return 0
+
+    result_archive = await db.execute(select(TranscriptionArchive).where(TranscriptionArchive.meeting_id == meeting_id))
+    archive = result_archive.scalars().first()
+    segments = list(rows)
+    if archive is not None:
+        segments += [SimpleNamespace(**segment) for segment in decode_segments(archive.data)]
+    # Segments without a resolved absolute time (unknown session) go last, as relative times
+    segments.sort(key=lambda s: (s.absolute_start_time is None, s.absolute_start_time.timestamp() if s.absolute_start_time else 0.0, s.start_time))
+
+    data = encode_segments(segments)
+    if archive is None:
+        archive = TranscriptionArchive(meeting_id=meeting_id)
+        db.add(archive)
+    archive.format = ARCHIVE_FORMAT
+    archive.segment_count = len(segments)
+    archive.data = data
+
+    row_ids = [row.id for row in rows]
+    for chunk_start in range(0, len(row_ids), DELETE_CHUNK_SIZE):
+        await db.execute(delete(Transcription).where(Transcription.id.in_(row_ids[chunk_start:chunk_start + DELETE_CHUNK_SIZE])))
+    logger.debug(f"Meeting {meeting_id} archive: {len(segments)} segments in {len(data)} bytes.")
+    return len(rows)
@@ -3,6 +3,17 @@ import os
 REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
 BOT_IMAGE_NAME = os.environ.get("BOT_IMAGE_NAME", "vexa-bot:dev")
 DOCKER_NETWORK = os.environ.get("DOCKER_NETWORK", "vexa_default")
+# Pub/sub channel telling transcription-collector to drop cached token/meeting lookups
+CACHE_INVALIDATION_CHANNEL = os.environ.get("CACHE_INVALIDATION_CHANNEL", "cache_invalidation")
+
+# Cold storage of finished meetings' transcripts (see app/tasks/bot_exit_tasks/archive_transcription.py)
+TRANSCRIPT_ARCHIVE_ENABLED = os.environ.get("TRANSCRIPT_ARCHIVE_ENABLED", "true").lower() == "true"
+TRANSCRIPT_ARCHIVE_FLUSH_TIMEOUT = int(os.environ.get("TRANSCRIPT_ARCHIVE_FLUSH_TIMEOUT", "600"))  # seconds after which a meeting still not flushed by the collector is reported
+TRANSCRIPT_ARCHIVE_POLL_INTERVAL = int(os.environ.get("TRANSCRIPT_ARCHIVE_POLL_INTERVAL", "15"))  # seconds
+TRANSCRIPT_ARCHIVE_PENDING_KEY = "transcript_archive_pending"  # Redis sorted set of meetings waiting to be archived
+# The collector's IMMUTABILITY_THRESHOLD: its last segments may still be written to Redis that long after the meeting ended
+IMMUTABILITY_THRESHOLD = int(os.environ.get("IMMUTABILITY_THRESHOLD", "30"))  # seconds
+TRANSCRIPT_ARCHIVE_GRACE_PERIOD = int(os.environ.get("TRANSCRIPT_ARCHIVE_GRACE_PERIOD", "60"))  # seconds waited beyond IMMUTABILITY_THRESHOLD before a queued meeting is archived
 
 # Lock settings
 LOCK_TIMEOUT_SECONDS = 300 # 5 minutes
@@ -16,7 +16,7 @@ import httpx
 # from app.database.service import TranscriptionService # Not used here
 # from app.tasks.monitoring import celery_app # Not used here
 
-from config import BOT_IMAGE_NAME, REDIS_URL
+from config import BOT_IMAGE_NAME, REDIS_URL, CACHE_INVALIDATION_CHANNEL, TRANSCRIPT_ARCHIVE_ENABLED
 from docker_utils import get_socket_session, close_docker_client, start_bot_container, stop_bot_container, _record_session_start, get_running_bots_status, verify_container_running
 from shared_models.database import init_db, get_db, async_session_local
 from shared_models.models import User, Meeting, MeetingSession, Transcription # <--- ADD MeetingSession and Transcription import
@@ -28,6 +28,7 @@ from sqlalchemy import and_, desc
 from datetime import datetime # For start_time
 
 from app.tasks.bot_exit_tasks import run_all_tasks
+from app.tasks.bot_exit_tasks.archive_transcription import archive_pending_transcripts
 
 # Configure logging
 logging.basicConfig(
@@ -51,6 +52,7 @@ app.add_middleware(
 # --- ADD Redis Client Global ---
 redis_client: Optional[aioredis.Redis] = None
 # --------------------------------
+transcript_archive_task: Optional[asyncio.Task] = None
 
 # Pydantic models - Use schemas from shared_models
 # class BotRequest(BaseModel): ... -> Replaced by MeetingCreate
@@ -72,6 +74,7 @@ class BotExitCallbackPayload(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     global redis_client # <-- Add global reference
+    global transcript_archive_task
     logger.info("Starting up Bot Manager...")
     # await init_db() # Removed - Admin API should handle this
     # await init_redis() # Removed redis init if not used elsewhere
@@ -91,6 +94,9 @@ async def startup_event():
         redis_client = None # Ensure client is None if connection fails
     # --------------------------------------
 
+    if redis_client and TRANSCRIPT_ARCHIVE_ENABLED:
+        transcript_archive_task = asyncio.create_task(archive_pending_transcripts(redis_client))
+
     logger.info("Database, Docker Client (attempted), and Redis Client (attempted) initialized.")
 
 @app.on_event("shutdown")
@@ -99,6 +105,13 @@ async def shutdown_event():
     logger.info("Shutting down Bot Manager...")
     # await close_redis() # Removed redis close if not used
 
+    if transcript_archive_task:
+        transcript_archive_task.cancel()
+        try:
+            await transcript_archive_task
+        except asyncio.CancelledError:
+            pass
+
     # --- ADD Redis Client Closing ---
     if redis_client:
         logger.info("Closing Redis connection...")
@@ -221,6 +234,17 @@ async def request_bot(
         await db.refresh(new_meeting)
         meeting_id_for_bot = new_meeting.id # Use this for the bot
         logger.info(f"Created new meeting record with ID: {meeting_id_for_bot}")
+        # The collector caches the latest meeting per (user, platform, native ID); make it look up the new one
+        if redis_client:
+            try:
+                await redis_client.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({
+                    "type": "meeting",
+                    "user_id": current_user.id,
+                    "platform": req.platform.value,
+                    "native_meeting_id": native_meeting_id
+                }))
+            except Exception as e:
+                logger.error(f"Failed to publish meeting cache invalidation for meeting {meeting_id_for_bot}: {e}", exc_info=True)
     else: # This case should ideally not be reached if the 409 was raised correctly above.
           # This implies existing_meeting was found and its container was running.
         logger.error(f"Logic error: Should have raised 409 for existing meeting {existing_meeting.id}, but proceeding.")
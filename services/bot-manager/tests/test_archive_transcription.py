@@ -0,0 +1,189 @@
+import json
+import time
+import zlib
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.sql.dml import Delete
+
+from shared_models.models import Base, Transcription, TranscriptionArchive
+from shared_models.transcript_archive import ARCHIVE_FORMAT, encode_segments, decode_segments
+from app.tasks.bot_exit_tasks import archive_transcription
+from app.tasks.bot_exit_tasks.archive_transcription import archive_meeting_transcript, archive_pending_meeting
+from config import IMMUTABILITY_THRESHOLD, TRANSCRIPT_ARCHIVE_GRACE_PERIOD, TRANSCRIPT_ARCHIVE_PENDING_KEY
+
+SESSION_START = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def settled_queue_time():
+    """A queue time old enough for the meeting's last segments to have reached Redis."""
+    return time.time() - IMMUTABILITY_THRESHOLD - TRANSCRIPT_ARCHIVE_GRACE_PERIOD - 1
+
+
+def make_transcription(meeting_id, start, text, session_start=SESSION_START):
+    return Transcription(
+        meeting_id=meeting_id,
+        start_time=start,
+        end_time=start + 1.0,
+        text=text,
+        speaker="Alice",
+        language="en",
+        session_uid="session-1",
+        created_at=datetime(2025, 1, 1, 13, 0),
+        absolute_start_time=session_start + timedelta(seconds=start) if session_start else None,
+        absolute_end_time=session_start + timedelta(seconds=start + 1.0) if session_start else None,
+    )
+
+
+class ArchiveTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Transcription.__table__, TranscriptionArchive.__table__])
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def add_rows(self, rows):
+        async with self.session_factory() as db:
+            db.add_all(rows)
+            await db.commit()
+
+    async def load_archive(self, meeting_id):
+        async with self.session_factory() as db:
+            archive = (await db.execute(select(TranscriptionArchive).where(TranscriptionArchive.meeting_id == meeting_id))).scalars().first()
+            remaining = (await db.execute(select(Transcription).where(Transcription.meeting_id == meeting_id))).scalars().all()
+        return archive, remaining
+
+
+class TestArchiveMeetingTranscript(ArchiveTestCase):
+    async def test_moves_rows_into_archive(self):
+        await self.add_rows([make_transcription(1, 2.0, "second"), make_transcription(1, 0.0, "first"), make_transcription(2, 0.0, "other meeting")])
+
+        async with self.session_factory() as db:
+            self.assertEqual(await archive_meeting_transcript(db, 1), 2)
+            await db.commit()
+
+        archive, remaining = await self.load_archive(1)
+        self.assertEqual(remaining, [])
+        self.assertEqual(archive.format, ARCHIVE_FORMAT)
+        self.assertEqual(archive.segment_count, 2)
+        self.assertEqual([s["text"] for s in decode_segments(archive.data)], ["first", "second"])
+        _, other_remaining = await self.load_archive(2)
+        self.assertEqual(len(other_remaining), 1)
+
+    async def test_no_rows_is_a_no_op(self):
+        async with self.session_factory() as db:
+            self.assertEqual(await archive_meeting_transcript(db, 1), 0)
+            await db.commit()
+        archive, _ = await self.load_archive(1)
+        self.assertIsNone(archive)
+
+    async def test_merges_into_existing_archive(self):
+        await self.add_rows([make_transcription(1, 0.0, "first"), make_transcription(1, 4.0, "third")])
+        async with self.session_factory() as db:
+            await archive_meeting_transcript(db, 1)
+            await db.commit()
+        # Persisted after the first run, e.g. by a collector replica lagging behind
+        await self.add_rows([make_transcription(1, 2.0, "second"), make_transcription(1, 1.0, "unresolved", session_start=None)])
+
+        async with self.session_factory() as db:
+            self.assertEqual(await archive_meeting_transcript(db, 1), 2)
+            await db.commit()
+
+        archive, remaining = await self.load_archive(1)
+        self.assertEqual(remaining, [])
+        self.assertEqual(archive.segment_count, 4)
+        # Segments without an absolute time go last
+        self.assertEqual([s["text"] for s in decode_segments(archive.data)], ["first", "second", "third", "unresolved"])
+
+    async def test_deletes_rows_in_chunks(self):
+        await self.add_rows([make_transcription(1, float(i), f"segment {i}") for i in range(5)])
+
+        async with self.session_factory() as db:
+            with mock.patch.object(archive_transcription, "DELETE_CHUNK_SIZE", 2), \
+                    mock.patch.object(db, "execute", wraps=db.execute) as execute:
+                self.assertEqual(await archive_meeting_transcript(db, 1), 5)
+            await db.commit()
+
+        deletes = [call.args[0] for call in execute.call_args_list if isinstance(call.args[0], Delete)]
+        self.assertEqual(len(deletes), 3)
+        archive, remaining = await self.load_archive(1)
+        self.assertEqual(remaining, [])
+        self.assertEqual(archive.segment_count, 5)
+
+
+class TestArchivePendingMeeting(ArchiveTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.redis_c = mock.AsyncMock()
+        patcher = mock.patch.object(archive_transcription, "async_session_local", self.session_factory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_waits_for_segments_in_redis(self):
+        await self.add_rows([make_transcription(1, 0.0, "first")])
+        self.redis_c.hlen.return_value = 3
+
+        await archive_pending_meeting(self.redis_c, 1, settled_queue_time())
+
+        self.redis_c.zrem.assert_not_called()
+        archive, remaining = await self.load_archive(1)
+        self.assertIsNone(archive)
+        self.assertEqual(len(remaining), 1)
+
+    async def test_archives_flushed_meeting_and_clears_marker(self):
+        await self.add_rows([make_transcription(1, 0.0, "first")])
+        self.redis_c.hlen.return_value = 0
+
+        await archive_pending_meeting(self.redis_c, 1, settled_queue_time())
+
+        self.redis_c.zrem.assert_awaited_once_with(TRANSCRIPT_ARCHIVE_PENDING_KEY, "1")
+        archive, _ = await self.load_archive(1)
+        self.assertEqual(archive.segment_count, 1)
+
+    async def test_keeps_marker_when_archiving_fails(self):
+        self.redis_c.hlen.return_value = 0
+        with mock.patch.object(archive_transcription, "archive_meeting_transcript", side_effect=RuntimeError("db down")):
+            await archive_pending_meeting(self.redis_c, 1, settled_queue_time())
+        self.redis_c.zrem.assert_not_called()
+
+    async def test_waits_for_segments_in_flight_after_queueing(self):
+        await self.add_rows([make_transcription(1, 0.0, "first")])
+        self.redis_c.hlen.return_value = 0
+
+        # the hash is empty, but the collector may not have received the last segments yet
+        await archive_pending_meeting(self.redis_c, 1, time.time() - IMMUTABILITY_THRESHOLD)
+
+        self.redis_c.zrem.assert_not_called()
+        archive, remaining = await self.load_archive(1)
+        self.assertIsNone(archive)
+        self.assertEqual(len(remaining), 1)
+
+
+class TestTranscriptArchiveCodec(unittest.TestCase):
+    def test_round_trip(self):
+        rows = [make_transcription(1, 0.0, "first"), make_transcription(1, 1.5, "second", session_start=None)]
+        segments = decode_segments(encode_segments(rows))
+
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(segments[0]["text"], "first")
+        self.assertEqual(segments[0]["start_time"], 0.0)
+        self.assertEqual(segments[0]["absolute_start_time"], SESSION_START)
+        self.assertEqual(segments[0]["absolute_end_time"], SESSION_START + timedelta(seconds=1))
+        self.assertIsNone(segments[1]["absolute_start_time"])
+        # created_at is naive UTC in the transcriptions table and stays naive
+        self.assertEqual(segments[0]["created_at"], datetime(2025, 1, 1, 13, 0))
+        self.assertIsNone(segments[0]["created_at"].tzinfo)
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            decode_segments(zlib.compress(json.dumps({"format": "other", "columns": {}}).encode()))
+
+
+if __name__ == "__main__":
+    unittest.main()
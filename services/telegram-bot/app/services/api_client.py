@@ -138,12 +138,14 @@ class VexaAPIClient:
         self,
         api_key: str,
         platform: str,
-        native_meeting_id: str
+        native_meeting_id: str,
+        since: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get transcript for meeting"""
+        """Get transcript for meeting, or only the segments changed after a previous 'change_cursor'"""
         headers = {"X-API-Key": api_key}
         return await self._make_request(
             "GET",
             f"{self.gateway_url}/transcripts/{platform}/{native_meeting_id}",
-            headers=headers
+            headers=headers,
+            params={"since": since} if since else None
         ) 
\ No newline at end of file
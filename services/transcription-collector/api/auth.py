@@ -9,17 +9,22 @@ from config import API_KEY_NAME
 # Imports from shared libraries
 from shared_models.database import get_db
 from shared_models.models import APIToken, User
+from lookup_cache import CachedUser, user_cache
 
 logger = logging.getLogger(__name__)
 
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
 async def get_current_user(api_key: str = Security(api_key_header),
-                           db: AsyncSession = Depends(get_db)) -> User:
-    """Dependency to verify X-API-Key and return the associated User."""
+                           db: AsyncSession = Depends(get_db)) -> CachedUser:
+    """Dependency to verify X-API-Key and return the associated user."""
     if not api_key:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Missing API token")
 
+    user_obj = user_cache.get(api_key)
+    if user_obj is not None:
+        return user_obj
+
     # Find the token in the database
     result = await db.execute(
         select(APIToken, User)
@@ -36,4 +41,6 @@ async def get_current_user(api_key: str = Security(api_key_header),
         )
 
     _token_obj, user_obj = token_user
+    user_obj = CachedUser.from_model(user_obj)
+    user_cache.set(api_key, user_obj)
     return user_obj 
\ No newline at end of file
@@ -1,15 +1,22 @@
+import re
+import base64
 import logging
 import json
+import time
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Tuple
+from typing import AsyncIterator, List, Optional, Dict, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy import select, and_, func, distinct, text
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_, func, distinct, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 import redis.asyncio as aioredis
 
-from shared_models.database import get_db
-from shared_models.models import User, Meeting, Transcription, MeetingSession
+from shared_models.database import get_db, async_session_local
+from shared_models.models import User, Meeting, Transcription, MeetingSession, TranscriptionArchive
+from shared_models.transcript_archive import decode_segments
 from shared_models.schemas import (
     HealthResponse,
     MeetingResponse,
@@ -20,110 +27,281 @@ from shared_models.schemas import (
     MeetingUpdate
 )
 
-from config import IMMUTABILITY_THRESHOLD
+from config import IMMUTABILITY_THRESHOLD, REDIS_SEGMENT_UPDATES_KEY, TRANSCRIPT_STREAM_FETCH_SIZE, REDIS_SEGMENT_CHANGES_RETENTION, LIVE_UPDATES_KEEPALIVE
 from filters import TranscriptionFilter
 from api.auth import get_current_user
+from lookup_cache import CachedUser
+from streaming.live_updates import live_transcript_hub, current_change_cursor, change_feed_key, parse_change_entry, parse_stream_id
+from streaming.processors import get_session_times, resolve_session_start, absolute_times, parse_absolute_time
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-async def _get_full_transcript_segments(
+def _parse_redis_segment(start_time_str: str, segment_json: str) -> Tuple[Optional[str], TranscriptionSegment]:
+    """Builds the segment stored in Redis under `start_time_str`; returns (session_uid, segment).
+    The absolute times are the ones resolved at write time, None for segments written before their session start was known."""
+    segment_data = json.loads(segment_json)
+    segment_obj = TranscriptionSegment(
+        start_time=float(start_time_str),
+        end_time=segment_data['end_time'],
+        text=segment_data['text'],
+        language=segment_data.get('language'),
+        speaker=segment_data.get('speaker'),
+        absolute_start_time=parse_absolute_time(segment_data.get('absolute_start_time')),
+        absolute_end_time=parse_absolute_time(segment_data.get('absolute_end_time'))
+    )
+    return segment_data.get("session_uid"), segment_obj
+
+
+async def _build_redis_segments(
     internal_meeting_id: int,
-    db: AsyncSession,
-    redis_c: aioredis.Redis
-) -> List[TranscriptionSegment]:
+    redis_segments_raw: Dict[str, str]
+) -> List[Tuple[str, str, TranscriptionSegment]]:
     """
-    Core logic to fetch and merge transcript segments from PG and Redis.
+    Parses Redis segments into (session_uid, start key, segment) sorted by absolute start time.
+    Segments without absolute times get them from the cached session start times; those of an
+    unknown session are dropped.
     """
-    logger.debug(f"[_get_full_transcript_segments] Fetching for meeting ID {internal_meeting_id}")
-    
-    # 1. Fetch session start times for this meeting
-    stmt_sessions = select(MeetingSession).where(MeetingSession.meeting_id == internal_meeting_id)
-    result_sessions = await db.execute(stmt_sessions)
-    sessions = result_sessions.scalars().all()
-    session_times: Dict[str, datetime] = {session.session_uid: session.session_start_time for session in sessions}
-    if not session_times:
-        logger.warning(f"[_get_full_transcript_segments] No session start times found in DB for meeting {internal_meeting_id}.")
+    parsed: List[Tuple[str, str, TranscriptionSegment]] = []
+    unresolved: List[Tuple[str, str, TranscriptionSegment]] = []
+    for start_time_str, segment_json in redis_segments_raw.items():
+        try:
+            session_uid, segment_obj = _parse_redis_segment(start_time_str, segment_json)
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
+            logger.error(f"[_build_redis_segments] Error parsing Redis segment {start_time_str} for meeting {internal_meeting_id}: {e}")
+            continue
+        if not session_uid:
+            continue
+        item = (session_uid, start_time_str, segment_obj)
+        (parsed if segment_obj.absolute_start_time else unresolved).append(item)
 
-    # 2. Fetch transcript segments from PostgreSQL (immutable segments)
-    stmt_transcripts = select(Transcription).where(Transcription.meeting_id == internal_meeting_id)
-    result_transcripts = await db.execute(stmt_transcripts)
-    db_segments = result_transcripts.scalars().all()
+    if unresolved:
+        async with async_session_local() as db:
+            session_times = await get_session_times(db, internal_meeting_id, unresolved[0][0])
+        for item in unresolved:
+            segment_obj = item[2]
+            segment_obj.absolute_start_time, segment_obj.absolute_end_time = absolute_times(
+                resolve_session_start(session_times, item[0]), segment_obj.start_time, segment_obj.end_time
+            )
+            if segment_obj.absolute_start_time:
+                parsed.append(item)
+    parsed.sort(key=lambda item: item[2].absolute_start_time)
+    return parsed
 
-    # 3. Fetch segments from Redis (mutable segments)
+
+async def _fetch_redis_tail(internal_meeting_id: int, redis_c: aioredis.Redis) -> List[Tuple[str, str, TranscriptionSegment]]:
+    """Returns the mutable Redis segments of a meeting as (session_uid, start key, segment), sorted by absolute start time."""
     hash_key = f"meeting:{internal_meeting_id}:segments"
     redis_segments_raw = {}
     if redis_c:
         try:
             redis_segments_raw = await redis_c.hgetall(hash_key)
         except Exception as e:
-            logger.error(f"[_get_full_transcript_segments] Failed to fetch from Redis hash {hash_key}: {e}", exc_info=True)
+            logger.error(f"[_fetch_redis_tail] Failed to fetch from Redis hash {hash_key}: {e}", exc_info=True)
+    return await _build_redis_segments(internal_meeting_id, redis_segments_raw)
 
-    # 4. Calculate absolute times and merge segments
-    merged_segments_with_abs_time: Dict[str, Tuple[datetime, TranscriptionSegment]] = {}
 
-    for segment in db_segments:
-        key = f"{segment.start_time:.3f}"
-        session_uid = segment.session_uid
-        session_start = session_times.get(session_uid)
-        if session_uid and session_start:
-            try:
-                if session_start.tzinfo is None:
-                    session_start = session_start.replace(tzinfo=timezone.utc)
-                absolute_start_time = session_start + timedelta(seconds=segment.start_time)
-                absolute_end_time = session_start + timedelta(seconds=segment.end_time)
-                segment_obj = TranscriptionSegment(
-                    start_time=segment.start_time,
-                    end_time=segment.end_time,
-                    text=segment.text,
-                    language=segment.language,
-                    speaker=segment.speaker,
-                    created_at=segment.created_at,
-                    absolute_start_time=absolute_start_time,
-                    absolute_end_time=absolute_end_time
-                )
-                merged_segments_with_abs_time[key] = (absolute_start_time, segment_obj)
-            except Exception as calc_err:
-                 logger.error(f"[API Meet {internal_meeting_id}] Error calculating absolute time for DB segment {key} (UID: {session_uid}): {calc_err}")
-        else:
-            logger.warning(f"[API Meet {internal_meeting_id}] Missing session UID ({session_uid}) or start time for DB segment {key}. Cannot calculate absolute time.")
+async def _load_archived_segments(internal_meeting_id: int, db: AsyncSession) -> List[Tuple[str, str, TranscriptionSegment]]:
+    """Returns the segments of the meeting's cold storage archive, if any, as (session_uid, start key, segment) sorted by absolute start time."""
+    result_archive = await db.execute(select(TranscriptionArchive).where(TranscriptionArchive.meeting_id == internal_meeting_id))
+    archive = result_archive.scalars().first()
+    if archive is None:
+        return []
+    archived: List[Tuple[str, str, TranscriptionSegment]] = []
+    for segment in decode_segments(archive.data):
+        if segment["absolute_start_time"] is None:
+            continue
+        archived.append((segment["session_uid"], f"{segment['start_time']:.3f}", TranscriptionSegment(
+            start_time=segment["start_time"],
+            end_time=segment["end_time"],
+            text=segment["text"],
+            language=segment["language"],
+            speaker=segment["speaker"],
+            created_at=segment["created_at"],
+            absolute_start_time=segment["absolute_start_time"],
+            absolute_end_time=segment["absolute_end_time"]
+        )))
+    archived.sort(key=lambda item: item[2].absolute_start_time)
+    logger.debug(f"[_load_archived_segments] Decoded {len(archived)} archived segments for meeting {internal_meeting_id}")
+    return archived
+
+
+async def _build_changed_segments(
+    internal_meeting_id: int,
+    changed: Dict[str, Optional[str]]
+) -> Tuple[List[TranscriptionSegment], List[float]]:
+    """Splits parsed change feed entries into the changed segments (ordered by absolute start time)
+    and the start times of the removed ones."""
+    removed = sorted(float(start_key) for start_key, segment_json in changed.items() if segment_json is None)
+    changed_segments = {start_key: segment_json for start_key, segment_json in changed.items() if segment_json is not None}
+    segments = [segment_obj for _, _, segment_obj in await _build_redis_segments(internal_meeting_id, changed_segments)]
+    return segments, removed
+
+
+async def _get_transcript_changes(
+    internal_meeting_id: int,
+    redis_c: aioredis.Redis,
+    since: str
+) -> Optional[Tuple[List[TranscriptionSegment], List[float], str]]:
+    """
+    Returns the segments created or changed after the `since` cursor (latest version per start
+    key, ordered by absolute start time), the start times of the segments removed after it, and
+    the cursor for the next poll. Returns None if the change feed can no longer answer for that
+    cursor, in which case the full transcript is needed.
+    """
+    since_ms = int(since.split("-")[0])
+    if not redis_c or since_ms < (time.time() - REDIS_SEGMENT_CHANGES_RETENTION) * 1000:
+        return None
+    try:
+        entries = await redis_c.xrange(change_feed_key(internal_meeting_id), min=f"({since}", max="+")
+    except Exception as e:
+        logger.error(f"[_get_transcript_changes] Failed to read change feed of meeting {internal_meeting_id}: {e}", exc_info=True)
+        return None
+    if not entries:
+        return [], [], since
+
+    # Later entries win: a segment changed after its removal is back, one removed after a change is gone
+    changed: Dict[str, Optional[str]] = {}
+    for _, fields in entries:
+        changed.update(parse_change_entry(fields))
+    segments, removed = await _build_changed_segments(internal_meeting_id, changed)
+    return segments, removed, entries[-1][0]
+
+
+# Total order of the transcript: (absolute start time, session UID, relative start time). The
+# pagination cursor is the opaque encoding of the key of the last segment of a page.
+TranscriptKey = Tuple[datetime, str, float]
+
+
+def _segment_key(session_uid: Optional[str], segment) -> TranscriptKey:
+    return segment.absolute_start_time, session_uid or "", segment.start_time
+
+
+def _encode_transcript_cursor(key: TranscriptKey) -> str:
+    payload = json.dumps([key[0].isoformat(), key[1], key[2]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_transcript_cursor(cursor: str) -> TranscriptKey:
+    """Inverse of _encode_transcript_cursor; raises ValueError for anything it did not produce."""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        absolute_start, session_uid, start_time = json.loads(payload)
+        absolute_start = datetime.fromisoformat(absolute_start)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid transcript cursor: {cursor!r}") from e
+    if absolute_start.tzinfo is None:
+        absolute_start = absolute_start.replace(tzinfo=timezone.utc)
+    return absolute_start, str(session_uid), float(start_time)
+
+
+async def _iter_transcript_segments(
+    internal_meeting_id: int,
+    db: AsyncSession,
+    redis_c: aioredis.Redis,
+    after: Optional[TranscriptKey] = None
+) -> AsyncIterator[Tuple[TranscriptKey, TranscriptionSegment]]:
+    """
+    Yields (key, segment) for the transcript segments of a meeting in TranscriptKey order, merging
+    the immutable PostgreSQL rows and the cold storage archive of finished meetings with the
+    mutable Redis tail (Redis wins for the same session and start key). With `after`, only the
+    segments whose key is greater are yielded, so segments sharing a start time are neither
+    repeated nor skipped across pages.
+
+    Absolute times are materialized when segments are written, so the PostgreSQL rows are a scan
+    of ix_transcription_meeting_absolute_start through a server-side cursor, holding at most
+    TRANSCRIPT_STREAM_FETCH_SIZE rows. The Redis tail and, for archived meetings, the whole
+    decoded archive are held in memory.
+    """
+    logger.debug(f"[_iter_transcript_segments] Fetching for meeting ID {internal_meeting_id} after {after}")
+
+    # 1. Fetch segments from Redis (mutable segments) and the archive (immutable segments of finished meetings)
+    redis_tail = await _fetch_redis_tail(internal_meeting_id, redis_c)
+    archived = await _load_archived_segments(internal_meeting_id, db)
+    redis_keys = {(session_uid, key) for session_uid, key, _ in redis_tail}
+    pending = [(_segment_key(session_uid, segment_obj), segment_obj) for session_uid, _, segment_obj in redis_tail]
+    pending += [
+        (_segment_key(session_uid, segment_obj), segment_obj)
+        for session_uid, key, segment_obj in archived
+        if (session_uid, key) not in redis_keys
+    ]
+    pending.sort(key=lambda item: item[0])
+    if after is not None:
+        pending = [item for item in pending if item[0] > after]
+    redis_idx = 0
+
+    # 2. Stream PostgreSQL segments (immutable segments) merged with the Redis tail
+    # Byte order, as str comparison in Python
+    session_uid_order = func.coalesce(Transcription.session_uid, "").collate("C")
+    stmt_transcripts = select(Transcription).where(
+        Transcription.meeting_id == internal_meeting_id,
+        Transcription.absolute_start_time.isnot(None)
+    ).order_by(
+        Transcription.absolute_start_time, session_uid_order, Transcription.start_time
+    ).execution_options(yield_per=TRANSCRIPT_STREAM_FETCH_SIZE)
+    if after is not None:
+        stmt_transcripts = stmt_transcripts.where(
+            Transcription.absolute_start_time >= after[0],
+            tuple_(Transcription.absolute_start_time, session_uid_order, Transcription.start_time) > after
+        )
+
+    db_segments = await db.stream_scalars(stmt_transcripts)
+    try:
+        async for segment in db_segments:
+            segment_key = _segment_key(segment.session_uid, segment)
+            while redis_idx < len(pending) and pending[redis_idx][0] < segment_key:
+                yield pending[redis_idx]
+                redis_idx += 1
+            if (segment.session_uid, f"{segment.start_time:.3f}") in redis_keys:
+                continue
+            yield segment_key, TranscriptionSegment(
+                start_time=segment.start_time,
+                end_time=segment.end_time,
+                text=segment.text,
+                language=segment.language,
+                speaker=segment.speaker,
+                created_at=segment.created_at,
+                absolute_start_time=segment.absolute_start_time,
+                absolute_end_time=segment.absolute_end_time
+            )
+    finally:
+        await db_segments.close()
+    for item in pending[redis_idx:]:
+        yield item
+
+
+async def _get_transcript_page(
+    internal_meeting_id: int,
+    db: AsyncSession,
+    redis_c: aioredis.Redis,
+    after: Optional[TranscriptKey] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[TranscriptionSegment], Optional[str]]:
+    """Returns up to `limit` segments after the cursor, plus the cursor of the next page (None on the last page)."""
+    segments: List[TranscriptionSegment] = []
+    last_key: Optional[TranscriptKey] = None
+    segment_iter = _iter_transcript_segments(internal_meeting_id, db, redis_c, after)
+    try:
+        async for segment_key, segment in segment_iter:
+            if limit is not None and len(segments) >= limit:
+                return segments, _encode_transcript_cursor(last_key)
+            segments.append(segment)
+            last_key = segment_key
+    finally:
+        await segment_iter.aclose()
+    return segments, None
 
-    for start_time_str, segment_json in redis_segments_raw.items():
-        try:
-            segment_data = json.loads(segment_json)
-            session_uid_from_redis = segment_data.get("session_uid")
-            potential_session_key = session_uid_from_redis
-            if session_uid_from_redis:
-                # This logic to strip prefixes is brittle. A better solution would be to store the canonical session_uid.
-                # For now, keeping it to match previous behavior.
-                prefixes_to_check = [f"{p.value}_" for p in Platform]
-                for prefix in prefixes_to_check:
-                    if session_uid_from_redis.startswith(prefix):
-                        potential_session_key = session_uid_from_redis[len(prefix):]
-                        break
-            session_start = session_times.get(potential_session_key) 
-            if 'end_time' in segment_data and 'text' in segment_data and session_uid_from_redis and session_start:
-                if session_start.tzinfo is None:
-                    session_start = session_start.replace(tzinfo=timezone.utc)
-                relative_start_time = float(start_time_str)
-                absolute_start_time = session_start + timedelta(seconds=relative_start_time)
-                absolute_end_time = session_start + timedelta(seconds=segment_data['end_time'])
-                segment_obj = TranscriptionSegment(
-                    start_time=relative_start_time,
-                    end_time=segment_data['end_time'],
-                    text=segment_data['text'],
-                    language=segment_data.get('language'),
-                    speaker=segment_data.get('speaker'),
-                    absolute_start_time=absolute_start_time,
-                    absolute_end_time=absolute_end_time
-                )
-                merged_segments_with_abs_time[start_time_str] = (absolute_start_time, segment_obj)
-        except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
-            logger.error(f"[_get_full_transcript_segments] Error parsing Redis segment {start_time_str} for meeting {internal_meeting_id}: {e}")
 
-    # 5. Sort based on calculated absolute time and return
-    sorted_segment_tuples = sorted(merged_segments_with_abs_time.values(), key=lambda item: item[0])
-    return [segment_obj for abs_time, segment_obj in sorted_segment_tuples]
+async def _get_full_transcript_segments(
+    internal_meeting_id: int,
+    db: AsyncSession,
+    redis_c: aioredis.Redis
+) -> List[TranscriptionSegment]:
+    """
+    Core logic to fetch and merge transcript segments from PG and Redis.
+    """
+    segments, _ = await _get_transcript_page(internal_meeting_id, db, redis_c)
+    return segments
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check(request: Request, db: AsyncSession = Depends(get_db)):
@@ -155,7 +333,7 @@ async def health_check(request: Request, db: AsyncSession = Depends(get_db)):
             summary="Get list of all meetings for the current user",
             dependencies=[Depends(get_current_user)])
 async def get_meetings(
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Returns a list of all meetings initiated by the authenticated user."""
@@ -172,12 +350,20 @@ async def get_transcript_by_native_id(
     platform: Platform,
     native_meeting_id: str,
     request: Request, # Added for redis_client access
-    current_user: User = Depends(get_current_user),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of segments to return; enables pagination"),
+    cursor: Optional[str] = Query(None, description="'next_cursor' of the previous page; returns the segments that follow it"),
+    format: str = Query("json", regex="^(json|ndjson)$", description="'ndjson' streams the meeting and then one segment per line"),
+    since: Optional[str] = Query(None, regex=r"^\d+-\d+$", description="Return only segments created or changed after this 'change_cursor' of a previous response"),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Retrieves the meeting details and transcript segments for a meeting specified by its platform and native ID.
     Finds the *latest* matching meeting record for the user.
     Combines data from both PostgreSQL (immutable segments) and Redis Hashes (mutable segments).
+    Segments are ordered by absolute start time; with `limit`, 'next_cursor' is set while more segments follow.
+    With `since`, only segments created or changed after that cursor are returned (clients replace segments
+    by start time), along with the start times of segments removed in the meantime in 'removed_start_times';
+    if the cursor is too old for the change feed, the full transcript is returned instead.
     """
     logger.debug(f"[API] User {current_user.id} requested transcript for {platform.value} / {native_meeting_id}")
     redis_c = getattr(request.app.state, 'redis_client', None)
@@ -201,16 +387,170 @@ async def get_transcript_by_native_id(
     internal_meeting_id = meeting.id
     logger.debug(f"[API] Found meeting record ID {internal_meeting_id}, fetching segments...")
 
-    sorted_segments = await _get_full_transcript_segments(internal_meeting_id, db, redis_c)
+    meeting_details = MeetingResponse.from_orm(meeting)
+    try:
+        after = _decode_transcript_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_transcript_ndjson(internal_meeting_id, meeting_details, redis_c, after, limit),
+            media_type="application/x-ndjson"
+        )
+
+    response_data = meeting_details.dict()
+    if since:
+        changes = await _get_transcript_changes(internal_meeting_id, redis_c, since)
+        if changes is not None:
+            response_data["segments"], response_data["removed_start_times"], response_data["change_cursor"] = changes
+            logger.info(f"[API Meet {internal_meeting_id}] Returning {len(response_data['segments'])} segments changed and {len(response_data['removed_start_times'])} removed since {since}.")
+            return TranscriptionResponse(**response_data)
+        logger.info(f"[API Meet {internal_meeting_id}] Change cursor {since} is no longer covered by the change feed, returning full transcript.")
+
+    change_cursor = await current_change_cursor(internal_meeting_id, redis_c)
+    sorted_segments, next_cursor = await _get_transcript_page(internal_meeting_id, db, redis_c, after, limit)
     
     logger.info(f"[API Meet {internal_meeting_id}] Merged and sorted into {len(sorted_segments)} total segments.")
     
-    meeting_details = MeetingResponse.from_orm(meeting)
-    response_data = meeting_details.dict()
     response_data["segments"] = sorted_segments
+    response_data["next_cursor"] = next_cursor
+    response_data["change_cursor"] = change_cursor
     return TranscriptionResponse(**response_data)
 
 
+async def _stream_transcript_ndjson(
+    internal_meeting_id: int,
+    meeting_details: MeetingResponse,
+    redis_c: aioredis.Redis,
+    after: Optional[TranscriptKey],
+    limit: Optional[int]
+) -> AsyncIterator[str]:
+    """NDJSON body: the meeting details, one line per segment and, if more segments follow the page, {"next_cursor": ...}."""
+    yield meeting_details.json() + "\n"
+    count = 0
+    # The request's session is closed before a streaming body is sent, so the stream uses its own
+    async with async_session_local() as db:
+        segment_iter = _iter_transcript_segments(internal_meeting_id, db, redis_c, after)
+        try:
+            last_key = None
+            async for segment_key, segment in segment_iter:
+                if limit is not None and count >= limit:
+                    yield json.dumps({"next_cursor": _encode_transcript_cursor(last_key)}) + "\n"
+                    break
+                yield segment.json(by_alias=True) + "\n"
+                last_key = segment_key
+                count += 1
+        finally:
+            await segment_iter.aclose()
+    logger.info(f"[API Meet {internal_meeting_id}] Streamed {count} segments as NDJSON.")
+
+
+@router.get("/transcripts/{platform}/{native_meeting_id}/live",
+            summary="Subscribe to live transcript updates (Server-Sent Events)",
+            dependencies=[Depends(get_current_user)])
+async def stream_live_transcript(
+    platform: Platform,
+    native_meeting_id: str,
+    request: Request,
+    since: Optional[str] = Query(None, regex=r"^\d+-\d+$", description="'change_cursor' of a transcript response; changes after it are sent first"),
+    last_event_id: Optional[str] = Header(None, description="Set by EventSource on reconnect; takes precedence over 'since'"),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Streams the segments created or changed in a meeting as Server-Sent Events.
+
+    Each 'segments' event carries a JSON list of segments (replace existing ones by start time) and
+    each 'removed' event a JSON list of start times of segments dropped from the transcript (e.g.
+    filtered out as noise). The last event of a change feed entry has the entry ID as its event ID,
+    so a reconnecting EventSource resumes where it left off.
+    A 'reset' event means the resume point is too old: fetch the full transcript and subscribe again
+    with its 'change_cursor'.
+    """
+    redis_c = getattr(request.app.state, 'redis_client', None)
+    if not redis_c:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Redis client not available")
+    if last_event_id and re.fullmatch(r"\d+-\d+", last_event_id):
+        since = last_event_id
+
+    stmt_meeting = select(Meeting).where(
+        Meeting.user_id == current_user.id,
+        Meeting.platform == platform.value,
+        Meeting.platform_specific_id == native_meeting_id
+    ).order_by(Meeting.created_at.desc())
+    result_meeting = await db.execute(stmt_meeting)
+    meeting = result_meeting.scalars().first()
+    if not meeting:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Meeting not found for platform {platform.value} and ID {native_meeting_id}"
+        )
+
+    logger.info(f"[API Meet {meeting.id}] User {current_user.id} subscribed to live transcript (since {since}).")
+    return StreamingResponse(
+        _live_transcript_events(meeting.id, request, redis_c, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse_event(event: str, data, event_id: Optional[str] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(jsonable_encoder(data))}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def _sse_change_events(segments: List[TranscriptionSegment], removed: List[float], event_id: str) -> List[str]:
+    """'removed' and 'segments' events of a change; only the last one carries the ID to resume from."""
+    events = []
+    if removed:
+        events.append(_sse_event("removed", removed, None if segments else event_id))
+    if segments:
+        events.append(_sse_event("segments", segments, event_id))
+    return events
+
+
+async def _live_transcript_events(
+    internal_meeting_id: int,
+    request: Request,
+    redis_c: aioredis.Redis,
+    since: Optional[str]
+) -> AsyncIterator[str]:
+    """SSE body: catch-up from `since`, then the meeting's change feed as relayed by the live transcript hub."""
+    # Subscribe before catching up, so entries written in between are queued rather than missed
+    queue = await live_transcript_hub.subscribe(internal_meeting_id, redis_c)
+    try:
+        changes = await _get_transcript_changes(internal_meeting_id, redis_c, since) if since else ([], [], None)
+        if changes is None:
+            yield _sse_event("reset", {"detail": "Change cursor expired, fetch the full transcript"})
+            return
+        segments, removed, last_id = changes
+        for event in _sse_change_events(segments, removed, last_id):
+            yield event
+
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=LIVE_UPDATES_KEEPALIVE)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                # Dropped as too slow; the client reconnects with Last-Event-ID
+                break
+            entry_id, changed = item
+            if last_id and parse_stream_id(entry_id) <= parse_stream_id(last_id):
+                continue
+            last_id = entry_id
+            segments, removed = await _build_changed_segments(internal_meeting_id, changed)
+            for event in _sse_change_events(segments, removed, entry_id):
+                yield event
+    finally:
+        live_transcript_hub.unsubscribe(internal_meeting_id, queue)
+        logger.debug(f"[API Meet {internal_meeting_id}] Live transcript subscriber disconnected.")
+
+
 @router.get("/internal/transcripts/{meeting_id}",
             response_model=List[TranscriptionSegment],
             summary="[Internal] Get all transcript segments for a meeting",
@@ -242,7 +582,7 @@ async def update_meeting_data(
     platform: Platform,
     native_meeting_id: str,
     meeting_update: MeetingUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Updates the user-editable data (name, participants, languages, notes) for the latest meeting matching the platform and native ID."""
@@ -337,7 +677,7 @@ async def delete_meeting(
     platform: Platform,
     native_meeting_id: str,
     request: Request,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Deletes the latest meeting matching the platform and native ID, along with all its transcripts."""
@@ -368,6 +708,13 @@ async def delete_meeting(
     for transcript in transcripts:
         await db.delete(transcript)
     
+    # Delete the cold storage archive
+    stmt_archive = select(TranscriptionArchive).where(TranscriptionArchive.meeting_id == internal_meeting_id)
+    result_archive = await db.execute(stmt_archive)
+    archive = result_archive.scalars().first()
+    if archive:
+        await db.delete(archive)
+    
     # Delete meeting sessions
     stmt_sessions = select(MeetingSession).where(MeetingSession.meeting_id == internal_meeting_id)
     result_sessions = await db.execute(stmt_sessions)
@@ -381,8 +728,14 @@ async def delete_meeting(
     if redis_c:
         try:
             hash_key = f"meeting:{internal_meeting_id}:segments"
-            await redis_c.delete(hash_key)
-            logger.debug(f"[API] Deleted Redis hash {hash_key}")
+            start_time_keys = await redis_c.hkeys(hash_key)
+            async with redis_c.pipeline(transaction=True) as pipe:
+                pipe.delete(hash_key, change_feed_key(internal_meeting_id))
+                # db_writer stops looking at the meeting once its hash is empty, so its queue entries would never be dropped
+                if start_time_keys:
+                    pipe.zrem(REDIS_SEGMENT_UPDATES_KEY, *[f"{internal_meeting_id}:{start_time_key}" for start_time_key in start_time_keys])
+                await pipe.execute()
+            logger.debug(f"[API] Deleted Redis hash {hash_key}, its change feed and {len(start_time_keys)} queued segment updates")
         except Exception as e:
             logger.error(f"[API] Failed to delete Redis data for meeting {internal_meeting_id}: {e}")
     
@@ -2,32 +2,38 @@ import logging
 import json
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Set
+from typing import Optional, Dict, Set, List, Tuple, Any
 
 import redis # For redis.exceptions
 import redis.asyncio as aioredis
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared_models.database import async_session_local
-from shared_models.models import Transcription
-# No schemas needed directly by these functions as they create Transcription objects
-from config import BACKGROUND_TASK_INTERVAL, IMMUTABILITY_THRESHOLD, REDIS_SPEAKER_EVENT_KEY_PREFIX
+from shared_models.models import Transcription, TranscriptionArchive
+# No schemas needed directly by these functions as they create Transcription rows
+from config import BACKGROUND_TASK_INTERVAL, IMMUTABILITY_THRESHOLD, REDIS_SPEAKER_EVENT_KEY_PREFIX, REDIS_SEGMENT_UPDATES_KEY, DB_WRITER_INSERT_CHUNK_SIZE, TRANSCRIPT_ARCHIVE_PENDING_KEY
 from filters import TranscriptionFilter
 # Speaker re-mapping before persistence
 from mapping.speaker_mapper import (
-    get_speaker_mapping_for_segment,
     STATUS_MAPPED,
     STATUS_UNKNOWN,
     STATUS_NO_SPEAKER_EVENTS,
     STATUS_MULTIPLE,
     STATUS_ERROR,
 )
+from mapping.speaker_index import get_indexed_speaker_mappings_for_segments
+from background.sharding import MeetingShardOwnership
+from streaming.processors import get_session_times, resolve_session_start, absolute_times, parse_absolute_time, queue_segment_removals
+from streaming.segment_fingerprints import segment_fingerprints
 
 logger = logging.getLogger(__name__)
 
 # This helper is used by process_redis_to_postgres
-def create_transcription_object(meeting_id: int, start: float, end: float, text: str, language: Optional[str], session_uid: Optional[str], mapped_speaker_name: Optional[str]) -> Transcription:
-    """Creates a Transcription ORM object without adding/committing."""
-    return Transcription(
+def create_transcription_row(meeting_id: int, start: float, end: float, text: str, language: Optional[str], session_uid: Optional[str], mapped_speaker_name: Optional[str],
+                             absolute_start_time: Optional[datetime] = None, absolute_end_time: Optional[datetime] = None) -> Dict[str, Any]:
+    """Creates the column values of a Transcription row for bulk_insert_transcriptions."""
+    return dict(
         meeting_id=meeting_id,
         start_time=start,
         end_time=end,
@@ -35,9 +41,138 @@ def create_transcription_object(meeting_id: int, start: float, end: float, text:
         speaker=mapped_speaker_name,
         language=language,
         session_uid=session_uid, 
-        created_at=datetime.utcnow()
+        created_at=datetime.utcnow(),
+        absolute_start_time=absolute_start_time,
+        absolute_end_time=absolute_end_time
     )
 
+async def bulk_insert_transcriptions(db: AsyncSession, rows: List[Dict[str, Any]]):
+    """Inserts Transcription rows with Core multi-row INSERTs in chunks of DB_WRITER_INSERT_CHUNK_SIZE.
+    Bypasses the ORM unit of work: no identity tracking and no RETURNING of the generated IDs.
+    The caller commits."""
+    for chunk_start in range(0, len(rows), DB_WRITER_INSERT_CHUNK_SIZE):
+        await db.execute(insert(Transcription.__table__), rows[chunk_start:chunk_start + DB_WRITER_INSERT_CHUNK_SIZE])
+
+def parse_segment_updated_at(segment_data: Dict[str, Any]) -> datetime:
+    """Returns the timezone-aware 'updated_at' of a Redis segment."""
+    # Handle 'Z' suffix in timestamps
+    updated_at_str = segment_data['updated_at']
+    if updated_at_str.endswith('Z'):
+        updated_at_str = updated_at_str[:-1] + '+00:00'
+    segment_updated_at = datetime.fromisoformat(updated_at_str)
+    if segment_updated_at.tzinfo is None: 
+        segment_updated_at = segment_updated_at.replace(tzinfo=timezone.utc)
+    return segment_updated_at
+
+def segment_needs_remap(segment_data: Dict[str, Any]) -> bool:
+    """True if the segment has no speaker or an uncertain mapping status."""
+    return (
+        (not segment_data.get("speaker"))
+        or segment_data.get("speaker_mapping_status", STATUS_UNKNOWN) in (STATUS_UNKNOWN, STATUS_NO_SPEAKER_EVENTS, STATUS_ERROR)
+    )
+
+async def remap_immutable_segments(redis_c: aioredis.Redis, meeting_id: int, sorted_segment_items: List[Tuple[str, str]], immutability_time: datetime) -> Dict[str, Dict[str, Any]]:
+    """Final speaker mapping pass for the immutable segments of a meeting hash that need it.
+    Segments are mapped with one batch call per session UID. Returns start time key -> mapping result."""
+    segments_by_session: Dict[str, List[Tuple[str, float, float]]] = {}
+    for start_time_str, segment_json in sorted_segment_items:
+        try:
+            segment_data = json.loads(segment_json)
+            session_uid = segment_data.get("session_uid")
+            if not session_uid or 'updated_at' not in segment_data or not segment_needs_remap(segment_data):
+                continue
+            if parse_segment_updated_at(segment_data) < immutability_time:
+                segments_by_session.setdefault(session_uid, []).append(
+                    (start_time_str, float(start_time_str) * 1000.0, float(segment_data["end_time"]) * 1000.0)
+                )
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError):
+            continue # Reported by the main pass
+
+    final_mappings: Dict[str, Dict[str, Any]] = {}
+    for session_uid, segments in segments_by_session.items():
+        try:
+            mapping_results = await get_indexed_speaker_mappings_for_segments(
+                redis_c=redis_c,
+                session_uid=session_uid,
+                segments_ms=[(start_ms, end_ms) for _, start_ms, end_ms in segments],
+                config_speaker_event_key_prefix=REDIS_SPEAKER_EVENT_KEY_PREFIX,
+                context_log_msg=f"[FinalMap Meet:{meeting_id}]"
+            )
+            for (start_time_str, _, _), mapping_result in zip(segments, mapping_results):
+                final_mappings[start_time_str] = mapping_result
+        except Exception as map_err:
+            logger.error(
+                f"[FinalMap] Error remapping speakers for meeting {meeting_id} session {session_uid}: {map_err}",
+                exc_info=True,
+            )
+    return final_mappings
+
+async def requeue_archived_meetings(db: AsyncSession, redis_c: aioredis.Redis, meeting_ids: Set[int]) -> List[int]:
+    """Queues the meetings of `meeting_ids` that already have a TranscriptionArchive for archiving again,
+    so rows persisted after bot-manager archived the meeting are moved into the archive too. The queue
+    score is the current time, which restarts bot-manager's wait for the meeting to be flushed."""
+    if not meeting_ids:
+        return []
+    result = await db.execute(select(TranscriptionArchive.meeting_id).where(TranscriptionArchive.meeting_id.in_(meeting_ids)))
+    archived_ids = list(result.scalars().all())
+    if archived_ids:
+        now = datetime.now(timezone.utc).timestamp()
+        await redis_c.zadd(TRANSCRIPT_ARCHIVE_PENDING_KEY, {str(meeting_id): now for meeting_id in archived_ids})
+    return archived_ids
+
+async def fetch_due_segments(redis_c: aioredis.Redis, meeting_ids: List[str], cutoff_ts: float,
+                             active_meeting_ids: Optional[Set[str]] = None) -> Dict[str, Dict[str, str]]:
+    """Returns meeting ID -> {start time key: segment JSON} for the segments of `meeting_ids` last updated
+    before `cutoff_ts`, read from the REDIS_SEGMENT_UPDATES_KEY queue instead of scanning every hash.
+    Queue entries whose segment no longer exists (e.g. the meeting was deleted) are dropped, as are due
+    entries of meetings outside `active_meeting_ids`: no replica owns those, so nothing else would.
+    The stream processor adds the meeting to active_meetings in the same transaction as the entry, so
+    an entry due before the active_meetings snapshot was taken cannot belong to a new write."""
+    owned = set(meeting_ids)
+    due_keys: Dict[str, List[str]] = {}
+    orphaned_members: List[str] = []
+    for member in await redis_c.zrangebyscore(REDIS_SEGMENT_UPDATES_KEY, '-inf', cutoff_ts):
+        meeting_id_str, _, start_time_str = member.partition(':')
+        if meeting_id_str in owned:
+            due_keys.setdefault(meeting_id_str, []).append(start_time_str)
+        elif active_meeting_ids is not None and meeting_id_str not in active_meeting_ids:
+            orphaned_members.append(member)
+    if not due_keys:
+        if orphaned_members:
+            await redis_c.zrem(REDIS_SEGMENT_UPDATES_KEY, *orphaned_members)
+        return {}
+
+    async with redis_c.pipeline(transaction=False) as pipe:
+        for meeting_id_str, start_times in due_keys.items():
+            pipe.hmget(f"meeting:{meeting_id_str}:segments", start_times)
+        results = await pipe.execute()
+
+    due_segments: Dict[str, Dict[str, str]] = {}
+    for (meeting_id_str, start_times), values in zip(due_keys.items(), results):
+        for start_time_str, segment_json in zip(start_times, values):
+            if segment_json is None:
+                orphaned_members.append(f"{meeting_id_str}:{start_time_str}")
+            else:
+                due_segments.setdefault(meeting_id_str, {})[start_time_str] = segment_json
+    if orphaned_members:
+        await redis_c.zrem(REDIS_SEGMENT_UPDATES_KEY, *orphaned_members)
+    return due_segments
+
+async def delete_processed_segments(redis_c: aioredis.Redis, segments_to_delete: Dict[int, Set[str]],
+                                    discarded_segments: Optional[Dict[int, Set[str]]] = None):
+    """Removes processed segments (stored or discarded) from the meeting hashes and the REDIS_SEGMENT_UPDATES_KEY queue.
+    The `discarded_segments` (a subset not persisted to PostgreSQL) are published as removed on the meeting's change feed."""
+    for meeting_id, start_times in segments_to_delete.items():
+        if start_times:
+            await redis_c.hdel(f"meeting:{meeting_id}:segments", *start_times)
+            await redis_c.zrem(REDIS_SEGMENT_UPDATES_KEY, *[f"{meeting_id}:{start_time_str}" for start_time_str in start_times])
+            logger.debug(f"Deleted {len(start_times)} processed segments for meeting {meeting_id} from Redis Hash")
+    for meeting_id, start_times in (discarded_segments or {}).items():
+        if start_times:
+            async with redis_c.pipeline(transaction=False) as pipe:
+                queue_segment_removals(pipe, meeting_id, list(start_times))
+                await pipe.execute()
+
 async def process_redis_to_postgres(redis_c: aioredis.Redis, local_transcription_filter: TranscriptionFilter):
     """
     Background task that runs periodically to:
@@ -45,8 +180,14 @@ async def process_redis_to_postgres(redis_c: aioredis.Redis, local_transcription
     2. Filter these segments
     3. Store passing segments in PostgreSQL 
     4. Remove processed segments from Redis Hashes
+
+    Segments due for persistence are found through the REDIS_SEGMENT_UPDATES_KEY sorted set
+    (scored by last update) maintained by the stream processor. The first cycle after startup
+    scans the full hashes instead, to pick up segments written without a queue entry.
     """
-    logger.info("Background Redis-to-PostgreSQL processor started")
+    shard_ownership = MeetingShardOwnership(redis_c)
+    logger.info(f"Background Redis-to-PostgreSQL processor started (replica: {shard_ownership.replica_id})")
+    full_scan = True
     
     while True:
         try:
@@ -54,33 +195,62 @@ async def process_redis_to_postgres(redis_c: aioredis.Redis, local_transcription
             logger.debug("Background processor checking for immutable segments in Redis Hashes...")
             
             meeting_ids_raw = await redis_c.smembers("active_meetings")
+            cutoff_ts = datetime.now(timezone.utc).timestamp() - IMMUTABILITY_THRESHOLD
             if not meeting_ids_raw:
                 logger.debug("No active meetings found in Redis Set")
+                meeting_ids = []
+            else:
+                meeting_ids = await shard_ownership.owned_meetings([mid for mid in meeting_ids_raw])
+                logger.debug(f"Found {len(meeting_ids_raw)} active meetings in Redis Set, {len(meeting_ids)} owned by this replica")
+            if not meeting_ids:
+                if not full_scan:
+                    # Still drop queue entries left behind by meetings that are no longer active
+                    await fetch_due_segments(redis_c, [], cutoff_ts, set(meeting_ids_raw))
                 continue
-                
-            meeting_ids = [mid for mid in meeting_ids_raw]
-            logger.debug(f"Found {len(meeting_ids)} active meetings in Redis Set")
+            
+            if full_scan:
+                segments_by_meeting = {}
+                for meeting_id_str in meeting_ids:
+                    segments_by_meeting[meeting_id_str] = await redis_c.hgetall(f"meeting:{meeting_id_str}:segments")
+                full_scan = False
+            else:
+                segments_by_meeting = await fetch_due_segments(redis_c, meeting_ids, cutoff_ts, set(meeting_ids_raw))
+                # Meetings without due segments are only checked for being empty
+                idle_meeting_ids = [mid for mid in meeting_ids if mid not in segments_by_meeting]
+                if idle_meeting_ids:
+                    async with redis_c.pipeline(transaction=False) as pipe:
+                        for meeting_id_str in idle_meeting_ids:
+                            pipe.hlen(f"meeting:{meeting_id_str}:segments")
+                        hash_lengths = await pipe.execute()
+                    for meeting_id_str, hash_length in zip(idle_meeting_ids, hash_lengths):
+                        if not hash_length:
+                            segments_by_meeting[meeting_id_str] = {}
             
             batch_to_store = []
             segments_to_delete_from_redis: Dict[int, Set[str]] = {}  
+            # Deleted from Redis without being persisted, published as removed to transcript clients
+            discarded_segments: Dict[int, Set[str]] = {}
             
             async with async_session_local() as db:
-                for meeting_id_str in meeting_ids:
+                for meeting_id_str, redis_segments_dict in segments_by_meeting.items():
                     try:
                         meeting_id = int(meeting_id_str)
                         hash_key = f"meeting:{meeting_id}:segments"
-                        redis_segments_dict = await redis_c.hgetall(hash_key)
                         
                         if not redis_segments_dict:
                             await redis_c.srem("active_meetings", meeting_id_str)
                             local_transcription_filter.clear_processed_segments_cache(meeting_id)
-                            logger.debug(f"Removed empty meeting {meeting_id} from active meetings set and cleared its filter cache.")
+                            segment_fingerprints.forget_meeting(meeting_id)
+                            logger.debug(f"Removed empty meeting {meeting_id} from active meetings set and cleared its filter and fingerprint caches.")
                             continue
 
                         sorted_segment_items = sorted(redis_segments_dict.items(), key=lambda item: float(item[0]))
                             
                         logger.debug(f"Processing {len(sorted_segment_items)} segments from Redis Hash for meeting {meeting_id} (sorted)")
                         immutability_time = datetime.now(timezone.utc) - timedelta(seconds=IMMUTABILITY_THRESHOLD)
+                        final_mappings = await remap_immutable_segments(redis_c, meeting_id, sorted_segment_items, immutability_time)
+                        remapped_segments: Dict[str, str] = {}
+                        immutable_segments: List[Dict[str, Any]] = []
                         
                         for start_time_str, segment_json in sorted_segment_items:
                             try:
@@ -90,108 +260,102 @@ async def process_redis_to_postgres(redis_c: aioredis.Redis, local_transcription
                                      logger.warning(f"Segment {start_time_str} in meeting {meeting_id} hash is missing 'updated_at'. Skipping immutability check.")
                                      continue 
                                 
-                                # Handle 'Z' suffix in timestamps
-                                updated_at_str = segment_data['updated_at']
-                                if updated_at_str.endswith('Z'):
-                                    updated_at_str = updated_at_str[:-1] + '+00:00'
-                                segment_updated_at = datetime.fromisoformat(updated_at_str)
-                                if segment_updated_at.tzinfo is None: 
-                                    segment_updated_at = segment_updated_at.replace(tzinfo=timezone.utc)
+                                segment_updated_at = parse_segment_updated_at(segment_data)
                                 
                                 if segment_updated_at < immutability_time:
                                     # Segment is immutable. Attempt ONE FINAL speaker mapping pass if speaker name is missing or uncertain.
                                     mapped_speaker_name: Optional[str] = segment_data.get("speaker")
                                     mapping_status: str = segment_data.get("speaker_mapping_status", STATUS_UNKNOWN)
 
-                                    needs_remap = (
-                                        (not mapped_speaker_name)
-                                        or mapping_status in (STATUS_UNKNOWN, STATUS_NO_SPEAKER_EVENTS, STATUS_ERROR)
-                                    )
-
-                                    if needs_remap and segment_session_uid:
-                                        try:
-                                            segment_start_ms = float(start_time_str) * 1000.0
-                                            segment_end_ms = float(segment_data["end_time"]) * 1000.0
-                                            
-                                            context_log = f"[FinalMap Meet:{meeting_id}/Seg:{start_time_str}]"
-                                            mapping_result = await get_speaker_mapping_for_segment(
-                                                redis_c=redis_c,
-                                                session_uid=segment_session_uid,
-                                                segment_start_ms=segment_start_ms,
-                                                segment_end_ms=segment_end_ms,
-                                                config_speaker_event_key_prefix=REDIS_SPEAKER_EVENT_KEY_PREFIX,
-                                                context_log_msg=context_log
-                                            )
-
-                                            mapped_speaker_name = mapping_result.get("speaker_name")
-                                            mapping_status = mapping_result.get("status", STATUS_ERROR)
-                                            
-                                            # Persist new mapping back into Redis so API reflects it while still in Redis
-                                            segment_data["speaker"] = mapped_speaker_name
-                                            segment_data["speaker_mapping_status"] = mapping_status
-                                            await redis_c.hset(hash_key, start_time_str, json.dumps(segment_data))
-
-                                            logger.info(
-                                                f"[FinalMap] Meeting {meeting_id} segment {start_time_str} remapped to '{mapped_speaker_name}' with status {mapping_status}"
-                                            )
-                                        except Exception as map_err:
-                                            logger.error(
-                                                f"[FinalMap] Error remapping speaker for meeting {meeting_id} segment {start_time_str}: {map_err}",
-                                                exc_info=True,
-                                            )
+                                    mapping_result = final_mappings.get(start_time_str)
+                                    if mapping_result is not None:
+                                        mapped_speaker_name = mapping_result.get("speaker_name")
+                                        mapping_status = mapping_result.get("status", STATUS_ERROR)
+                                        
+                                        # Persist new mapping back into Redis so API reflects it while still in Redis
+                                        segment_data["speaker"] = mapped_speaker_name
+                                        segment_data["speaker_mapping_status"] = mapping_status
+                                        remapped_segments[start_time_str] = json.dumps(segment_data)
 
+                                        logger.info(
+                                            f"[FinalMap] Meeting {meeting_id} segment {start_time_str} remapped to '{mapped_speaker_name}' with status {mapping_status}"
+                                        )
                                     else:
                                         logger.debug(
                                             f"Segment {start_time_str} (UID: {segment_session_uid}) uses speaker: '{mapped_speaker_name}' (status {mapping_status})"
                                         )
 
-                                    # Filter the segment (deduplication, etc.)
-                                    segment_start_time_float = float(start_time_str)
-                                    segment_end_time_float = segment_data['end_time']
-                                    
-                                    if local_transcription_filter.filter_segment(
-                                        segment_data['text'], 
-                                        start_time=segment_start_time_float, 
-                                        end_time=segment_end_time_float, 
-                                        meeting_id=meeting_id,
-                                        language=segment_data.get('language')
-                                    ):
-                                        new_transcription = create_transcription_object(
-                                            meeting_id=meeting_id,
-                                            start=segment_start_time_float,
-                                            end=segment_end_time_float,
-                                            text=segment_data['text'],
-                                            language=segment_data.get('language'),
-                                            session_uid=segment_session_uid,
-                                            mapped_speaker_name=mapped_speaker_name
-                                        )
-                                        batch_to_store.append(new_transcription)
+                                    # Collected for filtering (deduplication, etc.) in one batch below
+                                    immutable_segments.append({
+                                        'start_key': start_time_str,
+                                        'text': segment_data['text'],
+                                        'start': float(start_time_str),
+                                        'end': segment_data['end_time'],
+                                        'language': segment_data.get('language'),
+                                        'session_uid': segment_session_uid,
+                                        'speaker': mapped_speaker_name,
+                                        'absolute_start': parse_absolute_time(segment_data.get('absolute_start_time')),
+                                        'absolute_end': parse_absolute_time(segment_data.get('absolute_end_time')),
+                                    })
                                     segments_to_delete_from_redis.setdefault(meeting_id, set()).add(start_time_str)
                             except (json.JSONDecodeError, KeyError, ValueError, TypeError) as e:
                                 logger.error(f"Error processing segment {start_time_str} from hash for meeting {meeting_id}: {e}")
                                 segments_to_delete_from_redis.setdefault(meeting_id, set()).add(start_time_str)
+                                discarded_segments.setdefault(meeting_id, set()).add(start_time_str)
+
+                        keep_flags = local_transcription_filter.filter_segments(immutable_segments, meeting_id)
+                        for segment, keep in zip(immutable_segments, keep_flags):
+                            if not keep:
+                                discarded_segments.setdefault(meeting_id, set()).add(segment['start_key'])
+                            else:
+                                if segment['absolute_start'] is None:
+                                    # Stored before its session start was known
+                                    session_times = await get_session_times(db, meeting_id, segment['session_uid'])
+                                    segment['absolute_start'], segment['absolute_end'] = absolute_times(
+                                        resolve_session_start(session_times, segment['session_uid']), segment['start'], segment['end']
+                                    )
+                                batch_to_store.append(create_transcription_row(
+                                    meeting_id=meeting_id,
+                                    start=segment['start'],
+                                    end=segment['end'],
+                                    text=segment['text'],
+                                    language=segment['language'],
+                                    session_uid=segment['session_uid'],
+                                    mapped_speaker_name=segment['speaker'],
+                                    absolute_start_time=segment['absolute_start'],
+                                    absolute_end_time=segment['absolute_end']
+                                ))
+                        if remapped_segments:
+                            await redis_c.hset(hash_key, mapping=remapped_segments)
                     except Exception as e:
                         logger.error(f"Error processing meeting {meeting_id_str} in Redis-to-PG task: {e}", exc_info=True)
                 
                 if batch_to_store:
                     try:
-                        db.add_all(batch_to_store)
+                        await bulk_insert_transcriptions(db, batch_to_store)
                         await db.commit()
                         logger.info(f"Stored {len(batch_to_store)} segments to PostgreSQL from {len(segments_to_delete_from_redis)} meetings")
-                        
-                        for meeting_id, start_times in segments_to_delete_from_redis.items():
-                            if start_times:
-                                hash_key = f"meeting:{meeting_id}:segments"
-                                await redis_c.hdel(hash_key, *start_times)
-                                logger.debug(f"Deleted {len(start_times)} processed segments for meeting {meeting_id} from Redis Hash")
                     except Exception as e:
                         logger.error(f"Error committing batch to PostgreSQL: {e}", exc_info=True)
                         await db.rollback()
+                        # Keep the segments in Redis, they are retried next cycle
+                        continue
+                    try:
+                        requeued_ids = await requeue_archived_meetings(db, redis_c, {row['meeting_id'] for row in batch_to_store})
+                        if requeued_ids:
+                            logger.info(f"Queued already archived meetings {requeued_ids} for archiving their new segments")
+                    except Exception as e:
+                        logger.error(f"Failed to queue archived meetings for re-archiving, their new segments stay in the transcriptions table: {e}", exc_info=True)
                 else:
                     logger.debug("No segments ready for PostgreSQL storage this interval.")
+
+                # Also covers segments that were filtered out or could not be parsed, which would
+                # otherwise be re-read every cycle and keep their meeting in active_meetings
+                await delete_processed_segments(redis_c, segments_to_delete_from_redis, discarded_segments)
         
         except asyncio.CancelledError:
             logger.info("Redis-to-PostgreSQL processor task cancelled")
+            await shard_ownership.release()
             break
         except redis.exceptions.ConnectionError as e:
              logger.error(f"Redis connection error in Redis-to-PG task: {e}. Retrying after delay...", exc_info=True)
@@ -0,0 +1,108 @@
+import time
+import uuid
+import hashlib
+import logging
+from typing import List
+
+import redis.asyncio as aioredis
+
+from config import (
+    CONSUMER_NAME,
+    DB_WRITER_SHARDING_ENABLED,
+    DB_WRITER_LEASE_TTL_MS,
+    DB_WRITER_REPLICAS_KEY,
+    DB_WRITER_LEASE_KEY_PREFIX,
+)
+
+logger = logging.getLogger(__name__)
+
+# Acquires the lease if it is free, or renews it if this replica already holds it.
+_ACQUIRE_OR_RENEW_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+# Deletes the lease only if this replica holds it.
+_RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _score(replica_id: str, meeting_id: str) -> int:
+    return int.from_bytes(hashlib.md5(f"{replica_id}:{meeting_id}".encode()).digest()[:8], "big")
+
+
+def preferred_replica(meeting_id: str, replica_ids: List[str]) -> str:
+    """Rendezvous (highest random weight) hashing: every replica computes the same owner, and a
+    replica joining or leaving only moves the meetings it gains or loses."""
+    return max(replica_ids, key=lambda replica_id: _score(replica_id, meeting_id))
+
+
+class MeetingShardOwnership:
+    """Splits the db_writer flush work across collector replicas.
+
+    Each replica heartbeats into a sorted set of live replicas and only flushes the meetings
+    that rendezvous hashing assigns to it, guarded by a per-meeting lease key so two replicas
+    never flush the same meeting. When a replica dies its heartbeat and leases expire, and the
+    surviving replicas pick up its meetings on their next cycle.
+    """
+
+    def __init__(self, redis_c: aioredis.Redis):
+        self.redis_c = redis_c
+        # Unique per process, so replicas sharing CONSUMER_NAME still get separate shards
+        self.replica_id = f"{CONSUMER_NAME}-{uuid.uuid4().hex[:8]}"
+        self._acquire = redis_c.register_script(_ACQUIRE_OR_RENEW_LEASE)
+        self._release = redis_c.register_script(_RELEASE_LEASE)
+        self._owned: List[str] = []
+
+    async def live_replicas(self) -> List[str]:
+        now_ms = int(time.time() * 1000)
+        async with self.redis_c.pipeline(transaction=False) as pipe:
+            pipe.zadd(DB_WRITER_REPLICAS_KEY, {self.replica_id: now_ms})
+            pipe.zremrangebyscore(DB_WRITER_REPLICAS_KEY, '-inf', now_ms - DB_WRITER_LEASE_TTL_MS)
+            pipe.zrange(DB_WRITER_REPLICAS_KEY, 0, -1)
+            results = await pipe.execute()
+        return results[2] or [self.replica_id]
+
+    async def owned_meetings(self, meeting_ids: List[str]) -> List[str]:
+        """Returns the subset of `meeting_ids` this replica should flush in the current cycle."""
+        if not DB_WRITER_SHARDING_ENABLED or not meeting_ids:
+            return list(meeting_ids)
+        replica_ids = await self.live_replicas()
+        candidates = [mid for mid in meeting_ids if preferred_replica(mid, replica_ids) == self.replica_id]
+        if not candidates:
+            self._owned = []
+            return []
+        async with self.redis_c.pipeline(transaction=False) as pipe:
+            for meeting_id in candidates:
+                await self._acquire(keys=[f"{DB_WRITER_LEASE_KEY_PREFIX}:{meeting_id}"], args=[self.replica_id, DB_WRITER_LEASE_TTL_MS], client=pipe)
+            results = await pipe.execute()
+        self._owned = [mid for mid, acquired in zip(candidates, results) if acquired]
+        if len(self._owned) < len(candidates):
+            # Still leased by the previous owner; it is handed over once that lease expires
+            logger.debug(f"[Sharding] {self.replica_id} waiting for {len(candidates) - len(self._owned)} lease(s) held by other replicas")
+        logger.debug(f"[Sharding] {self.replica_id} owns {len(self._owned)}/{len(meeting_ids)} active meetings across {len(replica_ids)} replica(s)")
+        return self._owned
+
+    async def release(self):
+        """Gives up this replica's leases and membership so other replicas take over right away."""
+        if not DB_WRITER_SHARDING_ENABLED:
+            return
+        try:
+            async with self.redis_c.pipeline(transaction=False) as pipe:
+                for meeting_id in self._owned:
+                    await self._release(keys=[f"{DB_WRITER_LEASE_KEY_PREFIX}:{meeting_id}"], args=[self.replica_id], client=pipe)
+                pipe.zrem(DB_WRITER_REPLICAS_KEY, self.replica_id)
+                await pipe.execute()
+            logger.info(f"[Sharding] {self.replica_id} released {len(self._owned)} meeting lease(s)")
+        except Exception as e:
+            logger.error(f"[Sharding] Failed to release leases of {self.replica_id}: {e}", exc_info=True)
+        self._owned = []
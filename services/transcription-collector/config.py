@@ -5,6 +5,9 @@ REDIS_STREAM_NAME = os.environ.get("REDIS_STREAM_NAME", "transcription_segments"
 REDIS_CONSUMER_GROUP = os.environ.get("REDIS_CONSUMER_GROUP", "collector_group")
 REDIS_STREAM_READ_COUNT = int(os.environ.get("REDIS_STREAM_READ_COUNT", "10"))
 REDIS_STREAM_BLOCK_MS = int(os.environ.get("REDIS_STREAM_BLOCK_MS", "2000"))  # 2 seconds
+# Batch mode: read larger batches and process them with one DB session and one Redis pipeline
+REDIS_STREAM_BATCH_MODE = os.environ.get("REDIS_STREAM_BATCH_MODE", "false").lower() == "true"
+REDIS_STREAM_BATCH_READ_COUNT = int(os.environ.get("REDIS_STREAM_BATCH_READ_COUNT", "200"))
 # Use a fixed consumer name, potentially add hostname later if scaling replicas
 CONSUMER_NAME = os.environ.get("POD_NAME", "collector-main")  # Get POD_NAME from env if avail (k8s), else fixed
 PENDING_MSG_TIMEOUT_MS = 60000  # Milliseconds: Timeout after which pending messages are considered stale (e.g., 1 minute)
@@ -14,11 +17,35 @@ REDIS_SPEAKER_EVENTS_STREAM_NAME = os.environ.get("REDIS_SPEAKER_EVENTS_STREAM_N
 REDIS_SPEAKER_EVENTS_CONSUMER_GROUP = os.environ.get("REDIS_SPEAKER_EVENTS_CONSUMER_GROUP", "collector_speaker_group")
 REDIS_SPEAKER_EVENT_KEY_PREFIX = os.environ.get("REDIS_SPEAKER_EVENT_KEY_PREFIX", "speaker_events") # For sorted sets
 REDIS_SPEAKER_EVENT_TTL = int(os.environ.get("REDIS_SPEAKER_EVENT_TTL", "86400")) # 24 hours default TTL for speaker events sorted sets
+# Map speakers from an in-memory interval index fed by the speaker events consumer instead of querying Redis per segment.
+# Speaker events consumed by other replicas are picked up by re-reading the session's sorted set once its copy is older than SPEAKER_INDEX_MAX_AGE_S.
+SPEAKER_INDEX_ENABLED = os.environ.get("SPEAKER_INDEX_ENABLED", "true").lower() == "true"
+SPEAKER_INDEX_MAX_AGE_S = float(os.environ.get("SPEAKER_INDEX_MAX_AGE_S", "5"))  # seconds
 
 # Configuration for background processing
 BACKGROUND_TASK_INTERVAL = int(os.environ.get("BACKGROUND_TASK_INTERVAL", "10"))  # seconds
 IMMUTABILITY_THRESHOLD = int(os.environ.get("IMMUTABILITY_THRESHOLD", "30"))  # seconds
+# Split the Redis-to-PostgreSQL flush across collector replicas by meeting, with a lease per meeting
+DB_WRITER_SHARDING_ENABLED = os.environ.get("DB_WRITER_SHARDING_ENABLED", "true").lower() == "true"
+DB_WRITER_LEASE_TTL_MS = int(os.environ.get("DB_WRITER_LEASE_TTL_MS", str(max(6 * BACKGROUND_TASK_INTERVAL, 30) * 1000)))  # also the replica heartbeat timeout
+DB_WRITER_REPLICAS_KEY = os.environ.get("DB_WRITER_REPLICAS_KEY", "db_writer:replicas")
+DB_WRITER_LEASE_KEY_PREFIX = os.environ.get("DB_WRITER_LEASE_KEY_PREFIX", "db_writer:lease")
+DB_WRITER_INSERT_CHUNK_SIZE = int(os.environ.get("DB_WRITER_INSERT_CHUNK_SIZE", "5000"))  # rows per bulk INSERT statement
+TRANSCRIPT_STREAM_FETCH_SIZE = int(os.environ.get("TRANSCRIPT_STREAM_FETCH_SIZE", "500"))  # rows per server-side cursor fetch when reading transcripts
 REDIS_SEGMENT_TTL = int(os.environ.get("REDIS_SEGMENT_TTL", "3600"))  # 1 hour default TTL for Redis segments
+REDIS_SEGMENT_CHANGES_RETENTION = int(os.environ.get("REDIS_SEGMENT_CHANGES_RETENTION", "600"))  # seconds of per-meeting change feed kept for "since" polls
+LIVE_UPDATES_BLOCK_MS = int(os.environ.get("LIVE_UPDATES_BLOCK_MS", "1000"))  # XREAD block of the live transcript hub; also the delay before a newly watched meeting is followed
+LIVE_UPDATES_QUEUE_SIZE = int(os.environ.get("LIVE_UPDATES_QUEUE_SIZE", "1000"))  # pending change feed entries per live subscriber before it is dropped
+LIVE_UPDATES_KEEPALIVE = int(os.environ.get("LIVE_UPDATES_KEEPALIVE", "15"))  # seconds between SSE keep-alive comments
+TRANSCRIPT_ARCHIVE_PENDING_KEY = "transcript_archive_pending"  # bot-manager's sorted set of meetings waiting to be archived, re-queued when rows arrive for an archived meeting
+REDIS_SEGMENT_UPDATES_KEY = os.environ.get("REDIS_SEGMENT_UPDATES_KEY", "segment_updates")  # sorted set of "<meeting_id>:<start>" scored by last update time
+SEGMENT_FINGERPRINT_MAX_MEETINGS = int(os.environ.get("SEGMENT_FINGERPRINT_MAX_MEETINGS", "10000"))  # meetings whose segment fingerprints are kept, 0 disables skipping unchanged segments
+SEGMENT_FINGERPRINT_MAX_SEGMENTS = int(os.environ.get("SEGMENT_FINGERPRINT_MAX_SEGMENTS", "200"))  # most recently written segments kept per meeting, well above what WhisperLive resends
+
+# In-process cache for token -> user and meeting lookups, invalidated via Redis pub/sub
+LOOKUP_CACHE_TTL = int(os.environ.get("LOOKUP_CACHE_TTL", "300"))  # seconds
+LOOKUP_CACHE_MAX_SIZE = int(os.environ.get("LOOKUP_CACHE_MAX_SIZE", "10000"))  # entries per cache, 0 disables caching
+CACHE_INVALIDATION_CHANNEL = os.environ.get("CACHE_INVALIDATION_CHANNEL", "cache_invalidation")
 
 # Logging configuration
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
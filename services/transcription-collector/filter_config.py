@@ -16,6 +16,11 @@ MIN_CHARACTER_LENGTH = 3
 # Minimum number of real words (3+ chars) for a segment to be considered informative
 MIN_REAL_WORDS = 1
 
+# Deduplication cache: segments starting more than this many seconds before the latest
+# processed one are forgotten, and at most this many segments are kept per meeting
+DEDUP_HORIZON_SECONDS = 600
+DEDUP_MAX_SEGMENTS_PER_MEETING = 5000
+
 # Define your own custom filter functions here
 # Each function should take text as input and return True to keep or False to filter out
 
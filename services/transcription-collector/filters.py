@@ -1,8 +1,9 @@
 import re
+import bisect
 import logging
 import importlib
 import os
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger("transcription_collector.filters")
 
@@ -22,6 +23,50 @@ BASE_NON_INFORMATIVE_PATTERNS = [
     r"^<<$",   # Just '<<' characters
 ]
 
+class ProcessedSegmentIndex:
+    """Processed segments of one meeting, sorted by start time, for time-based deduplication.
+
+    Only segments that can still overlap new ones are kept: segments starting more than
+    `horizon_seconds` before the latest processed start are dropped, as are the oldest ones
+    beyond `max_segments`. Overlap lookups bisect on start time, bounded by the longest
+    cached segment, instead of scanning the whole meeting.
+    """
+
+    def __init__(self, horizon_seconds: float, max_segments: int):
+        self.horizon_seconds = horizon_seconds
+        self.max_segments = max_segments
+        self.starts: List[float] = []
+        self.segments: List[Tuple[float, float, str]] = [] # (start, end, stripped text)
+        self.max_duration = 0.0
+        self.latest_start = float('-inf')
+
+    def __len__(self):
+        return len(self.segments)
+
+    def overlapping(self, start_time: float, end_time: float) -> List[int]:
+        """Indices of cached segments whose interval touches [start_time, end_time]."""
+        lo = bisect.bisect_left(self.starts, start_time - self.max_duration)
+        hi = bisect.bisect_right(self.starts, end_time)
+        return [i for i in range(lo, hi) if self.segments[i][1] >= start_time]
+
+    def remove(self, indices: List[int]):
+        for i in sorted(indices, reverse=True):
+            del self.starts[i]
+            del self.segments[i]
+
+    def add(self, text: str, start_time: float, end_time: float):
+        i = bisect.bisect_right(self.starts, start_time)
+        self.starts.insert(i, start_time)
+        self.segments.insert(i, (start_time, end_time, text))
+        self.max_duration = max(self.max_duration, end_time - start_time)
+        self.latest_start = max(self.latest_start, start_time)
+        # Slide the horizon and enforce the memory cap, both dropping the earliest segments
+        cut = bisect.bisect_left(self.starts, self.latest_start - self.horizon_seconds)
+        cut = max(cut, len(self.segments) - self.max_segments)
+        if cut > 0:
+            del self.starts[:cut]
+            del self.segments[:cut]
+
 class TranscriptionFilter:
     """Manages transcription filtering logic"""
     
@@ -31,10 +76,13 @@ class TranscriptionFilter:
         self.min_character_length = 3
         self.min_real_words = 1
         self.stopwords = {}
-        self.processed_segments_cache_by_meeting: Dict[int, List[Dict[str, any]]] = {}
+        self.dedup_horizon_seconds = 600
+        self.dedup_max_segments_per_meeting = 5000
+        self.processed_segments_cache_by_meeting: Dict[int, ProcessedSegmentIndex] = {}
         
         # Load configuration
         self.load_config()
+        self.compile()
     
     def load_config(self):
         """Load filter configuration from filter_config.py"""
@@ -62,6 +110,14 @@ class TranscriptionFilter:
                 self.custom_filters.extend(config.CUSTOM_FILTERS)
                 logger.info(f"Added {len(config.CUSTOM_FILTERS)} custom filter functions")
             
+            # Deduplication cache horizon and per-meeting cap
+            if hasattr(config, 'DEDUP_HORIZON_SECONDS'):
+                self.dedup_horizon_seconds = config.DEDUP_HORIZON_SECONDS
+                logger.info(f"Set deduplication horizon to {self.dedup_horizon_seconds}s")
+            if hasattr(config, 'DEDUP_MAX_SEGMENTS_PER_MEETING'):
+                self.dedup_max_segments_per_meeting = config.DEDUP_MAX_SEGMENTS_PER_MEETING
+                logger.info(f"Set deduplication cache cap to {self.dedup_max_segments_per_meeting} segments per meeting")
+            
             # Add stopwords
             if hasattr(config, 'STOPWORDS'):
                 self.stopwords = config.STOPWORDS
@@ -73,6 +129,43 @@ class TranscriptionFilter:
         except Exception as e:
             logger.error(f"Error loading filter configuration: {e}")
     
+    def compile(self):
+        """Compiles the patterns into one alternation regex and the stopwords into frozensets.
+        Called after load_config; call again after changing `patterns` or `stopwords` directly."""
+        try:
+            self._combined_pattern = re.compile("|".join(f"(?:{pattern})" for pattern in self.patterns))
+        except re.error as e:
+            # e.g. a pattern with global inline flags, which cannot be combined; match them one by one
+            logger.warning(f"Could not combine filter patterns into one regex ({e}), matching them individually")
+            self._combined_pattern = None
+        self._compiled_patterns = [re.compile(pattern) for pattern in self.patterns]
+        self._stopword_sets = {
+            language: frozenset(word.lower() for word in words)
+            for language, words in self.stopwords.items()
+        }
+
+    def _matching_pattern(self, text: str) -> Optional[str]:
+        """Returns the first pattern matching the start of `text`, or None."""
+        if self._combined_pattern is not None and not self._combined_pattern.match(text):
+            return None
+        for pattern, compiled in zip(self.patterns, self._compiled_patterns):
+            if compiled.match(text):
+                return pattern
+        return None
+
+    def has_enough_real_words(self, text: str, language: Optional[str] = 'en') -> bool:
+        """True if `text` has at least min_real_words words of 3+ characters that are not tags or stopwords."""
+        if self.min_real_words <= 0:
+            return True
+        stopwords = self._stopword_sets.get(language, frozenset())
+        real_word_count = 0
+        for w in text.split():
+            if len(w) >= 3 and w[0] not in '<[' and w.lower() not in stopwords:
+                real_word_count += 1
+                if real_word_count >= self.min_real_words:
+                    return True
+        return False
+
     def add_custom_filter(self, filter_function):
         """
         Add a custom filter function
@@ -84,7 +177,7 @@ class TranscriptionFilter:
     
     def is_stop_word(self, word, language='en'):
         """Check if a word is a stopword in the given language"""
-        return language in self.stopwords and word.lower() in self.stopwords[language]
+        return word.lower() in self._stopword_sets.get(language, frozenset())
     
     def clear_processed_segments_cache(self, meeting_id: int):
         """Clears the cache of processed segments for a specific meeting."""
@@ -118,34 +211,28 @@ class TranscriptionFilter:
             return False
         
         # Check against patterns
-        for pattern in self.patterns:
-            if re.match(pattern, text):
-                logger.debug(f"Filtering out text matching pattern {pattern}: '{original_text_for_logging}'")
-                return False
+        pattern = self._matching_pattern(text)
+        if pattern is not None:
+            logger.debug(f"Filtering out text matching pattern {pattern}: '{original_text_for_logging}'")
+            return False
         
         # Count actual words (at least 3 characters) - exclude stopwords
-        real_words = [
-            w for w in text.split() 
-            if len(w) >= 3 and 
-            not w.startswith('<') and 
-            not w.startswith('[') and
-            not self.is_stop_word(w, language)
-        ]
-        
-        if len(real_words) < self.min_real_words:
+        if not self.has_enough_real_words(text, language):
             logger.debug(f"Filtering out text with insufficient real words: '{original_text_for_logging}'")
             return False
 
-        # Time-based deduplication logic
-        current_meeting_cache = self.processed_segments_cache_by_meeting.setdefault(meeting_id, [])
+        # Time-based deduplication logic, only against cached segments touching this one
+        current_meeting_cache = self.processed_segments_cache_by_meeting.get(meeting_id)
+        if current_meeting_cache is None:
+            current_meeting_cache = self.processed_segments_cache_by_meeting[meeting_id] = ProcessedSegmentIndex(
+                self.dedup_horizon_seconds, self.dedup_max_segments_per_meeting
+            )
         
         indices_to_remove_from_cache = []
         should_filter_current = False
 
-        for i, cached_segment in enumerate(current_meeting_cache):
-            cached_text = cached_segment['text'] # Ensure we are using stripped text from cache
-            cached_start = cached_segment['start']
-            cached_end = cached_segment['end']
+        for i in current_meeting_cache.overlapping(start_time, end_time):
+            cached_start, cached_end, cached_text = current_meeting_cache.segments[i] # Cached text is stripped
 
             # Condition 1: Current segment's text is identical to a cached segment's text
             if text == cached_text:
@@ -186,8 +273,7 @@ class TranscriptionFilter:
 
         # Remove marked cached segments (those that were sub-segments of the current one and met removal criteria)
         if indices_to_remove_from_cache:
-            for i_val in sorted(indices_to_remove_from_cache, reverse=True):
-                del current_meeting_cache[i_val]
+            current_meeting_cache.remove(indices_to_remove_from_cache)
             logger.debug(f"Removed {len(indices_to_remove_from_cache)} sub-segments from cache for MeetingID {meeting_id} after processing current segment '{text}'.")
 
         # Apply any custom filters
@@ -200,5 +286,28 @@ class TranscriptionFilter:
                 logger.error(f"Error in custom filter {custom_filter.__name__} for MeetingID {meeting_id}: {e}")
         
         # If all filters pass, add to cache for this meeting and return True
-        current_meeting_cache.append({'text': text, 'start': start_time, 'end': end_time}) # Add stripped text to cache
-        return True 
\ No newline at end of file
+        current_meeting_cache.add(text, start_time, end_time) # Add stripped text to cache
+        return True
+
+    def filter_segments(self, segments: List[Dict[str, Any]], meeting_id: int) -> List[bool]:
+        """
+        Apply filter_segment to the segments of one meeting, in order
+        
+        Args:
+            segments: Dicts with 'text', 'start', 'end' and optionally 'language' keys,
+                      preferably sorted by start time
+            meeting_id (int): The ID of the meeting all segments belong to
+            
+        Returns:
+            List[bool]: For each segment, True if it passes all filters
+        """
+        return [
+            self.filter_segment(
+                segment['text'],
+                start_time=segment['start'],
+                end_time=segment['end'],
+                meeting_id=meeting_id,
+                language=segment.get('language')
+            )
+            for segment in segments
+        ]
@@ -0,0 +1,147 @@
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from config import LOOKUP_CACHE_MAX_SIZE, LOOKUP_CACHE_TTL, CACHE_INVALIDATION_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds.
+
+    Used for lookups that almost never change (API token -> user, meeting key -> meeting),
+    so a missed invalidation message can only serve a stale entry for at most `ttl` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CachedUser(NamedTuple):
+    """The User fields the collector needs, detached from any session.
+
+    Cached lookups hold these plain values rather than ORM instances: an instance is bound to the
+    session that loaded it and is expired by that session's rollback, after which reading an
+    attribute raises (DetachedInstanceError, or MissingGreenlet for an async lazy load).
+    """
+    id: int
+
+    @classmethod
+    def from_model(cls, user) -> "CachedUser":
+        return cls(id=user.id)
+
+
+class CachedMeeting(NamedTuple):
+    """The Meeting fields the collector needs, detached from any session (see CachedUser)."""
+    id: int
+    user_id: int
+    platform: str
+    platform_specific_id: Optional[str]
+
+    @classmethod
+    def from_model(cls, meeting) -> "CachedMeeting":
+        return cls(id=meeting.id, user_id=meeting.user_id, platform=meeting.platform, platform_specific_id=meeting.platform_specific_id)
+
+
+# API token -> CachedUser
+user_cache = TTLCache(LOOKUP_CACHE_MAX_SIZE, LOOKUP_CACHE_TTL)
+# (user_id, platform, native_meeting_id) -> latest CachedMeeting
+meeting_cache = TTLCache(LOOKUP_CACHE_MAX_SIZE, LOOKUP_CACHE_TTL)
+# meeting_id -> {session_uid: session start time}
+session_times_cache = TTLCache(LOOKUP_CACHE_MAX_SIZE, LOOKUP_CACHE_TTL)
+
+
+def apply_invalidation(message: dict):
+    """Drops the cache entries named by an invalidation message.
+
+    Messages are JSON objects published by admin-api and bot-manager:
+      {"type": "token", "token": "..."}
+      {"type": "meeting", "user_id": 1, "platform": "google_meet", "native_meeting_id": "..."}
+      {"type": "sessions", "meeting_id": 1}
+    Unknown types clear all caches.
+    """
+    message_type = message.get("type")
+    if message_type == "token" and message.get("token"):
+        user_cache.invalidate(message["token"])
+    elif message_type == "meeting":
+        meeting_cache.invalidate((message.get("user_id"), message.get("platform"), message.get("native_meeting_id")))
+    elif message_type == "sessions":
+        session_times_cache.invalidate(message.get("meeting_id"))
+    else:
+        clear_all()
+
+
+def clear_all():
+    user_cache.clear()
+    meeting_cache.clear()
+    session_times_cache.clear()
+
+
+async def listen_for_cache_invalidations(redis_c: aioredis.Redis):
+    """Background task applying invalidation messages from the CACHE_INVALIDATION_CHANNEL pub/sub channel."""
+    logger.info(f"Starting cache invalidation listener on channel '{CACHE_INVALIDATION_CHANNEL}'...")
+    while True:
+        pubsub = redis_c.pubsub()
+        try:
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            # Anything published while we were not subscribed is lost, so start from a clean cache
+            clear_all()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    apply_invalidation(json.loads(message["data"]))
+                except (json.JSONDecodeError, TypeError, AttributeError) as e:
+                    logger.warning(f"Invalid cache invalidation message {message.get('data')!r}: {e}. Clearing lookup caches.")
+                    clear_all()
+        except asyncio.CancelledError:
+            logger.info("Cache invalidation listener task cancelled.")
+            break
+        except redis.exceptions.ConnectionError as e:
+            logger.error(f"Redis connection error in cache invalidation listener: {e}. Retrying after delay...", exc_info=True)
+            await asyncio.sleep(5)
+        except Exception as e:
+            logger.error(f"Unhandled error in cache invalidation listener: {e}", exc_info=True)
+            await asyncio.sleep(5)
+        finally:
+            try:
+                await pubsub.close()
+            except Exception:
+                pass
@@ -29,6 +29,8 @@ from config import (
 from api.endpoints import router as api_router
 from streaming.consumer import claim_stale_messages, consume_redis_stream, consume_speaker_events_stream
 from background.db_writer import process_redis_to_postgres
+from lookup_cache import listen_for_cache_invalidations
+from streaming.live_updates import live_transcript_hub
 
 app = FastAPI(
     title="Transcription Collector",
@@ -53,10 +55,12 @@ transcription_filter = TranscriptionFilter()
 redis_to_pg_task = None
 stream_consumer_task = None
 speaker_stream_consumer_task = None
+cache_invalidation_task = None
+live_transcript_hub_task = None
 
 @app.on_event("startup")
 async def startup():
-    global redis_client, redis_to_pg_task, stream_consumer_task, speaker_stream_consumer_task, transcription_filter
+    global redis_client, redis_to_pg_task, stream_consumer_task, speaker_stream_consumer_task, cache_invalidation_task, live_transcript_hub_task, transcription_filter
     
     logger.info(f"Connecting to Redis at {REDIS_HOST}:{REDIS_PORT}")
     temp_redis_client = aioredis.Redis(
@@ -105,6 +109,12 @@ async def startup():
     
     logger.info("Database initialized.")
     
+    cache_invalidation_task = asyncio.create_task(listen_for_cache_invalidations(redis_client))
+    logger.info("Lookup cache invalidation listener started.")
+
+    live_transcript_hub_task = asyncio.create_task(live_transcript_hub.run(redis_client))
+    logger.info("Live transcript hub started.")
+
     await claim_stale_messages(redis_client)
     
     redis_to_pg_task = asyncio.create_task(process_redis_to_postgres(redis_client, transcription_filter))
@@ -121,7 +131,7 @@ async def startup():
 async def shutdown():
     logger.info("Application shutting down...")
     # Cancel background tasks
-    tasks_to_cancel = [redis_to_pg_task, stream_consumer_task, speaker_stream_consumer_task]
+    tasks_to_cancel = [redis_to_pg_task, stream_consumer_task, speaker_stream_consumer_task, cache_invalidation_task, live_transcript_hub_task]
     for i, task in enumerate(tasks_to_cancel):
         if task and not task.done():
             task.cancel()
@@ -0,0 +1,230 @@
+import json
+import time
+import bisect
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from config import SPEAKER_INDEX_ENABLED, SPEAKER_INDEX_MAX_AGE_S, REDIS_SPEAKER_EVENT_TTL
+from mapping.speaker_mapper import (
+    get_speaker_mappings_for_segments,
+    STATUS_UNKNOWN,
+    STATUS_MAPPED,
+    STATUS_MULTIPLE,
+    STATUS_NO_SPEAKER_EVENTS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SessionSpeakerIntervals:
+    """Speaker activity of one session as pre-paired [start, end] intervals, sorted by start.
+
+    Each SPEAKER_START opens an interval for its participant (a repeated START while one is
+    already open is treated as the same turn) and the next SPEAKER_END of that participant
+    closes it. Events normally arrive in timestamp order and are paired incrementally; an
+    out-of-order event marks the session for a rebuild on the next lookup.
+    """
+
+    def __init__(self):
+        self.events: List[Tuple[float, str, str, Optional[str], Optional[str]]] = []  # (ts, type, key, name, id_meet)
+        self.event_times: List[float] = []  # timestamps of self.events, for bisect
+        self.seen = set()
+        self.hydrated_at: Optional[float] = None
+        self.last_access = time.monotonic()
+        self._reset_intervals()
+        self._dirty = False
+
+    def _reset_intervals(self):
+        self.starts: List[float] = []
+        self.intervals: List[list] = []  # [start, end or None, key, name, id_meet]
+        self.open: Dict[str, list] = {}
+        self.max_closed_ms = 0.0
+
+    def add(self, ts: float, event_type: str, key: str, name: Optional[str], id_meet: Optional[str]) -> bool:
+        """Adds an event; returns False if it was already indexed."""
+        dedup_key = (ts, event_type, key)
+        if dedup_key in self.seen:
+            return False
+        self.seen.add(dedup_key)
+        event = (ts, event_type, key, name, id_meet)
+        if self.events and ts < self.events[-1][0]:
+            idx = bisect.bisect_right(self.event_times, ts)
+            self.events.insert(idx, event)
+            self.event_times.insert(idx, ts)
+            self._dirty = True
+        else:
+            self.events.append(event)
+            self.event_times.append(ts)
+            if not self._dirty:
+                self._pair(event)
+        return True
+
+    def is_stale(self, max_age_s: float) -> bool:
+        return self.hydrated_at is None or time.monotonic() - self.hydrated_at > max_age_s
+
+    def _pair(self, event):
+        ts, event_type, key, name, id_meet = event
+        if event_type == "SPEAKER_START":
+            if key in self.open:
+                return
+            interval = [ts, None, key, name, id_meet]
+            self.open[key] = interval
+            self.starts.append(ts)
+            self.intervals.append(interval)
+        elif event_type == "SPEAKER_END":
+            interval = self.open.pop(key, None)
+            if interval is not None:
+                interval[1] = ts
+                self.max_closed_ms = max(self.max_closed_ms, ts - interval[0])
+
+    def _rebuild(self):
+        self._reset_intervals()
+        for event in self.events:
+            self._pair(event)
+        self._dirty = False
+
+    def overlapping(self, segment_start_ms: float, segment_end_ms: float) -> Dict[str, Dict[str, Any]]:
+        """Returns per participant the overlap (ms) of their latest turn starting before the segment end."""
+        if self._dirty:
+            self._rebuild()
+        # Closed intervals starting before (segment start - longest closed interval) cannot reach the segment
+        hi = bisect.bisect_right(self.starts, segment_end_ms)
+        lo = bisect.bisect_left(self.starts, segment_start_ms - self.max_closed_ms)
+        latest: Dict[str, list] = {}
+        for interval in self.intervals[lo:hi]:
+            latest[interval[2]] = interval
+        for key, interval in self.open.items():
+            if interval[0] < segment_start_ms - self.max_closed_ms:
+                latest.setdefault(key, interval)
+
+        active: Dict[str, Dict[str, Any]] = {}
+        for key, (start, end, _, name, id_meet) in latest.items():
+            # An open interval is still speaking, so it lasts at least until the segment ends
+            overlap = min(segment_end_ms if end is None else end, segment_end_ms) - max(start, segment_start_ms)
+            if overlap > 0:
+                active[key] = {"name": name, "id": id_meet, "overlap_duration": overlap, "start_event_ts": start}
+        return active
+
+
+class SpeakerIntervalIndex:
+    """In-memory speaker interval index per session UID, fed by the speaker events consumer.
+
+    The Redis sorted sets written by process_speaker_event_message stay the durable copy. A
+    session is (re)loaded from Redis on its first lookup (e.g. after a restart) and again once
+    its last load is older than max_age_s, which picks up the events consumed by other replicas
+    of the speaker events consumer group; events consumed locally in between are merged in
+    without duplicates.
+    """
+
+    def __init__(self, idle_ttl_s: float, max_age_s: float):
+        self.idle_ttl_s = idle_ttl_s
+        self.max_age_s = max_age_s
+        self.sessions: Dict[str, SessionSpeakerIntervals] = {}
+        self._last_prune = time.monotonic()
+
+    def get_session(self, session_uid: str) -> SessionSpeakerIntervals:
+        session = self.sessions.get(session_uid)
+        if session is None:
+            session = self.sessions[session_uid] = SessionSpeakerIntervals()
+        session.last_access = time.monotonic()
+        return session
+
+    def add_event(self, session_uid: str, event: Dict[str, Any], timestamp_ms: float):
+        key = event.get("participant_id_meet") or event.get("participant_name")
+        event_type = event.get("event_type")
+        if not key or event_type not in ("SPEAKER_START", "SPEAKER_END"):
+            return
+        self.get_session(session_uid).add(timestamp_ms, event_type, key, event.get("participant_name"), event.get("participant_id_meet"))
+        self._prune()
+
+    def remove_session(self, session_uid: str):
+        self.sessions.pop(session_uid, None)
+
+    def _prune(self):
+        # Sessions idle longer than their Redis sorted sets live are dropped
+        now = time.monotonic()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        for session_uid in [uid for uid, s in self.sessions.items() if now - s.last_access > self.idle_ttl_s]:
+            del self.sessions[session_uid]
+
+    async def hydrate(self, redis_c: aioredis.Redis, session_uid: str, speaker_event_key: str, session: SessionSpeakerIntervals):
+        hydrated_at = time.monotonic()
+        speaker_events_raw = await redis_c.zrange(speaker_event_key, 0, -1, withscores=True)
+        for event_data, score_ms in speaker_events_raw:
+            if isinstance(event_data, bytes):
+                event_data = event_data.decode('utf-8')
+            try:
+                event = json.loads(event_data)
+            except json.JSONDecodeError:
+                logger.warning(f"Failed to parse speaker event JSON: {event_data}")
+                continue
+            self.add_event(session_uid, event, float(score_ms))
+        session.hydrated_at = hydrated_at
+        logger.debug(f"[SpeakerIndex] Loaded {len(speaker_events_raw)} speaker events for UID {session_uid} from Redis.")
+
+    def map_segment(self, session_uid: str, segment_start_ms: float, segment_end_ms: float) -> Dict[str, Any]:
+        """Maps a speaker to a segment, with the same result shape and statuses as map_speaker_to_segment."""
+        session = self.sessions.get(session_uid)
+        if session is None or not session.events:
+            return {"speaker_name": None, "participant_id_meet": None, "status": STATUS_NO_SPEAKER_EVENTS}
+        active = session.overlapping(segment_start_ms, segment_end_ms)
+        if not active:
+            return {"speaker_name": None, "participant_id_meet": None, "status": STATUS_UNKNOWN}
+        # Longest overlap wins; on equal overlap (e.g. several speakers covering the whole segment) the latest turn
+        best = max(active.values(), key=lambda x: (x["overlap_duration"], x["start_event_ts"]))
+        status = STATUS_MAPPED if len(active) == 1 else STATUS_MULTIPLE
+        return {"speaker_name": best["name"], "participant_id_meet": best["id"], "status": status}
+
+
+speaker_index = SpeakerIntervalIndex(idle_ttl_s=REDIS_SPEAKER_EVENT_TTL, max_age_s=SPEAKER_INDEX_MAX_AGE_S)
+
+
+async def get_indexed_speaker_mappings_for_segments(
+    redis_c: 'aioredis.Redis',
+    session_uid: str,
+    segments_ms: List[Tuple[float, float]],
+    config_speaker_event_key_prefix: str,
+    context_log_msg: str = ""
+) -> List[Dict[str, Any]]:
+    """
+    Drop-in replacement for get_speaker_mappings_for_segments answering from the in-memory
+    interval index; falls back to the Redis path if the index is disabled or cannot be loaded.
+    """
+    if not SPEAKER_INDEX_ENABLED or not session_uid:
+        return await get_speaker_mappings_for_segments(
+            redis_c, session_uid, segments_ms, config_speaker_event_key_prefix, context_log_msg
+        )
+    session = speaker_index.get_session(session_uid)
+    if session.is_stale(speaker_index.max_age_s):
+        try:
+            await speaker_index.hydrate(redis_c, session_uid, f"{config_speaker_event_key_prefix}:{session_uid}", session)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"{context_log_msg} UID:{session_uid} Redis error loading speaker events into index: {e}", exc_info=True)
+            return await get_speaker_mappings_for_segments(
+                redis_c, session_uid, segments_ms, config_speaker_event_key_prefix, context_log_msg
+            )
+    results = [speaker_index.map_segment(session_uid, start_ms, end_ms) for start_ms, end_ms in segments_ms]
+    for (start_ms, end_ms), result in zip(segments_ms, results):
+        if result["status"] != STATUS_NO_SPEAKER_EVENTS:
+            logger.info(f"{context_log_msg} UID:{session_uid} Seg:{start_ms:.0f}-{end_ms:.0f}ms Result: Name='{result['speaker_name']}', Status='{result['status']}'")
+    return results
+
+
+async def get_indexed_speaker_mapping_for_segment(
+    redis_c: 'aioredis.Redis',
+    session_uid: str,
+    segment_start_ms: float,
+    segment_end_ms: float,
+    config_speaker_event_key_prefix: str,
+    context_log_msg: str = ""
+) -> Dict[str, Any]:
+    """Single-segment form of get_indexed_speaker_mappings_for_segments."""
+    results = await get_indexed_speaker_mappings_for_segments(
+        redis_c, session_uid, [(segment_start_ms, segment_end_ms)], config_speaker_event_key_prefix, context_log_msg
+    )
+    return results[0]
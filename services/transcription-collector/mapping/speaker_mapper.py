@@ -1,3 +1,4 @@
+import bisect
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 import json
@@ -38,10 +39,6 @@ def map_speaker_to_segment(
             'participant_id_meet': Google Meet participant ID, or None.
             'status': Mapping status (e.g., MAPPED, UNKNOWN, MULTIPLE).
     """
-    active_speaker_name: Optional[str] = None
-    active_participant_id: Optional[str] = None
-    mapping_status = STATUS_UNKNOWN
-
     if not speaker_events_for_session:
         return {
             "speaker_name": None, 
@@ -49,7 +46,14 @@ def map_speaker_to_segment(
             "status": STATUS_NO_SPEAKER_EVENTS
         }
 
-    # Parse speaker events from JSON string to dict
+    parsed_events = parse_speaker_events(speaker_events_for_session)
+    if not parsed_events:
+        return {"speaker_name": None, "participant_id_meet": None, "status": STATUS_ERROR} # Error parsing all events
+
+    return map_speaker_to_segment_parsed(segment_start_ms, segment_end_ms, parsed_events, session_end_time_ms)
+
+def parse_speaker_events(speaker_events_for_session: List[Tuple[str, float]]) -> List[Dict[str, Any]]:
+    """Parses (event_json_str, timestamp_ms) tuples into event dicts carrying 'relative_client_timestamp_ms'."""
     parsed_events: List[Dict[str, Any]] = []
     for event_json, timestamp in speaker_events_for_session:
         try:
@@ -59,9 +63,21 @@ def map_speaker_to_segment(
         except json.JSONDecodeError:
             logger.warning(f"Failed to parse speaker event JSON: {event_json}")
             continue
-    
+    return parsed_events
+
+def map_speaker_to_segment_parsed(
+    segment_start_ms: float,
+    segment_end_ms: float,
+    parsed_events: List[Dict[str, Any]],
+    session_end_time_ms: Optional[float] = None
+) -> Dict[str, Any]:
+    """Same as map_speaker_to_segment, for events already parsed by parse_speaker_events."""
+    active_speaker_name: Optional[str] = None
+    active_participant_id: Optional[str] = None
+    mapping_status = STATUS_UNKNOWN
+
     if not parsed_events:
-        return {"speaker_name": None, "participant_id_meet": None, "status": STATUS_ERROR} # Error parsing all events
+        return {"speaker_name": None, "participant_id_meet": None, "status": STATUS_NO_SPEAKER_EVENTS}
 
     # Find speaker(s) active during the segment interval
     # This is a simplified approach: considers the speaker whose START event is closest before or at segment_start_ms
@@ -229,4 +245,61 @@ async def get_speaker_mapping_for_segment(
         "speaker_name": mapped_speaker_name,
         "participant_id_meet": active_participant_id,
         "status": mapping_status
-    } 
\ No newline at end of file
+    }
+
+async def get_speaker_mappings_for_segments(
+    redis_c: 'aioredis.Redis',
+    session_uid: str,
+    segments_ms: List[Tuple[float, float]], # (segment_start_ms, segment_end_ms) per segment
+    config_speaker_event_key_prefix: str,
+    context_log_msg: str = ""
+) -> List[Dict[str, Any]]:
+    """
+    Batch version of get_speaker_mapping_for_segment for several segments of one session.
+    Fetches the speaker events of the union time range with a single ZRANGEBYSCORE, parses
+    them once, and maps each segment against the events of its own fetch window.
+    Returns one mapping result per segment, in the order given.
+    """
+    if not segments_ms:
+        return []
+    if not session_uid:
+        logger.warning(f"{context_log_msg} No session_uid provided. Cannot map speakers.")
+        return [{"speaker_name": None, "participant_id_meet": None, "status": STATUS_UNKNOWN} for _ in segments_ms]
+
+    range_start_ms = min(start for start, _ in segments_ms) - PRE_SEGMENT_SPEAKER_EVENT_FETCH_MS
+    range_end_ms = max(end for _, end in segments_ms) + POST_SEGMENT_SPEAKER_EVENT_FETCH_MS
+    try:
+        speaker_events_raw = await redis_c.zrangebyscore(
+            f"{config_speaker_event_key_prefix}:{session_uid}",
+            min=range_start_ms,
+            max=range_end_ms,
+            withscores=True
+        )
+    except redis.exceptions.RedisError as re:
+        logger.error(f"{context_log_msg} UID:{session_uid} Range:{range_start_ms}-{range_end_ms} Redis error fetching speaker events: {re}", exc_info=True)
+        return [{"speaker_name": None, "participant_id_meet": None, "status": STATUS_ERROR} for _ in segments_ms]
+
+    speaker_events_for_mapper: List[Tuple[str, float]] = [
+        (event_data.decode('utf-8') if isinstance(event_data, bytes) else event_data, float(score_ms))
+        for event_data, score_ms in speaker_events_raw
+    ]
+    # ZRANGEBYSCORE returns events sorted by timestamp, so each segment's window is a slice
+    parsed_events = parse_speaker_events(speaker_events_for_mapper)
+    event_timestamps = [event['relative_client_timestamp_ms'] for event in parsed_events]
+
+    results: List[Dict[str, Any]] = []
+    for segment_start_ms, segment_end_ms in segments_ms:
+        lo = bisect.bisect_left(event_timestamps, segment_start_ms - PRE_SEGMENT_SPEAKER_EVENT_FETCH_MS)
+        hi = bisect.bisect_right(event_timestamps, segment_end_ms + POST_SEGMENT_SPEAKER_EVENT_FETCH_MS)
+        try:
+            if speaker_events_for_mapper and not parsed_events:
+                mapping_result = {"speaker_name": None, "participant_id_meet": None, "status": STATUS_ERROR}
+            else:
+                mapping_result = map_speaker_to_segment_parsed(segment_start_ms, segment_end_ms, parsed_events[lo:hi])
+        except Exception as map_err:
+            logger.error(f"{context_log_msg} UID:{session_uid} Seg:{segment_start_ms}-{segment_end_ms} Speaker mapping error: {map_err}", exc_info=True)
+            mapping_result = {"speaker_name": None, "participant_id_meet": None, "status": STATUS_ERROR}
+        results.append(mapping_result)
+
+    logger.debug(f"{context_log_msg} UID:{session_uid} Mapped {len(segments_ms)} segments from {len(parsed_events)} speaker events fetched once.")
+    return results
@@ -11,10 +11,12 @@ from config import (
     PENDING_MSG_TIMEOUT_MS,
     REDIS_STREAM_READ_COUNT,
     REDIS_STREAM_BLOCK_MS,
+    REDIS_STREAM_BATCH_MODE,
+    REDIS_STREAM_BATCH_READ_COUNT,
     REDIS_SPEAKER_EVENTS_STREAM_NAME,
     REDIS_SPEAKER_EVENTS_CONSUMER_GROUP
 )
-from streaming.processors import process_stream_message, process_speaker_event_message
+from streaming.processors import process_stream_message, process_stream_messages_batch, process_speaker_event_message
 
 logger = logging.getLogger(__name__)
 
@@ -106,10 +108,20 @@ async def claim_stale_messages(redis_c: aioredis.Redis):
 
     logger.info(f"Stale message check finished. Total claimed: {messages_claimed_total}, Processed: {processed_claim_count}, Acked: {acked_claim_count}, Errors: {error_claim_count}")
 
+def decode_stream_message(message_id_bytes, message_data_bytes):
+    """Returns the (message ID, field dict) of a stream entry as strings."""
+    message_id_str = message_id_bytes.decode('utf-8') if isinstance(message_id_bytes, bytes) else message_id_bytes
+    message_data_decoded: Dict[str, Any] = {
+        k.decode('utf-8') if isinstance(k, bytes) else k: v.decode('utf-8') if isinstance(v, bytes) else v
+        for k, v in message_data_bytes.items()
+    }
+    return message_id_str, message_data_decoded
+
 async def consume_redis_stream(redis_c: aioredis.Redis):
     """Background task to consume transcription segments from Redis Stream."""
     last_processed_id = '>' 
-    logger.info(f"Starting main consumer loop for '{CONSUMER_NAME}', reading new messages ('>')...")
+    read_count = REDIS_STREAM_BATCH_READ_COUNT if REDIS_STREAM_BATCH_MODE else REDIS_STREAM_READ_COUNT
+    logger.info(f"Starting main consumer loop for '{CONSUMER_NAME}', reading new messages ('>')... (batch mode: {REDIS_STREAM_BATCH_MODE}, count: {read_count})")
 
     while True:
         try:
@@ -117,13 +129,29 @@ async def consume_redis_stream(redis_c: aioredis.Redis):
                 groupname=REDIS_CONSUMER_GROUP,
                 consumername=CONSUMER_NAME,
                 streams={REDIS_STREAM_NAME: last_processed_id},
-                count=REDIS_STREAM_READ_COUNT,
+                count=read_count,
                 block=REDIS_STREAM_BLOCK_MS 
             )
 
             if not response:
                 continue
 
+            if REDIS_STREAM_BATCH_MODE:
+                for stream_name_bytes, messages in response:
+                    decoded_messages = [decode_stream_message(mid, mdata) for mid, mdata in messages]
+                    try:
+                        message_ids_to_ack = await process_stream_messages_batch(decoded_messages, redis_c)
+                    except Exception as e:
+                        logger.error(f"Critical error during process_stream_messages_batch call for {len(decoded_messages)} messages: {e}", exc_info=True)
+                        message_ids_to_ack = []
+                    if message_ids_to_ack:
+                        try:
+                            await redis_c.xack(REDIS_STREAM_NAME, REDIS_CONSUMER_GROUP, *message_ids_to_ack)
+                            logger.debug(f"Acknowledged {len(message_ids_to_ack)}/{len(decoded_messages)} messages in batch.")
+                        except Exception as e:
+                            logger.error(f"Failed to acknowledge batch of {len(message_ids_to_ack)} messages: {e}", exc_info=True)
+                continue
+
             for stream_name_bytes, messages in response:
                 # stream_name = stream_name_bytes.decode('utf-8') # Not strictly needed if only one stream
                 message_ids_to_ack = []
@@ -0,0 +1,158 @@
+import json
+import asyncio
+import logging
+from typing import Dict, Optional, Set, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from config import LIVE_UPDATES_BLOCK_MS, LIVE_UPDATES_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def change_feed_key(internal_meeting_id: int) -> str:
+    return f"meeting:{internal_meeting_id}:changes"
+
+
+def parse_change_entry(fields: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Start key -> segment JSON of a change feed entry, None for segments removed from the transcript
+    (discarded by the db_writer filters instead of being persisted)."""
+    changes: Dict[str, Optional[str]] = dict.fromkeys(json.loads(fields["removed"])) if "removed" in fields else {}
+    if "segments" in fields:
+        changes.update(json.loads(fields["segments"]))
+    return changes
+
+
+def parse_stream_id(entry_id: str) -> Tuple[int, int]:
+    milliseconds, sequence = entry_id.split("-")
+    return int(milliseconds), int(sequence)
+
+
+async def current_change_cursor(internal_meeting_id: int, redis_c: aioredis.Redis) -> Optional[str]:
+    """Returns a change feed cursor covering every change written from now on.
+
+    Must be taken before reading the transcript: changes racing with the read are then returned
+    again after the cursor rather than lost.
+    """
+    if not redis_c:
+        return None
+    try:
+        async with redis_c.pipeline(transaction=True) as pipe:
+            pipe.xrevrange(change_feed_key(internal_meeting_id), count=1)
+            pipe.time()
+            last_entries, (seconds, microseconds) = await pipe.execute()
+    except Exception as e:
+        logger.error(f"[LiveUpdates] Failed to read change feed of meeting {internal_meeting_id}: {e}", exc_info=True)
+        return None
+    if last_entries:
+        return last_entries[0][0]
+    # Empty feed: the next entry gets an ID at or after the current Redis time
+    return f"{seconds * 1000 + microseconds // 1000 - 1}-0"
+
+
+class LiveTranscriptHub:
+    """Fans out the per-meeting change feeds to the live transcript subscribers of this replica.
+
+    A single XREAD loop follows the change feed of every meeting that has at least one local
+    subscriber, so the Redis cost does not grow with the number of viewers. Each subscriber gets
+    its own bounded queue of (entry_id, {start_key: segment_json or None if removed}) items; a subscriber too slow
+    to keep up is sent None and dropped, and is expected to reconnect from its last entry ID.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self.cursors: Dict[int, str] = {}
+        # Start cursor being read for meetings whose first subscriber has not been registered yet
+        self._starting: Dict[int, asyncio.Future] = {}
+        self._watching = asyncio.Event()
+
+    async def subscribe(self, internal_meeting_id: int, redis_c: aioredis.Redis) -> asyncio.Queue:
+        """Registers a subscriber queue; returns once the meeting's change feed is followed from a
+        cursor taken no later than this call."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        # Registered before any await, so concurrent first subscribers share one set and one cursor read
+        queues = self.subscribers.get(internal_meeting_id)
+        if queues is None:
+            queues = self.subscribers[internal_meeting_id] = set()
+            self._starting[internal_meeting_id] = asyncio.ensure_future(current_change_cursor(internal_meeting_id, redis_c))
+        queues.add(queue)
+        starting = self._starting.get(internal_meeting_id)
+        if starting is not None:
+            try:
+                cursor = await asyncio.shield(starting)
+            except asyncio.CancelledError:
+                self.unsubscribe(internal_meeting_id, queue)
+                raise
+            if self._starting.get(internal_meeting_id) is starting:
+                del self._starting[internal_meeting_id]
+                self.cursors[internal_meeting_id] = cursor or "$"
+        self._watching.set()
+        logger.debug(f"[LiveUpdates] Meeting {internal_meeting_id} now has {len(queues)} live subscriber(s).")
+        return queue
+
+    def unsubscribe(self, internal_meeting_id: int, queue: asyncio.Queue):
+        queues = self.subscribers.get(internal_meeting_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[internal_meeting_id]
+            self.cursors.pop(internal_meeting_id, None)
+            starting = self._starting.pop(internal_meeting_id, None)
+            if starting is not None:
+                starting.cancel()
+
+    def _publish(self, internal_meeting_id: int, entry_id: str, segments: Dict[str, Optional[str]]):
+        for queue in list(self.subscribers.get(internal_meeting_id, ())):
+            try:
+                queue.put_nowait((entry_id, segments))
+            except asyncio.QueueFull:
+                logger.warning(f"[LiveUpdates] Dropping slow live subscriber of meeting {internal_meeting_id}.")
+                self.unsubscribe(internal_meeting_id, queue)
+                # Make room for the end-of-stream marker
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def run(self, redis_c: aioredis.Redis):
+        """Background task reading the change feeds of all subscribed meetings."""
+        logger.info("Starting live transcript hub...")
+        while True:
+            try:
+                if not self.subscribers:
+                    self._watching.clear()
+                    await self._watching.wait()
+                    continue
+                streams = {change_feed_key(mid): cursor for mid, cursor in self.cursors.items()}
+                # Meetings subscribed while blocked are picked up on the next call, within LIVE_UPDATES_BLOCK_MS
+                response = await redis_c.xread(streams=streams, count=100, block=LIVE_UPDATES_BLOCK_MS)
+                for stream_key, entries in response or []:
+                    internal_meeting_id = int(stream_key.split(":")[1])
+                    for entry_id, fields in entries:
+                        # The last subscriber may be gone (e.g. dropped by _publish), or the meeting
+                        # resubscribed from a newer cursor while the XREAD was blocked
+                        cursor = self.cursors.get(internal_meeting_id)
+                        if cursor is None:
+                            break
+                        if cursor != "$" and parse_stream_id(entry_id) <= parse_stream_id(cursor):
+                            continue
+                        self.cursors[internal_meeting_id] = entry_id
+                        try:
+                            segments = parse_change_entry(fields)
+                        except (json.JSONDecodeError, TypeError) as e:
+                            logger.error(f"[LiveUpdates] Invalid change feed entry {entry_id} of meeting {internal_meeting_id}: {e}")
+                            continue
+                        self._publish(internal_meeting_id, entry_id, segments)
+            except asyncio.CancelledError:
+                logger.info("Live transcript hub task cancelled.")
+                break
+            except redis.exceptions.ConnectionError as e:
+                logger.error(f"Redis connection error in live transcript hub: {e}. Retrying after delay...", exc_info=True)
+                await asyncio.sleep(5)
+            except Exception as e:
+                logger.error(f"Unhandled error in live transcript hub: {e}", exc_info=True)
+                await asyncio.sleep(5)
+
+
+live_transcript_hub = LiveTranscriptHub(LIVE_UPDATES_QUEUE_SIZE)
@@ -1,28 +1,37 @@
 import logging
 import json
 import uuid
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, List, Tuple
 
 import redis # For redis.exceptions
 import redis.asyncio as aioredis # For type hinting redis_client
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, update, literal
 from sqlalchemy.ext.asyncio import AsyncSession
 # from pydantic import ValidationError # Not explicitly used in the snippets for these functions, but could be for WhisperLiveData
 
 from shared_models.database import async_session_local # For DB sessions
-from shared_models.models import User, Meeting, MeetingSession, APIToken
+from shared_models.models import User, Meeting, MeetingSession, APIToken, Transcription
 from shared_models.schemas import Platform # WhisperLiveData not directly used by these functions from snippet
-from config import REDIS_SEGMENT_TTL, REDIS_SPEAKER_EVENT_KEY_PREFIX, REDIS_SPEAKER_EVENT_TTL # Added new configs (NEW)
+from config import REDIS_SEGMENT_TTL, REDIS_SPEAKER_EVENT_KEY_PREFIX, REDIS_SPEAKER_EVENT_TTL, REDIS_SEGMENT_UPDATES_KEY, REDIS_SEGMENT_CHANGES_RETENTION, CACHE_INVALIDATION_CHANNEL # Added new configs (NEW)
+from lookup_cache import CachedUser, CachedMeeting, user_cache, meeting_cache, session_times_cache
 # MODIFIED: Import the new utility function and only necessary statuses/base mapper if still needed elsewhere
-from mapping.speaker_mapper import get_speaker_mapping_for_segment, STATUS_UNKNOWN, STATUS_ERROR # Removed direct map_speaker_to_segment and other statuses if not directly used by this file
+from mapping.speaker_mapper import STATUS_UNKNOWN, STATUS_NO_SPEAKER_EVENTS, STATUS_ERROR # Removed direct map_speaker_to_segment and other statuses if not directly used by this file
+from mapping.speaker_index import speaker_index, get_indexed_speaker_mappings_for_segments
+from streaming.segment_fingerprints import segment_fingerprints, segment_fingerprint
+from streaming.live_updates import change_feed_key
 
 logger = logging.getLogger(__name__)
 
-async def get_user_by_token(token: str, db: AsyncSession) -> User:
-    """Validates an API token and returns the associated User or raises ValueError."""
+async def get_user_by_token(token: str, db: AsyncSession) -> CachedUser:
+    """Validates an API token and returns the associated user or raises ValueError."""
     if not token:
         raise ValueError("Missing API token") 
+
+    user = user_cache.get(token)
+    if user is not None:
+        return user
     
     result = await db.execute(
         select(User).join(APIToken).where(APIToken.token == token)
@@ -32,9 +41,106 @@ async def get_user_by_token(token: str, db: AsyncSession) -> User:
     if not user:
         logger.warning(f"Invalid API token provided: {token[:5]}...")
         raise ValueError(f"Invalid API token") 
+    user = CachedUser.from_model(user)
+    user_cache.set(token, user)
     return user
 
-async def process_session_start_event(message_id: str, stream_data: Dict[str, Any], db: AsyncSession, user: User, meeting: Meeting) -> bool:
+async def get_meeting_for_message(db: AsyncSession, token: str, platform_val: str, native_meeting_id: str) -> Tuple[CachedUser, Optional[CachedMeeting]]:
+    """Resolves the user of `token` and their latest meeting for (platform, native meeting ID).
+    Raises ValueError for an invalid token; the meeting is None if no meeting matches."""
+    user = await get_user_by_token(token, db)
+
+    cache_key = (user.id, platform_val, native_meeting_id)
+    meeting = meeting_cache.get(cache_key)
+    if meeting is not None:
+        return user, meeting
+
+    stmt_meeting = select(Meeting).where(
+        Meeting.user_id == user.id,
+        Meeting.platform == platform_val,
+        Meeting.platform_specific_id == native_meeting_id
+    ).order_by(Meeting.created_at.desc())
+    result_meeting = await db.execute(stmt_meeting)
+    meeting = result_meeting.scalars().first()
+    if meeting is not None:
+        meeting = CachedMeeting.from_model(meeting)
+        meeting_cache.set(cache_key, meeting)
+    return user, meeting
+
+async def get_session_times(db: AsyncSession, internal_meeting_id: int, session_uid: Optional[str] = None) -> Dict[str, datetime]:
+    """Returns session UID -> UTC session start time for a meeting, ordered by start time.
+    Served from session_times_cache; reloaded if `session_uid` is given but not cached yet (a new session)."""
+    session_times = session_times_cache.get(internal_meeting_id)
+    if session_times is not None and (session_uid is None or resolve_session_start(session_times, session_uid) is not None):
+        return session_times
+
+    stmt_sessions = select(MeetingSession).where(MeetingSession.meeting_id == internal_meeting_id).order_by(MeetingSession.session_start_time)
+    result_sessions = await db.execute(stmt_sessions)
+    session_times = {}
+    for session in result_sessions.scalars().all():
+        session_start = session.session_start_time
+        if session_start.tzinfo is None:
+            session_start = session_start.replace(tzinfo=timezone.utc)
+        session_times[session.session_uid] = session_start
+    session_times_cache.set(internal_meeting_id, session_times)
+    return session_times
+
+def resolve_session_start(session_times: Dict[str, datetime], session_uid: Optional[str]) -> Optional[datetime]:
+    """Looks up a session start time, also trying `session_uid` without a '<platform>_' prefix."""
+    if not session_uid:
+        return None
+    session_start = session_times.get(session_uid)
+    if session_start is None:
+        for platform in Platform:
+            prefix = f"{platform.value}_"
+            if session_uid.startswith(prefix):
+                return session_times.get(session_uid[len(prefix):])
+    return session_start
+
+def absolute_times(session_start: Optional[datetime], start: float, end: float) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Absolute (UTC) start and end of a segment with relative `start`/`end` seconds, or (None, None) if the session start is unknown."""
+    if session_start is None:
+        return None, None
+    return session_start + timedelta(seconds=start), session_start + timedelta(seconds=end)
+
+def parse_absolute_time(value: Optional[str]) -> Optional[datetime]:
+    """Parses an absolute time stored with a Redis segment (None for segments stored without one)."""
+    return datetime.fromisoformat(value) if value else None
+
+async def rewrite_session_absolute_times(redis_c: aioredis.Redis, internal_meeting_id: int, session_uid: str, session_start: datetime,
+                                         max_attempts: int = 3) -> int:
+    """Recomputes the absolute times of the session's segments in the meeting's Redis hash after its start
+    time changed, and publishes them on the change feed. The hash is WATCHed so a segment rewritten by a
+    newer transcription message in the meantime is not overwritten with its old text. Returns the number
+    of segments rewritten."""
+    hash_key = f"meeting:{internal_meeting_id}:segments"
+    for attempt in range(max_attempts):
+        async with redis_c.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(hash_key)
+                rewritten: Dict[str, str] = {}
+                for start_time_key, segment_json in (await pipe.hgetall(hash_key)).items():
+                    segment_data = json.loads(segment_json)
+                    if segment_data.get("session_uid") != session_uid:
+                        continue
+                    absolute_start_time, absolute_end_time = absolute_times(session_start, float(start_time_key), float(segment_data["end_time"]))
+                    segment_data["absolute_start_time"] = absolute_start_time.isoformat()
+                    segment_data["absolute_end_time"] = absolute_end_time.isoformat()
+                    rewritten[start_time_key] = json.dumps(segment_data)
+                if not rewritten:
+                    return 0
+                # updated_at is kept, the corrected segments become immutable no later than before
+                pipe.multi()
+                pipe.hset(hash_key, mapping=rewritten)
+                queue_segment_changes(pipe, internal_meeting_id, rewritten)
+                await pipe.execute()
+                return len(rewritten)
+            except redis.exceptions.WatchError:
+                logger.debug(f"Segments of meeting {internal_meeting_id} changed while rewriting session {session_uid}, retrying ({attempt + 1}/{max_attempts})")
+    raise redis.exceptions.WatchError(f"Segments of meeting {internal_meeting_id} kept changing while rewriting session {session_uid}")
+
+async def process_session_start_event(message_id: str, stream_data: Dict[str, Any], db: AsyncSession, user: CachedUser, meeting: CachedMeeting,
+                                      redis_c: Optional[aioredis.Redis] = None) -> bool:
     """Processes a session_start event.
     
     Updates the MeetingSession database record with the accurate start time.
@@ -69,9 +175,19 @@ async def process_session_start_event(message_id: str, stream_data: Dict[str, An
         result_session = await db.execute(stmt_session)
         meeting_session = result_session.scalars().first()
         
+        existing_session = meeting_session is not None
         if meeting_session:
             meeting_session.session_start_time = start_timestamp
-            logger.info(f"Updated start time for existing session {session_uid}, meeting_id {meeting.id} to {start_timestamp}")
+            # Segments already persisted carry absolute times resolved from the previous start time
+            stmt_transcriptions = update(Transcription).where(
+                Transcription.meeting_id == meeting.id,
+                Transcription.session_uid == session_uid
+            ).values(
+                absolute_start_time=literal(start_timestamp) + Transcription.start_time * literal(timedelta(seconds=1)),
+                absolute_end_time=literal(start_timestamp) + Transcription.end_time * literal(timedelta(seconds=1))
+            ).execution_options(synchronize_session=False)
+            result_transcriptions = await db.execute(stmt_transcriptions)
+            logger.info(f"Updated start time for existing session {session_uid}, meeting_id {meeting.id} to {start_timestamp} ({result_transcriptions.rowcount} stored segments corrected)")
         else:
             meeting_session = MeetingSession(
                 meeting_id=meeting.id,
@@ -82,6 +198,16 @@ async def process_session_start_event(message_id: str, stream_data: Dict[str, An
             logger.info(f"Created new session {session_uid} for meeting_id {meeting.id} with start time {start_timestamp}")
         
         await db.commit()
+        session_times_cache.invalidate(meeting.id)
+        if existing_session and redis_c:
+            # Segments not yet persisted; the rewrite is retried with the message if Redis fails
+            rewritten_count = await rewrite_session_absolute_times(redis_c, meeting.id, session_uid, start_timestamp)
+            logger.info(f"Corrected absolute times of {rewritten_count} Redis segments of session {session_uid}, meeting_id {meeting.id}")
+            # Other replicas reload unknown sessions on their own, but not a changed start time
+            try:
+                await redis_c.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"type": "sessions", "meeting_id": meeting.id}))
+            except redis.exceptions.RedisError as e:
+                logger.warning(f"Failed to publish session cache invalidation for meeting {meeting.id}: {e}")
         logger.info(f"Successfully processed session_start event for meeting {meeting.id}, session {session_uid}")
         return True
 
@@ -93,6 +219,105 @@ async def process_session_start_event(message_id: str, stream_data: Dict[str, An
             logger.error(f"Failed to rollback after error in process_session_start_event: {rb_err}", exc_info=True)
         return False # Unexpected error, DO NOT ACK
 
+def queue_segment_changes(pipe, internal_meeting_id: int, segments_to_store: Dict[str, str]):
+    """Appends the written segments to the meeting's change feed stream, read by 'since' transcript polls.
+
+    Entries older than REDIS_SEGMENT_CHANGES_RETENTION are trimmed; polls with an older cursor
+    get the full transcript instead.
+    """
+    _queue_change_entry(pipe, internal_meeting_id, {"segments": json.dumps(segments_to_store)})
+
+def queue_segment_removals(pipe, internal_meeting_id: int, start_time_keys: List[str]):
+    """Appends the start keys of segments dropped from the transcript (e.g. discarded by the db_writer
+    filters) to the meeting's change feed, so 'since' polls and live subscribers remove them too."""
+    _queue_change_entry(pipe, internal_meeting_id, {"removed": json.dumps(sorted(start_time_keys, key=float))})
+
+def _queue_change_entry(pipe, internal_meeting_id: int, fields: Dict[str, str]):
+    changes_key = change_feed_key(internal_meeting_id)
+    min_id = int((time.time() - REDIS_SEGMENT_CHANGES_RETENTION) * 1000)
+    pipe.xadd(changes_key, fields, minid=min_id, approximate=True)
+    pipe.expire(changes_key, REDIS_SEGMENT_TTL)
+
+# Mapping results that a later resend of the segment may improve on
+UNSETTLED_MAPPING_STATUSES = (STATUS_UNKNOWN, STATUS_NO_SPEAKER_EVENTS)
+
+async def build_segments_to_store(message_id: str, stream_data: Dict[str, Any], internal_meeting_id: int, redis_c: aioredis.Redis,
+                                  pending_fingerprints: Optional[Dict[str, Optional[int]]] = None,
+                                  session_start: Optional[datetime] = None) -> Tuple[Dict[str, str], Dict[str, Optional[int]]]:
+    """Validates the segments of a transcription message and maps the speakers of those that changed.
+    Segments whose content matches the last stored version (or the version in `pending_fingerprints`,
+    not yet stored) are skipped. Returns the Redis hash entries (start time key -> segment JSON) for the
+    meeting's segment hash and their fingerprints, to be recorded once the entries are stored. The
+    fingerprint is None for segments whose speaker could not be mapped yet, so they are not skipped.
+    With the `session_start` of the message's session, the segments carry their absolute times;
+    otherwise db_writer resolves them when persisting."""
+    segments_to_store: Dict[str, str] = {}
+    fingerprints: Dict[str, Optional[int]] = {}
+    session_uid_from_payload = stream_data.get('uid')
+
+    if not session_uid_from_payload:
+        logger.warning(f"[Msg {message_id}/Meet {internal_meeting_id}] Message missing 'uid' for transcription segments. Cannot map speakers. Segments in this message will not have speaker info.")
+    
+    valid_segments: List[Tuple[float, float, str, Optional[str]]] = []
+    for i, segment in enumerate(stream_data.get('segments', [])):
+         if not isinstance(segment, dict) or segment.get('start') is None or segment.get('end') is None:
+             logger.warning(f"[Msg {message_id}/Meet {internal_meeting_id}] Skipping segment {i} missing structure or 'start'/'end': {segment}")
+             continue
+         try:
+             start_time_float = float(segment['start'])
+             end_time_float = float(segment['end'])
+             text_content = segment.get('text') or ""
+             language_content = segment.get('language')
+         except (ValueError, TypeError) as time_err:
+             logger.warning(f"[Msg {message_id}/Meet {internal_meeting_id}] Skipping segment {i} invalid time format: {time_err} - Segment: {segment}")
+             continue
+         start_time_key = f"{start_time_float:.3f}"
+         fingerprint = segment_fingerprint(text_content, end_time_float, language_content, session_uid_from_payload)
+         if pending_fingerprints is not None and start_time_key in pending_fingerprints:
+             unchanged = pending_fingerprints[start_time_key] == fingerprint
+         else:
+             unchanged = segment_fingerprints.is_unchanged(internal_meeting_id, start_time_key, fingerprint)
+         if unchanged:
+             continue
+         fingerprints[start_time_key] = fingerprint
+         valid_segments.append((start_time_float, end_time_float, text_content, language_content))
+
+    if not valid_segments:
+        return segments_to_store, fingerprints
+
+    # Map all segments of the message in one call (one speaker event fetch at most)
+    if session_uid_from_payload:
+        mapping_results = await get_indexed_speaker_mappings_for_segments(
+            redis_c=redis_c,
+            session_uid=session_uid_from_payload,
+            segments_ms=[(start * 1000, end * 1000) for start, end, _, _ in valid_segments],
+            config_speaker_event_key_prefix=REDIS_SPEAKER_EVENT_KEY_PREFIX,
+            context_log_msg=f"[LiveMap Msg:{message_id}/Meet:{internal_meeting_id}]"
+        )
+    else:
+        mapping_results = [{"speaker_name": None, "status": STATUS_UNKNOWN} for _ in valid_segments]
+
+    updated_at = datetime.now(timezone.utc).isoformat()
+    for (start_time_float, end_time_float, text_content, language_content), mapping_result in zip(valid_segments, mapping_results):
+         start_time_key = f"{start_time_float:.3f}"
+         absolute_start_time, absolute_end_time = absolute_times(session_start, start_time_float, end_time_float)
+         segment_redis_data = {
+             "text": text_content,
+             "end_time": end_time_float,
+             "absolute_start_time": absolute_start_time.isoformat() if absolute_start_time else None,
+             "absolute_end_time": absolute_end_time.isoformat() if absolute_end_time else None,
+             "language": language_content,
+             "updated_at": updated_at, 
+             "session_uid": session_uid_from_payload,
+             "speaker": mapping_result.get("speaker_name"),
+             "speaker_mapping_status": mapping_result.get("status", STATUS_ERROR) # Default to STATUS_ERROR if not present
+         }
+         segments_to_store[start_time_key] = json.dumps(segment_redis_data)
+         if session_uid_from_payload and segment_redis_data["speaker_mapping_status"] in UNSETTLED_MAPPING_STATUSES:
+             # The speaker events may not have arrived yet: resends of the same content are mapped again
+             fingerprints[start_time_key] = None
+    return segments_to_store, fingerprints
+
 async def process_stream_message(message_id: str, message_data: Dict[str, Any], redis_c: aioredis.Redis) -> bool:
     """Processes a single message payload from the Redis stream.
     Returns True if processing is considered complete (can be ACKed), 
@@ -108,8 +333,8 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
         stream_data = json.loads(payload_json)
         message_type = stream_data.get("type", "transcription")
         
-        user: Optional[User] = None
-        meeting: Optional[Meeting] = None
+        user: Optional[CachedUser] = None
+        meeting: Optional[CachedMeeting] = None
         internal_meeting_id: Optional[int] = None
 
         async with async_session_local() as db:
@@ -123,15 +348,7 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
                     logger.warning(f"Message {message_id} (type: {message_type}) missing common required fields (token, platform, meeting_id). Skipping. Payload: {payload_json[:200]}...")
                     return True
 
-                user = await get_user_by_token(token, db)
-                
-                stmt_meeting = select(Meeting).where(
-                    Meeting.user_id == user.id,
-                    Meeting.platform == platform_val,
-                    Meeting.platform_specific_id == native_meeting_id
-                ).order_by(Meeting.created_at.desc())
-                result_meeting = await db.execute(stmt_meeting)
-                meeting = result_meeting.scalars().first()
+                user, meeting = await get_meeting_for_message(db, token, platform_val, native_meeting_id)
 
                 if not meeting:
                     logger.warning(f"Meeting lookup failed for message {message_id}: No meeting found for user {user.id}, platform '{platform_val}', native ID '{native_meeting_id}'")
@@ -140,7 +357,7 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
 
                 # Process different message types
                 if message_type == "session_start":
-                    return await process_session_start_event(message_id, stream_data, db, user, meeting) 
+                    return await process_session_start_event(message_id, stream_data, db, user, meeting, redis_c)
                 elif message_type == "transcription":
                     pass # Continue with transcription processing
                 elif message_type == "session_end": # NEW: Handle session_end for cleanup
@@ -152,6 +369,7 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
                     speaker_event_key = f"{REDIS_SPEAKER_EVENT_KEY_PREFIX}:{session_uid}"
                     try:
                         deleted_count = await redis_c.delete(speaker_event_key)
+                        speaker_index.remove_session(session_uid)
                         logger.info(f"Processed session_end for UID '{session_uid}'. Deleted speaker events key '{speaker_event_key}' from Redis (count: {deleted_count}).")
                         # Note: MeetingSession.session_end_utc is not updated here due to no DB model changes allowed.
                     except redis.exceptions.RedisError as e_redis:
@@ -176,62 +394,14 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
                  logger.warning(f"Transcription message {message_id} payload missing 'segments' field. Skipping. Payload: {payload_json[:200]}...")
                  return True
 
-            segment_count = 0
             hash_key = f"meeting:{internal_meeting_id}:segments"
-            segments_to_store = {}
-            session_uid_from_payload = stream_data.get('uid')
-
-            if not session_uid_from_payload:
-                logger.warning(f"[Msg {message_id}/Meet {internal_meeting_id}] Message missing 'uid' for transcription segments. Cannot map speakers. Segments in this message will not have speaker info.")
-            
-            for i, segment in enumerate(stream_data.get('segments', [])):
-                 if not isinstance(segment, dict) or segment.get('start') is None or segment.get('end') is None:
-                     logger.warning(f"[Msg {message_id}/Meet {internal_meeting_id}] Skipping segment {i} missing structure or 'start'/'end': {segment}")
-                     continue
-                 try:
-                     start_time_float = float(segment['start'])
-                     end_time_float = float(segment['end'])
-                     text_content = segment.get('text') or ""
-                     language_content = segment.get('language')
-                 except (ValueError, TypeError) as time_err:
-                     logger.warning(f"[Msg {message_id}/Meet {internal_meeting_id}] Skipping segment {i} invalid time format: {time_err} - Segment: {segment}")
-                     continue
-                            
-                 start_time_key = f"{start_time_float:.3f}"
-                 
-                 mapping_status: str = STATUS_UNKNOWN
-
-                 if session_uid_from_payload:
-                    # MODIFIED: Call the new utility function
-                    context_log = f"[LiveMap Msg:{message_id}/Meet:{internal_meeting_id}/Seg:{start_time_key}]"
-                    mapping_result = await get_speaker_mapping_for_segment(
-                        redis_c=redis_c,
-                        session_uid=session_uid_from_payload,
-                        segment_start_ms=start_time_float * 1000,
-                        segment_end_ms=end_time_float * 1000,
-                        config_speaker_event_key_prefix=REDIS_SPEAKER_EVENT_KEY_PREFIX,
-                        context_log_msg=context_log
-                    )
-                    mapped_speaker_name = mapping_result.get("speaker_name")
-                    mapping_status = mapping_result.get("status", STATUS_ERROR) # Default to STATUS_ERROR if not present
-                 else:
-                    # This case is now handled inside get_speaker_mapping_for_segment if session_uid is None,
-                    # but keeping explicit handling here is also fine for clarity if session_uid_from_payload is None from the start.
-                    logger.warning(f"[Msg {message_id}/Meet {internal_meeting_id}/Seg {start_time_key}] No session_uid_from_payload. Cannot map speakers.")
-                    mapping_status = STATUS_UNKNOWN
-
-                 segment_redis_data = {
-                     "text": text_content,
-                     "end_time": end_time_float,
-                     "language": language_content,
-                     "updated_at": datetime.now(timezone.utc).isoformat(), 
-                     "session_uid": session_uid_from_payload,
-                     "speaker": mapped_speaker_name,
-                     "speaker_mapping_status": mapping_status
-                 }
-                 segments_to_store[start_time_key] = json.dumps(segment_redis_data)
-                 segment_count += 1
-            
+            session_times = await get_session_times(db, internal_meeting_id, stream_data.get('uid'))
+            segments_to_store, fingerprints = await build_segments_to_store(
+                message_id, stream_data, internal_meeting_id, redis_c,
+                session_start=resolve_session_start(session_times, stream_data.get('uid'))
+            )
+            segment_count = len(segments_to_store)
+
             if segment_count > 0:
                 try:
                     async with redis_c.pipeline(transaction=True) as pipe:
@@ -239,10 +409,15 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
                         pipe.expire(hash_key, REDIS_SEGMENT_TTL)
                         if segments_to_store:
                             pipe.hset(hash_key, mapping=segments_to_store)
+                            # Queue the segments for db_writer, due IMMUTABILITY_THRESHOLD after this update
+                            updated_ts = datetime.now(timezone.utc).timestamp()
+                            pipe.zadd(REDIS_SEGMENT_UPDATES_KEY, {f"{internal_meeting_id}:{start_time_key}": updated_ts for start_time_key in segments_to_store})
+                            queue_segment_changes(pipe, internal_meeting_id, segments_to_store)
                         results = await pipe.execute()
                         if any(res is None for res in results): # Simplified critical failure check
                             logger.error(f"Redis pipeline command failed critically for message {message_id}. Results: {results}")
                             return False
+                        segment_fingerprints.update(internal_meeting_id, fingerprints)
                         logger.info(f"Stored/Updated {segment_count} segments in Redis from message {message_id} for meeting {internal_meeting_id}. Results: {results}")
                 except redis.exceptions.RedisError as redis_err:
                     logger.error(f"Redis pipeline error storing segments for message {message_id}: {redis_err}", exc_info=True)
@@ -251,7 +426,7 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
                      logger.error(f"Unexpected pipeline error storing segments for message {message_id}: {pipe_err}", exc_info=True)
                      return False
             else:
-                logger.info(f"No valid segments found in message {message_id} for meeting {internal_meeting_id} to store in Redis.")
+                logger.debug(f"No new or changed segments in message {message_id} for meeting {internal_meeting_id} to store in Redis.")
             return True
 
     except json.JSONDecodeError as e:
@@ -261,6 +436,136 @@ async def process_stream_message(message_id: str, message_data: Dict[str, Any],
         logger.error(f"Unexpected error in process_stream_message for {message_id}: {e}", exc_info=True)
         return False 
 
+async def process_stream_messages_batch(messages: List[Tuple[str, Dict[str, Any]]], redis_c: aioredis.Redis) -> List[str]:
+    """Processes a batch of messages read from the Redis stream.
+
+    Messages are grouped by (token, platform, meeting_id) so the user and meeting are resolved
+    once per group, and the Redis writes of the whole batch are sent in a single pipeline.
+    Returns the IDs of the messages that can be ACKed; messages hit by a potentially
+    recoverable error are left out so they stay pending.
+    """
+    ack_ids: List[str] = []
+    groups: Dict[Tuple[str, str, str], List[Tuple[str, Dict[str, Any]]]] = {}
+
+    for message_id, message_data in messages:
+        if 'payload' not in message_data:
+            logger.warning(f"Message {message_id} missing 'payload' field. Skipping.")
+            ack_ids.append(message_id)
+            continue
+        payload_json = message_data['payload']
+        try:
+            stream_data = json.loads(payload_json)
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON payload for message {message_id}: {e}. Payload: {payload_json[:200]}... Acking to avoid loop.")
+            ack_ids.append(message_id)
+            continue
+
+        token = stream_data.get('token')
+        platform_val = stream_data.get('platform')
+        native_meeting_id = stream_data.get('meeting_id')
+        if not all([token, platform_val, native_meeting_id]):
+            logger.warning(f"Message {message_id} (type: {stream_data.get('type', 'transcription')}) missing common required fields (token, platform, meeting_id). Skipping. Payload: {payload_json[:200]}...")
+            ack_ids.append(message_id)
+            continue
+        groups.setdefault((token, platform_val, native_meeting_id), []).append((message_id, stream_data))
+
+    # Redis writes collected across all groups, applied in one pipeline below
+    segments_by_meeting: Dict[int, Dict[str, str]] = {}
+    active_meeting_ids: List[str] = []
+    speaker_keys_to_delete: List[str] = []
+    pipeline_message_ids: List[str] = []
+    fingerprints_by_meeting: Dict[int, Dict[str, Optional[int]]] = {}
+
+    async with async_session_local() as db:
+        for (token, platform_val, native_meeting_id), group_messages in groups.items():
+            group_ids = [message_id for message_id, _ in group_messages]
+            try:
+                user, meeting = await get_meeting_for_message(db, token, platform_val, native_meeting_id)
+            except ValueError as ve:
+                logger.warning(f"Auth/Lookup or validation failed for messages {group_ids}: {ve}. Skipping.")
+                ack_ids.extend(group_ids)
+                continue
+            except Exception as db_err:
+                logger.error(f"DB/Lookup error preparing for messages {group_ids}: {db_err}", exc_info=True)
+                await db.rollback()
+                continue
+
+            if not meeting:
+                logger.warning(f"Meeting lookup failed for messages {group_ids}: No meeting found for user {user.id}, platform '{platform_val}', native ID '{native_meeting_id}'")
+                ack_ids.extend(group_ids)
+                continue
+            internal_meeting_id = meeting.id
+
+            for message_id, stream_data in group_messages:
+                message_type = stream_data.get("type", "transcription")
+                try:
+                    if message_type == "session_start":
+                        if await process_session_start_event(message_id, stream_data, db, user, meeting, redis_c):
+                            ack_ids.append(message_id)
+                    elif message_type == "session_end":
+                        session_uid = stream_data.get('uid')
+                        if not session_uid:
+                            logger.warning(f"Message {message_id} (type: session_end) missing 'uid'. Skipping cleanup.")
+                            ack_ids.append(message_id)
+                            continue
+                        speaker_keys_to_delete.append(f"{REDIS_SPEAKER_EVENT_KEY_PREFIX}:{session_uid}")
+                        speaker_index.remove_session(session_uid)
+                        pipeline_message_ids.append(message_id)
+                    elif message_type == "transcription":
+                        if "segments" not in stream_data:
+                            logger.warning(f"Transcription message {message_id} payload missing 'segments' field. Skipping.")
+                            ack_ids.append(message_id)
+                            continue
+                        meeting_fingerprints = fingerprints_by_meeting.setdefault(internal_meeting_id, {})
+                        session_times = await get_session_times(db, internal_meeting_id, stream_data.get('uid'))
+                        segments_to_store, fingerprints = await build_segments_to_store(
+                            message_id, stream_data, internal_meeting_id, redis_c, pending_fingerprints=meeting_fingerprints,
+                            session_start=resolve_session_start(session_times, stream_data.get('uid'))
+                        )
+                        if not segments_to_store:
+                            logger.debug(f"No new or changed segments in message {message_id} for meeting {internal_meeting_id} to store in Redis.")
+                            ack_ids.append(message_id)
+                            continue
+                        # Later messages overwrite earlier versions of the same segment, as sequential HSETs would
+                        segments_by_meeting.setdefault(internal_meeting_id, {}).update(segments_to_store)
+                        meeting_fingerprints.update(fingerprints)
+                        active_meeting_ids.append(str(internal_meeting_id))
+                        pipeline_message_ids.append(message_id)
+                    else:
+                        logger.warning(f"Message {message_id} has unknown type '{message_type}'. Skipping.")
+                        ack_ids.append(message_id)
+                except Exception as e:
+                    logger.error(f"Unexpected error processing message {message_id} in batch: {e}", exc_info=True)
+
+    if not pipeline_message_ids:
+        return ack_ids
+
+    try:
+        async with redis_c.pipeline(transaction=True) as pipe:
+            if active_meeting_ids:
+                pipe.sadd("active_meetings", *set(active_meeting_ids))
+            updated_ts = datetime.now(timezone.utc).timestamp()
+            for internal_meeting_id, segments_to_store in segments_by_meeting.items():
+                hash_key = f"meeting:{internal_meeting_id}:segments"
+                pipe.hset(hash_key, mapping=segments_to_store)
+                pipe.expire(hash_key, REDIS_SEGMENT_TTL)
+                # Queue the segments for db_writer, due IMMUTABILITY_THRESHOLD after this update
+                pipe.zadd(REDIS_SEGMENT_UPDATES_KEY, {f"{internal_meeting_id}:{start_time_key}": updated_ts for start_time_key in segments_to_store})
+                queue_segment_changes(pipe, internal_meeting_id, segments_to_store)
+            if speaker_keys_to_delete:
+                pipe.delete(*speaker_keys_to_delete)
+            results = await pipe.execute()
+        if any(res is None for res in results):
+            logger.error(f"Redis pipeline command failed critically for batch of {len(pipeline_message_ids)} messages. Results: {results}")
+            return ack_ids
+        for internal_meeting_id, fingerprints in fingerprints_by_meeting.items():
+            segment_fingerprints.update(internal_meeting_id, fingerprints)
+        logger.info(f"Stored segments for {len(segments_by_meeting)} meeting(s) and cleaned up {len(speaker_keys_to_delete)} session(s) from {len(pipeline_message_ids)} messages in one pipeline.")
+        ack_ids.extend(pipeline_message_ids)
+    except redis.exceptions.RedisError as redis_err:
+        logger.error(f"Redis pipeline error storing batch of {len(pipeline_message_ids)} messages: {redis_err}", exc_info=True)
+    return ack_ids
+
 async def process_speaker_event_message(message_id: str, event_data: Dict[str, Any], redis_c: aioredis.Redis) -> bool:
     """Processes a single speaker event message from the Redis stream.
     Stores the event in a Redis Sorted Set keyed by session_uid.
@@ -292,6 +597,7 @@ async def process_speaker_event_message(message_id: str, event_data: Dict[str, A
             pipe.zadd(sorted_set_key, {event_payload_json: relative_timestamp_ms})
             pipe.expire(sorted_set_key, REDIS_SPEAKER_EVENT_TTL)
             results = await pipe.execute()
+        speaker_index.add_event(session_uid, event_data, relative_timestamp_ms)
 
         # Check pipeline results (optional, zadd returns num added, expire returns 1 or 0)
         # For simplicity, we assume success if no exception
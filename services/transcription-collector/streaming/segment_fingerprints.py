@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import SEGMENT_FINGERPRINT_MAX_MEETINGS, SEGMENT_FINGERPRINT_MAX_SEGMENTS
+
+
+def segment_fingerprint(text: str, end_time: float, language: Optional[str], session_uid: Optional[str]) -> int:
+    """Hash of the segment content that, when unchanged, makes a resent segment a no-op."""
+    return hash((text, end_time, language, session_uid))
+
+
+class SegmentFingerprints:
+    """Per-meeting map of segment start key -> fingerprint of the content last written to Redis.
+
+    WhisperLive resends its last segments with every update; segments whose fingerprint is
+    unchanged are skipped, so they are not remapped, rewritten or given a new 'updated_at'.
+    Fingerprints must only be recorded after the segments were stored, so a failed write is
+    retried in full when the message is redelivered. A None fingerprint marks a start key whose
+    next resend must be written regardless (e.g. its speaker is still unmapped), replacing the
+    fingerprint of an older version. Fingerprints outlive the Redis hash
+    entries, so segments resent after db_writer moved them to PostgreSQL are not stored again,
+    until db_writer drops the meeting from active_meetings and calls forget_meeting.
+
+    Only the `max_segments` most recently written start keys of a meeting are kept, which
+    covers the segments WhisperLive resends. Meetings are kept in LRU order and the least
+    recently updated ones are dropped beyond `max_meetings`.
+
+    The state is per process and only records this replica's own writes. When the transcription
+    consumer group spreads a meeting's messages over several replicas, a replica that did not
+    write the current version of a segment simply rewrites it. A replica whose recorded
+    version was since replaced by another replica may skip a resend of its own older version;
+    the next resend reaching any other replica writes it again.
+    """
+
+    def __init__(self, max_meetings: int, max_segments: int):
+        self.max_meetings = max_meetings
+        self.max_segments = max_segments
+        self._meetings: "OrderedDict[int, OrderedDict[str, Optional[int]]]" = OrderedDict()
+
+    def is_unchanged(self, meeting_id: int, start_time_key: str, fingerprint: int) -> bool:
+        meeting = self._meetings.get(meeting_id)
+        return meeting is not None and meeting.get(start_time_key) == fingerprint
+
+    def update(self, meeting_id: int, fingerprints: Dict[str, Optional[int]]):
+        if not fingerprints or self.max_meetings <= 0:
+            return
+        meeting = self._meetings.get(meeting_id)
+        if meeting is None:
+            meeting = self._meetings[meeting_id] = OrderedDict()
+        self._meetings.move_to_end(meeting_id)
+        for start_time_key, fingerprint in fingerprints.items():
+            meeting[start_time_key] = fingerprint
+            meeting.move_to_end(start_time_key)
+        while len(meeting) > self.max_segments:
+            meeting.popitem(last=False)
+        while len(self._meetings) > self.max_meetings:
+            self._meetings.popitem(last=False)
+
+    def forget_meeting(self, meeting_id: int):
+        self._meetings.pop(meeting_id, None)
+
+
+segment_fingerprints = SegmentFingerprints(SEGMENT_FINGERPRINT_MAX_MEETINGS, SEGMENT_FINGERPRINT_MAX_SEGMENTS)
@@ -0,0 +1,246 @@
+import json
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from shared_models.models import Base, Transcription, TranscriptionArchive
+from shared_models.schemas import Platform
+from api import endpoints
+from background import db_writer
+from background.db_writer import REDIS_SEGMENT_UPDATES_KEY, TRANSCRIPT_ARCHIVE_PENDING_KEY, bulk_insert_transcriptions, create_transcription_row, delete_processed_segments, fetch_due_segments, requeue_archived_meetings
+from lookup_cache import CachedUser
+
+
+class FakeSegmentRedis:
+    """In-memory meeting hashes and segment update queue, with the commands db_writer uses."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.updates = {}
+        self.changes = []
+
+    def add_segment(self, meeting_id, start_time_str, updated_ts, segment_json="{}"):
+        self.hashes.setdefault(f"meeting:{meeting_id}:segments", {})[start_time_str] = segment_json
+        self.updates[f"{meeting_id}:{start_time_str}"] = updated_ts
+
+    async def zrangebyscore(self, key, minimum, maximum):
+        assert key == REDIS_SEGMENT_UPDATES_KEY
+        return [member for member, score in sorted(self.updates.items(), key=lambda item: item[1]) if score <= maximum]
+
+    async def zrem(self, key, *members):
+        assert key == REDIS_SEGMENT_UPDATES_KEY
+        for member in members:
+            self.updates.pop(member, None)
+
+    async def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    async def hkeys(self, key):
+        return list(self.hashes.get(key, {}))
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis_c):
+        self.redis_c = redis_c
+        self.results = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def hmget(self, key, fields):
+        self.results.append(self.redis_c.hmget(key, fields))
+
+    def delete(self, *keys):
+        self.results.append(keys)
+        self.redis_c.hashes = {key: value for key, value in self.redis_c.hashes.items() if key not in keys}
+
+    def xadd(self, key, fields, minid=None, approximate=True):
+        self.results.append(self.redis_c.changes.append((key, fields)))
+
+    def expire(self, key, ttl):
+        self.results.append(True)
+
+    def zrem(self, key, *members):
+        assert key == REDIS_SEGMENT_UPDATES_KEY
+        self.results.append(members)
+        for member in members:
+            self.redis_c.updates.pop(member, None)
+
+    async def execute(self):
+        return self.results
+
+
+class TestFetchDueSegments(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis_c = FakeSegmentRedis()
+
+    async def test_returns_only_due_segments_of_owned_meetings(self):
+        self.redis_c.add_segment(1, "0.000", 100, '{"text": "due"}')
+        self.redis_c.add_segment(1, "5.000", 300, '{"text": "recent"}')
+        self.redis_c.add_segment(2, "0.000", 100, '{"text": "other replica"}')
+
+        due = await fetch_due_segments(self.redis_c, ["1"], cutoff_ts=200)
+
+        self.assertEqual(due, {"1": {"0.000": '{"text": "due"}'}})
+        # the queue entries stay until the segments are persisted
+        self.assertEqual(set(self.redis_c.updates), {"1:0.000", "1:5.000", "2:0.000"})
+
+    async def test_drops_queue_entries_of_missing_segments(self):
+        self.redis_c.add_segment(1, "0.000", 100)
+        self.redis_c.add_segment(1, "1.000", 100)
+        # the meeting hash was deleted (or expired) after the segments were queued
+        self.redis_c.updates["3:0.000"] = 100
+        del self.redis_c.hashes["meeting:1:segments"]["1.000"]
+
+        due = await fetch_due_segments(self.redis_c, ["1", "3"], cutoff_ts=200)
+
+        self.assertEqual(due, {"1": {"0.000": "{}"}})
+        self.assertEqual(set(self.redis_c.updates), {"1:0.000"})
+
+    async def test_drops_due_entries_of_inactive_meetings(self):
+        self.redis_c.add_segment(1, "0.000", 100)
+        self.redis_c.add_segment(2, "0.000", 100)
+        self.redis_c.add_segment(2, "5.000", 300)
+        # meeting 3 left active_meetings, nothing owns its entries anymore
+        self.redis_c.updates["3:0.000"] = 100
+        self.redis_c.updates["3:5.000"] = 300
+
+        due = await fetch_due_segments(self.redis_c, ["1"], cutoff_ts=200, active_meeting_ids={"1", "2"})
+
+        self.assertEqual(due, {"1": {"0.000": "{}"}})
+        # entries of active meetings owned by another replica and entries not yet due are kept
+        self.assertEqual(set(self.redis_c.updates), {"1:0.000", "2:0.000", "2:5.000", "3:5.000"})
+
+        self.assertEqual(await fetch_due_segments(self.redis_c, [], cutoff_ts=400, active_meeting_ids=set()), {})
+        self.assertEqual(self.redis_c.updates, {})
+
+    async def test_no_due_segments(self):
+        self.redis_c.add_segment(1, "0.000", 300)
+        self.assertEqual(await fetch_due_segments(self.redis_c, ["1"], cutoff_ts=200), {})
+
+    async def test_delete_processed_segments_clears_hash_and_queue(self):
+        self.redis_c.add_segment(1, "0.000", 100)
+        self.redis_c.add_segment(1, "5.000", 300)
+
+        await delete_processed_segments(self.redis_c, {1: {"0.000"}, 2: set()})
+
+        self.assertEqual(self.redis_c.hashes["meeting:1:segments"], {"5.000": "{}"})
+        self.assertEqual(set(self.redis_c.updates), {"1:5.000"})
+        self.assertEqual(self.redis_c.changes, [])
+
+    async def test_discarded_segments_are_published_as_removed(self):
+        for start_time_str in ("0.000", "1.000", "10.000"):
+            self.redis_c.add_segment(1, start_time_str, 100)
+
+        await delete_processed_segments(self.redis_c, {1: {"0.000", "1.000", "10.000"}}, {1: {"10.000", "1.000"}, 2: set()})
+
+        self.assertEqual(self.redis_c.hashes["meeting:1:segments"], {})
+        self.assertEqual(self.redis_c.changes, [("meeting:1:changes", {"removed": json.dumps(["1.000", "10.000"])})])
+
+
+class TestDeleteMeetingQueueEntries(unittest.IsolatedAsyncioTestCase):
+    async def test_delete_meeting_drops_queue_entries(self):
+        redis_c = FakeSegmentRedis()
+        redis_c.add_segment(1, "0.000", 100)
+        redis_c.add_segment(1, "5.000", 300)
+        redis_c.add_segment(2, "0.000", 100)
+        meeting = SimpleNamespace(id=1)
+        db = mock.AsyncMock()
+        db.execute.return_value = mock.Mock(scalars=lambda: mock.Mock(first=lambda: meeting, all=lambda: []))
+        request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(redis_client=redis_c)))
+
+        await endpoints.delete_meeting(Platform.GOOGLE_MEET, "abc", request, current_user=CachedUser(id=1), db=db)
+
+        self.assertEqual(set(redis_c.hashes), {"meeting:2:segments"})
+        self.assertEqual(set(redis_c.updates), {"2:0.000"})
+        db.commit.assert_awaited_once()
+
+
+class TestBulkInsertTranscriptions(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Transcription.__table__])
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    def make_rows(self, count):
+        session_start = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+        return [
+            create_transcription_row(
+                meeting_id=1, start=float(i), end=i + 1.0, text=f"segment {i}", language="en",
+                session_uid="session-1", mapped_speaker_name="Alice", absolute_start_time=session_start,
+            )
+            for i in range(count)
+        ]
+
+    async def test_inserts_rows_in_chunks(self):
+        async with self.session_factory() as db:
+            with mock.patch.object(db_writer, "DB_WRITER_INSERT_CHUNK_SIZE", 2), \
+                    mock.patch.object(db, "execute", wraps=db.execute) as execute:
+                await bulk_insert_transcriptions(db, self.make_rows(5))
+            await db.commit()
+            self.assertEqual([len(call.args[1]) for call in execute.call_args_list], [2, 2, 1])
+
+            stored = (await db.execute(select(Transcription).order_by(Transcription.start_time))).scalars().all()
+        self.assertEqual([row.text for row in stored], [f"segment {i}" for i in range(5)])
+        self.assertEqual(stored[0].speaker, "Alice")
+        self.assertEqual(stored[0].session_uid, "session-1")
+
+    async def test_no_rows(self):
+        async with self.session_factory() as db:
+            with mock.patch.object(db, "execute") as execute:
+                await bulk_insert_transcriptions(db, [])
+        execute.assert_not_called()
+
+
+class TestRequeueArchivedMeetings(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[TranscriptionArchive.__table__])
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+        async with self.session_factory() as db:
+            db.add(TranscriptionArchive(meeting_id=1, format="test", segment_count=0, data=b""))
+            await db.commit()
+        self.redis_c = mock.AsyncMock()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_queues_only_archived_meetings(self):
+        async with self.session_factory() as db:
+            self.assertEqual(await requeue_archived_meetings(db, self.redis_c, {1, 2}), [1])
+        [call] = self.redis_c.zadd.await_args_list
+        self.assertEqual(call.args[0], TRANSCRIPT_ARCHIVE_PENDING_KEY)
+        self.assertEqual(list(call.args[1]), ["1"])
+
+    async def test_nothing_archived(self):
+        async with self.session_factory() as db:
+            self.assertEqual(await requeue_archived_meetings(db, self.redis_c, {2}), [])
+            self.assertEqual(await requeue_archived_meetings(db, self.redis_c, set()), [])
+        self.redis_c.zadd.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
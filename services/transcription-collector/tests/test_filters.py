@@ -0,0 +1,112 @@
+import random
+import unittest
+from unittest import mock
+
+import filters
+from filters import ProcessedSegmentIndex, TranscriptionFilter
+
+WORDS = ["hello", "everyone", "welcome", "meeting", "agenda", "budget", "review", "thanks"]
+
+
+class LinearScanIndex(ProcessedSegmentIndex):
+    """The deduplication cache before ProcessedSegmentIndex: every cached segment is compared and
+    nothing is evicted."""
+
+    def __init__(self, horizon_seconds, max_segments):
+        super().__init__(float("inf"), float("inf"))
+
+    def overlapping(self, start_time, end_time):
+        return list(range(len(self.segments)))
+
+
+def random_segments(rng, count):
+    """Whisper-like output: growing and re-transcribed versions of the same utterances, out of order."""
+    segments = []
+    position = 0.0
+    for _ in range(count):
+        position += rng.choice([0.0, 0.5, 1.0, 2.5])
+        start = round(position + rng.uniform(-1.0, 1.0), 2)
+        end = round(start + rng.uniform(0.05, 6.0), 2)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        segments.append({"text": text, "start": start, "end": end, "language": "en"})
+    # db_writer sorts each batch, but batches interleave with earlier cached segments
+    rng.shuffle(segments)
+    return segments
+
+
+class TestProcessedSegmentIndex(unittest.TestCase):
+    def test_same_decisions_as_linear_scan(self):
+        for seed in range(20):
+            rng = random.Random(seed)
+            batches = [sorted(random_segments(rng, 40), key=lambda s: s["start"]) for _ in range(5)]
+
+            indexed_filter = TranscriptionFilter()
+            with mock.patch.object(filters, "ProcessedSegmentIndex", LinearScanIndex):
+                linear_filter = TranscriptionFilter()
+                expected = [linear_filter.filter_segments(batch, meeting_id=1) for batch in batches]
+            actual = [indexed_filter.filter_segments(batch, meeting_id=1) for batch in batches]
+
+            self.assertEqual(actual, expected, f"seed {seed}")
+            self.assertEqual(
+                sorted(indexed_filter.processed_segments_cache_by_meeting[1].segments),
+                sorted(linear_filter.processed_segments_cache_by_meeting[1].segments),
+            )
+
+    def test_overlapping_uses_longest_segment(self):
+        index = ProcessedSegmentIndex(horizon_seconds=600, max_segments=100)
+        index.add("long", 0.0, 30.0)
+        index.add("short", 20.0, 21.0)
+        index.add("later", 40.0, 41.0)
+
+        self.assertEqual([index.segments[i][2] for i in index.overlapping(25.0, 26.0)], ["long"])
+        self.assertEqual([index.segments[i][2] for i in index.overlapping(21.0, 40.0)], ["long", "short", "later"])
+        self.assertEqual(index.overlapping(35.0, 39.0), [])
+
+    def test_horizon_and_cap_evict_earliest_segments(self):
+        index = ProcessedSegmentIndex(horizon_seconds=10, max_segments=3)
+        index.add("a", 0.0, 1.0)
+        index.add("b", 5.0, 6.0)
+        index.add("c", 12.0, 13.0)
+        self.assertEqual([segment[2] for segment in index.segments], ["b", "c"])
+
+        index.add("d", 13.0, 14.0)
+        index.add("e", 14.0, 15.0)
+        self.assertEqual([segment[2] for segment in index.segments], ["c", "d", "e"])
+
+        index.remove([0, 2])
+        self.assertEqual([segment[2] for segment in index.segments], ["d"])
+        self.assertEqual(index.starts, [13.0])
+
+
+class TestTranscriptionFilterCompile(unittest.TestCase):
+    def setUp(self):
+        self.filter = TranscriptionFilter()
+
+    def test_patterns_are_combined_into_one_regex(self):
+        self.assertIsNotNone(self.filter._combined_pattern)
+        self.assertEqual(self.filter._matching_pattern("[BLANK_AUDIO]"), r"^\[BLANK_AUDIO\]$")
+        self.assertIsNone(self.filter._matching_pattern("welcome everyone"))
+
+    def test_falls_back_to_individual_patterns(self):
+        # global inline flags are only allowed at the start of a regex, so this one cannot be combined
+        self.filter.patterns.append(r"(?i)^u+h+m*$")
+        self.filter.compile()
+
+        self.assertIsNone(self.filter._combined_pattern)
+        self.assertEqual(self.filter._matching_pattern("UHHM"), r"(?i)^u+h+m*$")
+        self.assertEqual(self.filter._matching_pattern("<inaudible>"), r"^<inaudible>$")
+        self.assertFalse(self.filter.filter_segment("Uhhh", 0.0, 1.0, meeting_id=1))
+        self.assertTrue(self.filter.filter_segment("welcome everyone", 1.0, 2.0, meeting_id=1))
+
+    def test_recompile_picks_up_new_stopwords(self):
+        self.filter.min_real_words = 1
+        self.filter.stopwords = {"en": ["Welcome", "Everyone"]}
+        self.filter.compile()
+
+        self.assertTrue(self.filter.is_stop_word("welcome"))
+        self.assertFalse(self.filter.has_enough_real_words("welcome everyone", "en"))
+        self.assertTrue(self.filter.has_enough_real_words("welcome everyone", "de"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import time
+import unittest
+from unittest import mock
+
+from api import endpoints
+from streaming import live_updates
+from streaming.live_updates import LiveTranscriptHub
+
+
+def segment_json(text, session_uid="session-1", absolute_start_time="2025-01-01T12:00:00+00:00"):
+    return json.dumps({
+        "text": text,
+        "end_time": 1.0,
+        "language": "en",
+        "session_uid": session_uid,
+        "speaker": "Alice",
+        "absolute_start_time": absolute_start_time,
+        "absolute_end_time": absolute_start_time,
+    })
+
+
+class FakeChangeFeedRedis:
+    """Returns `batches` from successive XREAD calls, then blocks like an idle feed."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.streams = []
+
+    async def xread(self, streams, count, block):
+        self.streams.append(dict(streams))
+        if self.batches:
+            return self.batches.pop(0)
+        await asyncio.sleep(block / 1000)
+        return []
+
+
+class HubTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cursor_reads = 0
+
+        async def current_change_cursor(internal_meeting_id, redis_c):
+            self.cursor_reads += 1
+            await asyncio.sleep(0.01)
+            return "1000-0"
+
+        patcher = mock.patch.object(live_updates, "current_change_cursor", current_change_cursor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestLiveTranscriptHub(HubTestCase):
+    async def test_concurrent_first_subscribers_share_one_cursor_read(self):
+        hub = LiveTranscriptHub(queue_size=10)
+        first, second = await asyncio.gather(hub.subscribe(1, None), hub.subscribe(1, None))
+
+        self.assertEqual(hub.subscribers[1], {first, second})
+        self.assertEqual(hub.cursors[1], "1000-0")
+        self.assertEqual(self.cursor_reads, 1)
+
+        hub.unsubscribe(1, first)
+        self.assertEqual(hub.subscribers[1], {second})
+        hub.unsubscribe(1, second)
+        self.assertEqual(hub.subscribers, {})
+        self.assertEqual(hub.cursors, {})
+
+    async def test_cancelled_subscribe_is_unregistered(self):
+        hub = LiveTranscriptHub(queue_size=10)
+        task = asyncio.create_task(hub.subscribe(1, None))
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(hub.subscribers, {})
+        self.assertEqual(hub._starting, {})
+
+    async def test_run_publishes_entries_to_subscribers(self):
+        hub = LiveTranscriptHub(queue_size=10)
+        queue = await hub.subscribe(1, None)
+        redis_c = FakeChangeFeedRedis([[("meeting:1:changes", [
+            ("999-0", {"segments": json.dumps({"0.000": "stale"})}),
+            ("1001-0", {"segments": json.dumps({"0.000": "a"})}),
+            ("1002-0", {"segments": "not json"}),
+            ("1003-0", {"segments": json.dumps({"1.000": "b"})}),
+            ("1004-0", {"removed": json.dumps(["0.000"])}),
+        ])]])
+        task = asyncio.create_task(hub.run(redis_c))
+        try:
+            self.assertEqual(await asyncio.wait_for(queue.get(), 1), ("1001-0", {"0.000": "a"}))
+            self.assertEqual(await asyncio.wait_for(queue.get(), 1), ("1003-0", {"1.000": "b"}))
+            self.assertEqual(await asyncio.wait_for(queue.get(), 1), ("1004-0", {"0.000": None}))
+        finally:
+            task.cancel()
+            await task
+        self.assertEqual(redis_c.streams[0], {"meeting:1:changes": "1000-0"})
+        self.assertEqual(hub.cursors[1], "1004-0")
+
+    async def test_dropped_last_subscriber_does_not_recreate_cursor(self):
+        hub = LiveTranscriptHub(queue_size=1)
+        queue = await hub.subscribe(1, None)
+        redis_c = FakeChangeFeedRedis([[("meeting:1:changes", [
+            ("1001-0", {"segments": json.dumps({"0.000": "a"})}),
+            ("1002-0", {"segments": json.dumps({"0.000": "b"})}),
+            ("1003-0", {"segments": json.dumps({"0.000": "c"})}),
+        ])]])
+        task = asyncio.create_task(hub.run(redis_c))
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+            await task
+        # Too slow: the queued entry was replaced by the end-of-stream marker
+        self.assertIsNone(queue.get_nowait())
+        self.assertEqual(hub.subscribers, {})
+        self.assertEqual(hub.cursors, {})
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class TestLiveTranscriptEvents(HubTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.hub = LiveTranscriptHub(queue_size=10)
+        patcher = mock.patch.object(endpoints, "live_transcript_hub", self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def parse_event(raw):
+        fields = dict(line.split(": ", 1) for line in raw.strip().split("\n"))
+        return fields.get("id"), fields["event"], json.loads(fields["data"])
+
+    async def test_catch_up_then_live_entries(self):
+        since = f"{int(time.time() * 1000) - 1000}-0"
+        redis_c = mock.AsyncMock()
+        redis_c.xrange.return_value = [("2000-0", {"segments": json.dumps({"0.000": segment_json("caught up")})})]
+        events = endpoints._live_transcript_events(1, FakeRequest(), redis_c, since)
+
+        event_id, event, data = self.parse_event(await events.__anext__())
+        self.assertEqual((event_id, event), ("2000-0", "segments"))
+        self.assertEqual([s["text"] for s in data], ["caught up"])
+        redis_c.xrange.assert_awaited_once_with("meeting:1:changes", min=f"({since}", max="+")
+
+        queue, = self.hub.subscribers[1]
+        # Already covered by the catch-up, skipped
+        queue.put_nowait(("2000-0", {"0.000": segment_json("caught up")}))
+        queue.put_nowait(("2001-0", {"1.000": segment_json("live", absolute_start_time="2025-01-01T12:00:01+00:00")}))
+        event_id, event, data = self.parse_event(await events.__anext__())
+        self.assertEqual((event_id, event), ("2001-0", "segments"))
+        self.assertEqual([s["text"] for s in data], ["live"])
+
+        # Discarded by the db_writer filters
+        queue.put_nowait(("2002-0", {"0.000": None}))
+        event_id, event, data = self.parse_event(await events.__anext__())
+        self.assertEqual((event_id, event, data), ("2002-0", "removed", [0.0]))
+
+        # Dropped by the hub as too slow: the stream ends and the subscriber is gone
+        queue.put_nowait(None)
+        with self.assertRaises(StopAsyncIteration):
+            await events.__anext__()
+        self.assertEqual(self.hub.subscribers, {})
+
+    async def test_catch_up_with_removals_resumes_after_both_events(self):
+        since = f"{int(time.time() * 1000) - 1000}-0"
+        redis_c = mock.AsyncMock()
+        redis_c.xrange.return_value = [
+            ("2000-0", {"segments": json.dumps({"0.000": segment_json("uh"), "1.000": segment_json("kept")})}),
+            ("2001-0", {"removed": json.dumps(["0.000"])}),
+        ]
+        events = endpoints._live_transcript_events(1, FakeRequest(), redis_c, since)
+
+        event_id, event, data = self.parse_event(await events.__anext__())
+        self.assertEqual((event_id, event, data), (None, "removed", [0.0]))
+        event_id, event, data = self.parse_event(await events.__anext__())
+        self.assertEqual((event_id, event), ("2001-0", "segments"))
+        self.assertEqual([s["text"] for s in data], ["kept"])
+        await events.aclose()
+
+    async def test_expired_cursor_sends_reset(self):
+        events = endpoints._live_transcript_events(1, FakeRequest(), mock.AsyncMock(), "1-0")
+        _, event, _ = self.parse_event(await events.__anext__())
+        self.assertEqual(event, "reset")
+        with self.assertRaises(StopAsyncIteration):
+            await events.__anext__()
+        self.assertEqual(self.hub.subscribers, {})
+
+    async def test_keep_alive_until_disconnected(self):
+        request = FakeRequest()
+        with mock.patch.object(endpoints, "LIVE_UPDATES_KEEPALIVE", 0.01):
+            events = endpoints._live_transcript_events(1, request, mock.AsyncMock(), None)
+            self.assertEqual(await events.__anext__(), ": keep-alive\n\n")
+            request.disconnected = True
+            with self.assertRaises(StopAsyncIteration):
+                await events.__anext__()
+        self.assertEqual(self.hub.subscribers, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
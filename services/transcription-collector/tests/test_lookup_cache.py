@@ -0,0 +1,144 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import lookup_cache
+from lookup_cache import CachedMeeting, CachedUser, TTLCache, apply_invalidation
+from streaming.processors import get_meeting_for_message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("lookup_cache.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache(max_size=10, ttl=30)
+        cache.set("token", "value")
+
+        self.clock.now += 29
+        self.assertEqual(cache.get("token"), "value")
+        self.clock.now += 2
+        self.assertIsNone(cache.get("token"))
+        # Expired entries are dropped on access
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_size=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_zero_size_disables_caching(self):
+        cache = TTLCache(max_size=0, ttl=30)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_invalidate_and_clear(self):
+        cache = TTLCache(max_size=10, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.invalidate("a")
+        cache.invalidate("missing")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class TestApplyInvalidation(unittest.TestCase):
+    def setUp(self):
+        lookup_cache.clear_all()
+        self.addCleanup(lookup_cache.clear_all)
+        lookup_cache.user_cache.set("token-1", CachedUser(id=1))
+        lookup_cache.user_cache.set("token-2", CachedUser(id=2))
+        lookup_cache.meeting_cache.set((1, "google_meet", "abc"), CachedMeeting(10, 1, "google_meet", "abc"))
+        lookup_cache.session_times_cache.set(10, {})
+
+    def test_token_message_drops_only_that_token(self):
+        apply_invalidation({"type": "token", "token": "token-1"})
+        self.assertIsNone(lookup_cache.user_cache.get("token-1"))
+        self.assertEqual(lookup_cache.user_cache.get("token-2"), CachedUser(id=2))
+
+    def test_meeting_and_sessions_messages(self):
+        apply_invalidation({"type": "meeting", "user_id": 1, "platform": "google_meet", "native_meeting_id": "abc"})
+        self.assertIsNone(lookup_cache.meeting_cache.get((1, "google_meet", "abc")))
+        self.assertEqual(lookup_cache.session_times_cache.get(10), {})
+
+        apply_invalidation({"type": "sessions", "meeting_id": 10})
+        self.assertIsNone(lookup_cache.session_times_cache.get(10))
+        self.assertEqual(len(lookup_cache.user_cache), 2)
+
+    def test_unknown_message_clears_all_caches(self):
+        apply_invalidation({"type": "something-new"})
+        self.assertEqual(len(lookup_cache.user_cache), 0)
+        self.assertEqual(len(lookup_cache.meeting_cache), 0)
+        self.assertEqual(len(lookup_cache.session_times_cache), 0)
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self.row
+
+
+class TestCachedLookups(unittest.TestCase):
+    def setUp(self):
+        lookup_cache.clear_all()
+        self.addCleanup(lookup_cache.clear_all)
+
+    def test_lookups_cache_plain_values_instead_of_orm_instances(self):
+        user = SimpleNamespace(id=1)
+        meeting = SimpleNamespace(id=10, user_id=1, platform="google_meet", platform_specific_id="abc")
+        db = mock.AsyncMock()
+        db.execute.side_effect = [FakeResult(user), FakeResult(meeting)]
+
+        cached_user, cached_meeting = asyncio.run(get_meeting_for_message(db, "token", "google_meet", "abc"))
+        self.assertEqual(cached_user, CachedUser(id=1))
+        self.assertEqual(cached_meeting, CachedMeeting(id=10, user_id=1, platform="google_meet", platform_specific_id="abc"))
+
+        # A rollback expires the ORM instances; the cached values do not depend on them
+        del user.id, meeting.id
+        cached_user, cached_meeting = asyncio.run(get_meeting_for_message(db, "token", "google_meet", "abc"))
+        self.assertEqual((cached_user.id, cached_meeting.id), (1, 10))
+        self.assertEqual(db.execute.await_count, 2)
+
+    def test_unknown_meeting_is_not_cached(self):
+        db = mock.AsyncMock()
+        db.execute.side_effect = [FakeResult(SimpleNamespace(id=1)), FakeResult(None), FakeResult(None)]
+
+        self.assertEqual(asyncio.run(get_meeting_for_message(db, "token", "google_meet", "abc")), (CachedUser(id=1), None))
+        self.assertEqual(asyncio.run(get_meeting_for_message(db, "token", "google_meet", "abc")), (CachedUser(id=1), None))
+        self.assertEqual(db.execute.await_count, 3)
+
+    def test_invalid_token_raises(self):
+        db = mock.AsyncMock()
+        db.execute.return_value = FakeResult(None)
+        with self.assertRaises(ValueError):
+            asyncio.run(get_meeting_for_message(db, "bad", "google_meet", "abc"))
+        self.assertIsNone(lookup_cache.user_cache.get("bad"))
+
+
+if __name__ == "__main__":
+    unittest.main()
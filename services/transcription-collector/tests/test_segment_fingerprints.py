@@ -0,0 +1,110 @@
+import json
+import unittest
+from unittest import mock
+
+from mapping.speaker_mapper import STATUS_MAPPED, STATUS_NO_SPEAKER_EVENTS, STATUS_UNKNOWN
+from streaming import processors
+from streaming.processors import build_segments_to_store
+from streaming.segment_fingerprints import SegmentFingerprints, segment_fingerprint
+
+
+class TestSegmentFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.fingerprints = SegmentFingerprints(max_meetings=2, max_segments=3)
+
+    def test_unchanged_only_after_update(self):
+        fingerprint = segment_fingerprint("hello", 1.5, "en", "session-1")
+        self.assertFalse(self.fingerprints.is_unchanged(1, "0.000", fingerprint))
+
+        self.fingerprints.update(1, {"0.000": fingerprint})
+        self.assertTrue(self.fingerprints.is_unchanged(1, "0.000", fingerprint))
+        self.assertFalse(self.fingerprints.is_unchanged(1, "0.000", segment_fingerprint("hello there", 1.5, "en", "session-1")))
+        self.assertFalse(self.fingerprints.is_unchanged(2, "0.000", fingerprint))
+
+    def test_keeps_recent_start_keys_per_meeting(self):
+        self.fingerprints.update(1, {"0.000": 1, "1.000": 2, "2.000": 3})
+        # Rewriting a key makes it the most recent one
+        self.fingerprints.update(1, {"0.000": 10})
+        self.fingerprints.update(1, {"3.000": 4})
+
+        self.assertFalse(self.fingerprints.is_unchanged(1, "1.000", 2))
+        self.assertTrue(self.fingerprints.is_unchanged(1, "0.000", 10))
+        self.assertTrue(self.fingerprints.is_unchanged(1, "2.000", 3))
+        self.assertTrue(self.fingerprints.is_unchanged(1, "3.000", 4))
+
+    def test_drops_least_recently_updated_meeting(self):
+        self.fingerprints.update(1, {"0.000": 1})
+        self.fingerprints.update(2, {"0.000": 1})
+        self.fingerprints.update(1, {"1.000": 2})
+        self.fingerprints.update(3, {"0.000": 1})
+
+        self.assertFalse(self.fingerprints.is_unchanged(2, "0.000", 1))
+        self.assertTrue(self.fingerprints.is_unchanged(1, "0.000", 1))
+        self.assertTrue(self.fingerprints.is_unchanged(3, "0.000", 1))
+
+    def test_forget_meeting(self):
+        self.fingerprints.update(1, {"0.000": 1})
+        self.fingerprints.forget_meeting(1)
+        self.fingerprints.forget_meeting(2)
+        self.assertFalse(self.fingerprints.is_unchanged(1, "0.000", 1))
+
+    def test_disabled(self):
+        fingerprints = SegmentFingerprints(max_meetings=0, max_segments=3)
+        fingerprints.update(1, {"0.000": 1})
+        self.assertFalse(fingerprints.is_unchanged(1, "0.000", 1))
+
+
+class TestBuildSegmentsToStoreFingerprints(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.fingerprints = SegmentFingerprints(max_meetings=10, max_segments=10)
+        self.mapping_statuses = []
+
+        async def get_indexed_speaker_mappings_for_segments(redis_c, session_uid, segments_ms, **kwargs):
+            status = self.mapping_statuses.pop(0)
+            speaker = "Alice" if status == STATUS_MAPPED else None
+            return [{"speaker_name": speaker, "status": status} for _ in segments_ms]
+
+        for name, replacement in (
+            ("segment_fingerprints", self.fingerprints),
+            ("get_indexed_speaker_mappings_for_segments", get_indexed_speaker_mappings_for_segments),
+        ):
+            patcher = mock.patch.object(processors, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def store(self, stream_data):
+        segments_to_store, fingerprints = await build_segments_to_store("1-0", stream_data, 1, redis_c=None)
+        self.fingerprints.update(1, fingerprints)
+        return {key: json.loads(value) for key, value in segments_to_store.items()}
+
+    async def test_unmapped_segments_are_mapped_again_when_resent(self):
+        stream_data = {"uid": "session-1", "segments": [{"start": 0.0, "end": 1.5, "text": "hello"}]}
+        for status in (STATUS_NO_SPEAKER_EVENTS, STATUS_UNKNOWN):
+            self.mapping_statuses.append(status)
+            self.assertEqual(await self.store(stream_data), {"0.000": mock.ANY})
+
+        # the speaker events arrived: the resend is mapped and then skipped like any unchanged segment
+        self.mapping_statuses.append(STATUS_MAPPED)
+        self.assertEqual((await self.store(stream_data))["0.000"]["speaker"], "Alice")
+        self.assertEqual(await self.store(stream_data), {})
+        self.assertEqual(self.mapping_statuses, [])
+
+    async def test_unmapped_version_replaces_older_fingerprint(self):
+        self.mapping_statuses += [STATUS_MAPPED, STATUS_UNKNOWN, STATUS_MAPPED]
+        first = {"uid": "session-1", "segments": [{"start": 0.0, "end": 1.5, "text": "hello"}]}
+        second = {"uid": "session-1", "segments": [{"start": 0.0, "end": 2.0, "text": "hello there"}]}
+        await self.store(first)
+        await self.store(second)
+
+        # the older version is resent (e.g. by another replica's backlog) and written again
+        self.assertEqual((await self.store(first))["0.000"]["text"], "hello")
+
+    async def test_segments_without_session_are_fingerprinted(self):
+        stream_data = {"segments": [{"start": 0.0, "end": 1.5, "text": "hello"}]}
+        self.assertEqual(set(await self.store(stream_data)), {"0.000"})
+        # never mappable without a session UID, so resends are skipped
+        self.assertEqual(await self.store(stream_data), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import redis
+from sqlalchemy.dialects import postgresql
+
+from lookup_cache import CachedMeeting, CachedUser
+from streaming import processors
+from streaming.processors import process_session_start_event, rewrite_session_absolute_times
+
+OLD_START = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+NEW_START = OLD_START + timedelta(seconds=7)
+
+
+def stored_segment(session_uid, start, end, session_start=OLD_START):
+    return json.dumps({
+        "text": f"at {start}", "end_time": end, "language": "en", "updated_at": "2025-01-01T12:05:00+00:00",
+        "absolute_start_time": (session_start + timedelta(seconds=start)).isoformat(),
+        "absolute_end_time": (session_start + timedelta(seconds=end)).isoformat(),
+        "session_uid": session_uid, "speaker": None, "speaker_mapping_status": "UNKNOWN",
+    })
+
+
+class FakeWatchPipeline:
+    def __init__(self, redis_c):
+        self.redis_c = redis_c
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def watch(self, key):
+        self.redis_c.watched.append(key)
+
+    async def hgetall(self, key):
+        return dict(self.redis_c.hashes.get(key, {}))
+
+    def multi(self):
+        pass
+
+    def hset(self, key, mapping):
+        self.commands.append(lambda: self.redis_c.hashes.setdefault(key, {}).update(mapping))
+
+    def xadd(self, key, fields, minid=None, approximate=True):
+        self.commands.append(lambda: self.redis_c.changes.append((key, fields)))
+
+    def expire(self, key, ttl):
+        self.commands.append(lambda: None)
+
+    async def execute(self):
+        if self.redis_c.conflicts:
+            self.redis_c.conflicts -= 1
+            raise redis.exceptions.WatchError("watched key changed")
+        return [command() for command in self.commands]
+
+
+class FakeWatchRedis:
+    def __init__(self, hashes=None, conflicts=0):
+        self.hashes = hashes or {}
+        self.conflicts = conflicts
+        self.watched = []
+        self.changes = []
+
+    def pipeline(self, transaction=True):
+        return FakeWatchPipeline(self)
+
+
+class TestRewriteSessionAbsoluteTimes(unittest.IsolatedAsyncioTestCase):
+    def make_redis(self, conflicts=0):
+        return FakeWatchRedis({"meeting:1:segments": {
+            "0.000": stored_segment("session-1", 0.0, 2.5),
+            "3.000": stored_segment("session-1", 3.0, 4.0),
+            "1.000": stored_segment("session-2", 1.0, 2.0),
+        }}, conflicts)
+
+    async def test_rewrites_only_the_session_segments(self):
+        redis_c = self.make_redis()
+
+        self.assertEqual(await rewrite_session_absolute_times(redis_c, 1, "session-1", NEW_START), 2)
+
+        stored = {key: json.loads(value) for key, value in redis_c.hashes["meeting:1:segments"].items()}
+        self.assertEqual(stored["0.000"]["absolute_start_time"], NEW_START.isoformat())
+        self.assertEqual(stored["0.000"]["absolute_end_time"], (NEW_START + timedelta(seconds=2.5)).isoformat())
+        self.assertEqual(stored["3.000"]["updated_at"], "2025-01-01T12:05:00+00:00")
+        self.assertEqual(stored["1.000"]["absolute_start_time"], (OLD_START + timedelta(seconds=1)).isoformat())
+        # 'since' polls and live clients see the corrected segments
+        [(changes_key, fields)] = redis_c.changes
+        self.assertEqual(changes_key, "meeting:1:changes")
+        self.assertEqual(set(json.loads(fields["segments"])), {"0.000", "3.000"})
+
+    async def test_retries_when_segments_change_concurrently(self):
+        redis_c = self.make_redis(conflicts=1)
+        self.assertEqual(await rewrite_session_absolute_times(redis_c, 1, "session-1", NEW_START), 2)
+        self.assertEqual(len(redis_c.watched), 2)
+
+        with self.assertRaises(redis.exceptions.WatchError):
+            await rewrite_session_absolute_times(self.make_redis(conflicts=3), 1, "session-1", NEW_START)
+
+    async def test_no_segments_of_the_session(self):
+        redis_c = self.make_redis()
+        self.assertEqual(await rewrite_session_absolute_times(redis_c, 1, "session-3", NEW_START), 0)
+        self.assertEqual(redis_c.changes, [])
+
+
+class TestProcessSessionStartEvent(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.meeting = CachedMeeting(1, 1, "google_meet", "abc")
+        self.stream_data = {"uid": "session-1", "start_timestamp": "2025-01-01T12:00:07Z"}
+        self.rewrite = mock.AsyncMock(return_value=2)
+        patcher = mock.patch.object(processors, "rewrite_session_absolute_times", self.rewrite)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_db(self, meeting_session):
+        db = mock.AsyncMock()
+        db.add = mock.Mock()
+        db.execute.side_effect = [
+            mock.Mock(scalars=lambda: mock.Mock(first=lambda: meeting_session)),
+            mock.Mock(rowcount=3),
+        ]
+        return db
+
+    async def test_corrected_start_time_fixes_stored_segments(self):
+        meeting_session = SimpleNamespace(session_start_time=OLD_START)
+        db = self.make_db(meeting_session)
+
+        self.assertTrue(await process_session_start_event("1-0", self.stream_data, db, CachedUser(id=1), self.meeting, mock.AsyncMock()))
+
+        self.assertEqual(meeting_session.session_start_time, NEW_START)
+        update_sql = str(db.execute.await_args_list[1].args[0].compile(dialect=postgresql.dialect()))
+        self.assertIn("UPDATE transcriptions SET absolute_start_time=", update_sql)
+        self.assertIn("transcriptions.start_time *", update_sql)
+        self.assertIn("absolute_end_time=", update_sql)
+        self.assertIn("transcriptions.session_uid =", update_sql)
+        db.commit.assert_awaited_once()
+        self.rewrite.assert_awaited_once_with(mock.ANY, 1, "session-1", NEW_START)
+
+    async def test_new_session_has_nothing_to_fix(self):
+        db = self.make_db(None)
+
+        self.assertTrue(await process_session_start_event("1-0", self.stream_data, db, CachedUser(id=1), self.meeting, mock.AsyncMock()))
+
+        self.assertEqual(db.execute.await_count, 1)
+        db.add.assert_called_once()
+        self.rewrite.assert_not_called()
+
+    async def test_failed_redis_rewrite_is_retried(self):
+        self.rewrite.side_effect = redis.exceptions.ConnectionError("redis down")
+        db = self.make_db(SimpleNamespace(session_start_time=OLD_START))
+        self.assertFalse(await process_session_start_event("1-0", self.stream_data, db, CachedUser(id=1), self.meeting, mock.AsyncMock()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import unittest
+from unittest import mock
+
+from background import sharding
+from background.sharding import MeetingShardOwnership, preferred_replica
+
+LEASE_TTL_S = sharding.DB_WRITER_LEASE_TTL_MS / 1000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeShardRedis:
+    """In-memory stand-in for the sorted set, lease keys and Lua scripts used by MeetingShardOwnership."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.zsets = {}
+        self.leases = {}  # key -> (replica_id, expires_at)
+
+    def register_script(self, source):
+        return FakeScript(self, "acquire" if source == sharding._ACQUIRE_OR_RENEW_LEASE else "release")
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def lease_holder(self, meeting_id):
+        key = f"{sharding.DB_WRITER_LEASE_KEY_PREFIX}:{meeting_id}"
+        holder, expires_at = self.leases.get(key, (None, 0))
+        return holder if expires_at > self.clock.now else None
+
+
+class FakeScript:
+    def __init__(self, redis_c, kind):
+        self.redis_c = redis_c
+        self.kind = kind
+
+    async def __call__(self, keys, args, client):
+        client.commands.append(lambda: self.run(keys[0], args))
+
+    def run(self, key, args):
+        holder = self.redis_c.lease_holder(key.rsplit(":", 1)[1])
+        if self.kind == "release":
+            if holder == args[0]:
+                del self.redis_c.leases[key]
+                return 1
+            return 0
+        if holder is None or holder == args[0]:
+            self.redis_c.leases[key] = (args[0], self.redis_c.clock.now + args[1] / 1000)
+            return 1
+        return 0
+
+
+class FakePipeline:
+    def __init__(self, redis_c):
+        self.redis_c = redis_c
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def zadd(self, key, mapping):
+        self.commands.append(lambda: self.redis_c.zsets.setdefault(key, {}).update(mapping))
+
+    def zremrangebyscore(self, key, minimum, maximum):
+        def run():
+            zset = self.redis_c.zsets.get(key, {})
+            for member in [member for member, score in zset.items() if score <= maximum]:
+                del zset[member]
+        self.commands.append(run)
+
+    def zrange(self, key, start, end):
+        self.commands.append(lambda: sorted(self.redis_c.zsets.get(key, {}), key=self.redis_c.zsets[key].get))
+
+    def zrem(self, key, member):
+        self.commands.append(lambda: self.redis_c.zsets.get(key, {}).pop(member, None))
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+class TestPreferredReplica(unittest.TestCase):
+    def test_replica_leaving_only_moves_its_own_meetings(self):
+        meeting_ids = [str(i) for i in range(200)]
+        before = {mid: preferred_replica(mid, ["a", "b", "c"]) for mid in meeting_ids}
+        after = {mid: preferred_replica(mid, ["a", "b"]) for mid in meeting_ids}
+
+        self.assertEqual(set(before.values()), {"a", "b", "c"})
+        for mid in meeting_ids:
+            if before[mid] != "c":
+                self.assertEqual(after[mid], before[mid])
+        # order of the replica list does not matter
+        self.assertEqual({mid: preferred_replica(mid, ["b", "a"]) for mid in meeting_ids}, after)
+
+
+class TestMeetingShardOwnership(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.clock = FakeClock()
+        self.redis_c = FakeShardRedis(self.clock)
+        for patcher in (
+            mock.patch.object(sharding, "time", self.clock),
+            mock.patch.object(sharding, "DB_WRITER_SHARDING_ENABLED", True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.meeting_ids = [str(i) for i in range(50)]
+
+    async def test_replicas_split_meetings_without_overlap(self):
+        first = MeetingShardOwnership(self.redis_c)
+        second = MeetingShardOwnership(self.redis_c)
+        await first.live_replicas()
+
+        owned_by_second = await second.owned_meetings(self.meeting_ids)
+        owned_by_first = await first.owned_meetings(self.meeting_ids)
+
+        self.assertTrue(owned_by_first and owned_by_second)
+        self.assertFalse(set(owned_by_first) & set(owned_by_second))
+        self.assertEqual(sorted(owned_by_first + owned_by_second, key=int), self.meeting_ids)
+
+    async def test_joining_replica_waits_for_lease_handover(self):
+        first = MeetingShardOwnership(self.redis_c)
+        self.assertEqual(await first.owned_meetings(self.meeting_ids), self.meeting_ids)
+
+        second = MeetingShardOwnership(self.redis_c)
+        moved = [mid for mid in self.meeting_ids if preferred_replica(mid, [first.replica_id, second.replica_id]) == second.replica_id]
+        self.assertTrue(moved)
+        # the first replica still holds the leases of the meetings that moved
+        self.assertEqual(await second.owned_meetings(self.meeting_ids), [])
+        owned_by_first = await first.owned_meetings(self.meeting_ids)
+        self.assertFalse(set(owned_by_first) & set(moved))
+
+        # the first replica no longer renews the moved leases, so they expire while both keep cycling
+        for _ in range(2):
+            self.clock.now += LEASE_TTL_S / 2 + 1
+            await first.owned_meetings(self.meeting_ids)
+            owned_by_second = await second.owned_meetings(self.meeting_ids)
+        self.assertEqual(owned_by_second, moved)
+
+    async def test_release_hands_over_right_away(self):
+        first = MeetingShardOwnership(self.redis_c)
+        await first.owned_meetings(self.meeting_ids)
+        second = MeetingShardOwnership(self.redis_c)
+        await second.live_replicas()
+
+        await first.release()
+        self.assertEqual(await second.owned_meetings(self.meeting_ids), self.meeting_ids)
+        self.assertEqual(self.redis_c.lease_holder("0"), second.replica_id)
+
+    async def test_dead_replica_meetings_are_taken_over_after_timeout(self):
+        first = MeetingShardOwnership(self.redis_c)
+        second = MeetingShardOwnership(self.redis_c)
+        await first.live_replicas()
+        owned_by_second = await second.owned_meetings(self.meeting_ids)
+        await first.owned_meetings(self.meeting_ids)
+
+        # the first replica stops heartbeating
+        self.clock.now += LEASE_TTL_S + 1
+        self.assertEqual(await second.live_replicas(), [second.replica_id])
+        self.assertEqual(await second.owned_meetings(self.meeting_ids), self.meeting_ids)
+        self.assertLess(len(owned_by_second), len(self.meeting_ids))
+
+    async def test_disabled_sharding_owns_everything(self):
+        with mock.patch.object(sharding, "DB_WRITER_SHARDING_ENABLED", False):
+            ownership = MeetingShardOwnership(self.redis_c)
+            self.assertEqual(await ownership.owned_meetings(self.meeting_ids), self.meeting_ids)
+        self.assertEqual(self.redis_c.zsets, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
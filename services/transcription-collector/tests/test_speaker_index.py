@@ -0,0 +1,108 @@
+import json
+import unittest
+from unittest import mock
+
+from mapping.speaker_index import SessionSpeakerIntervals, SpeakerIntervalIndex
+from mapping.speaker_mapper import STATUS_MAPPED, STATUS_MULTIPLE, STATUS_UNKNOWN, STATUS_NO_SPEAKER_EVENTS
+
+
+def speaker_event(event_type, name):
+    return {"event_type": event_type, "participant_name": name, "participant_id_meet": f"id-{name}"}
+
+
+class TestSessionSpeakerIntervals(unittest.TestCase):
+    def setUp(self):
+        self.session = SessionSpeakerIntervals()
+
+    def test_overlapping_closed_and_open_turns(self):
+        self.session.add(1000, "SPEAKER_START", "alice", "Alice", "id-alice")
+        self.session.add(4000, "SPEAKER_END", "alice", "Alice", "id-alice")
+        self.session.add(3000, "SPEAKER_START", "bob", "Bob", None)
+
+        active = self.session.overlapping(2000, 5000)
+        self.assertEqual(set(active), {"alice", "bob"})
+        self.assertEqual(active["alice"]["overlap_duration"], 2000)
+        # Bob is still speaking, so his turn lasts until the segment end
+        self.assertEqual(active["bob"]["overlap_duration"], 2000)
+        self.assertEqual(active["alice"]["start_event_ts"], 1000)
+
+        self.assertEqual(self.session.overlapping(0, 900), {})
+        self.assertEqual(set(self.session.overlapping(4500, 6000)), {"bob"})
+
+    def test_long_closed_turn_before_window_is_found(self):
+        self.session.add(0, "SPEAKER_START", "alice", "Alice", None)
+        self.session.add(60000, "SPEAKER_END", "alice", "Alice", None)
+        self.session.add(50000, "SPEAKER_START", "bob", "Bob", None)
+        self.session.add(51000, "SPEAKER_END", "bob", "Bob", None)
+
+        self.assertEqual(set(self.session.overlapping(55000, 56000)), {"alice"})
+
+    def test_latest_turn_per_participant(self):
+        for start, end in ((0, 1000), (2000, 3000)):
+            self.session.add(start, "SPEAKER_START", "alice", "Alice", None)
+            self.session.add(end, "SPEAKER_END", "alice", "Alice", None)
+
+        active = self.session.overlapping(500, 2500)
+        self.assertEqual(active["alice"]["start_event_ts"], 2000)
+        self.assertEqual(active["alice"]["overlap_duration"], 500)
+
+    def test_out_of_order_inserts_match_in_order(self):
+        events = [
+            (1000, "SPEAKER_START", "alice"),
+            (2500, "SPEAKER_START", "bob"),
+            (3000, "SPEAKER_END", "alice"),
+            (4000, "SPEAKER_END", "bob"),
+            (5000, "SPEAKER_START", "alice"),
+        ]
+        in_order = SessionSpeakerIntervals()
+        for ts, event_type, key in events:
+            in_order.add(ts, event_type, key, key.title(), None)
+        for ts, event_type, key in (events[2], events[0], events[4], events[1], events[3]):
+            self.session.add(ts, event_type, key, key.title(), None)
+
+        self.assertEqual(self.session.event_times, sorted(self.session.event_times))
+        self.assertEqual(self.session.events, in_order.events)
+        for window in ((0, 1500), (2000, 3500), (3500, 4500), (4500, 6000)):
+            self.assertEqual(self.session.overlapping(*window), in_order.overlapping(*window))
+
+    def test_duplicate_events_are_ignored(self):
+        self.assertTrue(self.session.add(1000, "SPEAKER_START", "alice", "Alice", None))
+        self.assertFalse(self.session.add(1000, "SPEAKER_START", "alice", "Alice", None))
+        self.assertEqual(len(self.session.events), 1)
+
+
+class TestSpeakerIntervalIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.index = SpeakerIntervalIndex(idle_ttl_s=3600, max_age_s=5)
+
+    def test_map_segment_statuses(self):
+        self.assertEqual(self.index.map_segment("s1", 0, 1000)["status"], STATUS_NO_SPEAKER_EVENTS)
+
+        self.index.add_event("s1", speaker_event("SPEAKER_START", "Alice"), 1000)
+        self.index.add_event("s1", speaker_event("SPEAKER_END", "Alice"), 3000)
+        self.index.add_event("s1", speaker_event("SPEAKER_START", "Bob"), 2500)
+
+        self.assertEqual(self.index.map_segment("s1", 1000, 2000), {"speaker_name": "Alice", "participant_id_meet": "id-Alice", "status": STATUS_MAPPED})
+        self.assertEqual(self.index.map_segment("s1", 1500, 3500)["status"], STATUS_MULTIPLE)
+        self.assertEqual(self.index.map_segment("s1", 0, 500)["status"], STATUS_UNKNOWN)
+
+    async def test_stale_session_is_reloaded_from_redis(self):
+        redis_c = mock.AsyncMock()
+        redis_c.zrange.return_value = [(json.dumps(speaker_event("SPEAKER_START", "Alice")), 1000.0)]
+        session = self.index.get_session("s1")
+        self.assertTrue(session.is_stale(self.index.max_age_s))
+
+        await self.index.hydrate(redis_c, "s1", "speaker_events:s1", session)
+        self.assertFalse(session.is_stale(self.index.max_age_s))
+
+        # An event consumed by another replica only reaches this one through Redis
+        redis_c.zrange.return_value.append((json.dumps(speaker_event("SPEAKER_END", "Alice")), 2000.0))
+        with mock.patch("mapping.speaker_index.time.monotonic", return_value=session.hydrated_at + 6):
+            self.assertTrue(session.is_stale(self.index.max_age_s))
+            await self.index.hydrate(redis_c, "s1", "speaker_events:s1", session)
+        self.assertEqual(len(session.events), 2)
+        self.assertEqual(self.index.map_segment("s1", 2500, 3000)["status"], STATUS_UNKNOWN)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import contextlib
+import json
+import unittest
+from unittest import mock
+
+from lookup_cache import CachedMeeting, CachedUser
+from streaming import processors
+from streaming.consumer import decode_stream_message
+from streaming.processors import process_stream_messages_batch
+
+
+def message(message_id, native_meeting_id="abc", token="token-1", **fields):
+    payload = {"type": "transcription", "token": token, "platform": "google_meet", "meeting_id": native_meeting_id, "uid": "session-1"}
+    payload.update(fields)
+    return message_id, {"payload": json.dumps(payload)}
+
+
+def segments(*items):
+    return [{"start": start, "end": start + 1.0, "text": text} for start, text in items]
+
+
+class FakePipeline:
+    def __init__(self, redis_c):
+        self.redis_c = redis_c
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+        return command
+
+    async def execute(self):
+        self.redis_c.executed.append(self.commands)
+        return [self.redis_c.result] * len(self.commands)
+
+
+class FakeRedis:
+    def __init__(self, result=True):
+        self.result = result
+        self.executed = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+async def fake_build_segments_to_store(message_id, stream_data, internal_meeting_id, redis_c, pending_fingerprints=None, session_start=None):
+    """Stores every segment of the message, keyed by start time like the real function."""
+    stored = {f"{segment['start']:.3f}": json.dumps(segment) for segment in stream_data["segments"]}
+    return stored, {key: hash(value) for key, value in stored.items()}
+
+
+class TestDecodeStreamMessage(unittest.TestCase):
+    def test_decodes_bytes_and_keeps_strings(self):
+        self.assertEqual(
+            decode_stream_message(b"1-0", {b"payload": b'{"a": 1}', "other": "x"}),
+            ("1-0", {"payload": '{"a": 1}', "other": "x"}),
+        )
+        self.assertEqual(decode_stream_message("2-0", {"payload": "{}"}), ("2-0", {"payload": "{}"}))
+
+
+class TestProcessStreamMessagesBatch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.db = mock.AsyncMock()
+        self.lookups = []
+
+        async def get_meeting_for_message(db, token, platform_val, native_meeting_id):
+            self.lookups.append((token, platform_val, native_meeting_id))
+            if token == "bad-token":
+                raise ValueError("Invalid API token")
+            if token == "db-down":
+                raise ConnectionError("database unavailable")
+            if native_meeting_id == "unknown":
+                return CachedUser(id=1), None
+            internal_id = {"abc": 10, "def": 20}[native_meeting_id]
+            return CachedUser(id=1), CachedMeeting(internal_id, 1, platform_val, native_meeting_id)
+
+        @contextlib.asynccontextmanager
+        async def async_session_local():
+            yield self.db
+
+        async def get_session_times(db, internal_meeting_id, session_uid=None):
+            return {}
+
+        for name, replacement in (
+            ("get_meeting_for_message", get_meeting_for_message),
+            ("async_session_local", async_session_local),
+            ("get_session_times", get_session_times),
+            ("build_segments_to_store", fake_build_segments_to_store),
+        ):
+            patcher = mock.patch.object(processors, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(processors, "segment_fingerprints")
+        self.fingerprints = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_batch_is_written_in_one_pipeline_with_one_lookup_per_meeting(self):
+        redis_c = FakeRedis()
+        messages = [
+            message("1-0", segments=segments((0.0, "hello"), (1.0, "wor"))),
+            message("2-0", native_meeting_id="def", segments=segments((0.0, "other meeting"))),
+            # a later version of a segment replaces the earlier one
+            message("3-0", segments=segments((1.0, "world"))),
+            message("4-0", type="session_end"),
+        ]
+
+        ack_ids = await process_stream_messages_batch(messages, redis_c)
+
+        self.assertEqual(sorted(ack_ids), ["1-0", "2-0", "3-0", "4-0"])
+        self.assertEqual(len(self.lookups), 2)
+        self.assertEqual(len(redis_c.executed), 1)
+        commands = redis_c.executed[0]
+        hsets = {args[0]: kwargs["mapping"] for name, args, kwargs in commands if name == "hset"}
+        self.assertEqual(set(hsets), {"meeting:10:segments", "meeting:20:segments"})
+        self.assertEqual(json.loads(hsets["meeting:10:segments"]["1.000"])["text"], "world")
+        self.assertIn(("delete", (f"{processors.REDIS_SPEAKER_EVENT_KEY_PREFIX}:session-1",), {}), commands)
+        self.assertEqual(self.fingerprints.update.call_count, 2)
+
+    async def test_invalid_messages_are_acked_without_writes(self):
+        redis_c = FakeRedis()
+        messages = [
+            ("1-0", {"other": "field"}),
+            ("2-0", {"payload": "{not json"}),
+            message("3-0", token=""),
+            message("4-0", token="bad-token", segments=[]),
+            message("5-0", native_meeting_id="unknown", segments=[]),
+            message("6-0", type="no-such-type"),
+            message("7-0"),  # transcription without segments
+        ]
+
+        ack_ids = await process_stream_messages_batch(messages, redis_c)
+
+        self.assertEqual(sorted(ack_ids), ["1-0", "2-0", "3-0", "4-0", "5-0", "6-0", "7-0"])
+        self.assertEqual(redis_c.executed, [])
+
+    async def test_recoverable_errors_leave_messages_pending(self):
+        messages = [
+            message("1-0", token="db-down", segments=segments((0.0, "hello"))),
+            message("2-0", segments=segments((0.0, "hello"))),
+        ]
+        ack_ids = await process_stream_messages_batch(messages, FakeRedis())
+        self.assertEqual(ack_ids, ["2-0"])
+        self.db.rollback.assert_awaited()
+
+        # a failed pipeline command: nothing is acked and the fingerprints are not advanced
+        self.fingerprints.reset_mock()
+        ack_ids = await process_stream_messages_batch([message("3-0", segments=segments((0.0, "hello")))], FakeRedis(result=None))
+        self.assertEqual(ack_ids, [])
+        self.fingerprints.update.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import time
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from api import endpoints
+from lookup_cache import CachedUser
+from shared_models.schemas import Platform
+from tests.test_transcript_pagination import redis_segment
+
+
+def stream_id(seconds_ago, sequence=0):
+    return f"{int((time.time() - seconds_ago) * 1000)}-{sequence}"
+
+
+class TestGetTranscriptChanges(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis_c = mock.AsyncMock()
+
+    async def test_expired_cursor_needs_full_transcript(self):
+        since = stream_id(endpoints.REDIS_SEGMENT_CHANGES_RETENTION + 60)
+        self.assertIsNone(await endpoints._get_transcript_changes(1, self.redis_c, since))
+        # the feed is not read, its entries for that cursor may already be trimmed
+        self.redis_c.xrange.assert_not_called()
+
+    async def test_returns_latest_version_of_changed_segments(self):
+        since = stream_id(30)
+        self.redis_c.xrange.return_value = [
+            (stream_id(20), {"segments": json.dumps({"1.000": redis_segment("s1", 1.0, "hel"), "3.000": redis_segment("s1", 3.0, "later")})}),
+            (stream_id(10), {"segments": json.dumps({"1.000": redis_segment("s1", 1.0, "hello")})}),
+        ]
+
+        segments, removed, cursor = await endpoints._get_transcript_changes(1, self.redis_c, since)
+
+        self.assertEqual([segment.text for segment in segments], ["hello", "later"])
+        self.assertEqual(removed, [])
+        self.assertEqual(cursor, self.redis_c.xrange.return_value[-1][0])
+        self.redis_c.xrange.assert_awaited_once_with("meeting:1:changes", min=f"({since}", max="+")
+
+    async def test_applies_removals_in_feed_order(self):
+        since = stream_id(30)
+        self.redis_c.xrange.return_value = [
+            (stream_id(25), {"segments": json.dumps({"1.000": redis_segment("s1", 1.0, "uh"), "2.000": redis_segment("s1", 2.0, "hm")})}),
+            # discarded by the db_writer filters
+            (stream_id(20), {"removed": json.dumps(["1.000", "2.000", "4.000"])}),
+            # written again after its removal
+            (stream_id(10), {"segments": json.dumps({"2.000": redis_segment("s1", 2.0, "hmm, right")})}),
+        ]
+
+        segments, removed, _ = await endpoints._get_transcript_changes(1, self.redis_c, since)
+
+        self.assertEqual([segment.text for segment in segments], ["hmm, right"])
+        self.assertEqual(removed, [1.0, 4.0])
+
+    async def test_no_changes_keeps_cursor(self):
+        since = stream_id(30)
+        self.redis_c.xrange.return_value = []
+        self.assertEqual(await endpoints._get_transcript_changes(1, self.redis_c, since), ([], [], since))
+
+    async def test_unreadable_feed_needs_full_transcript(self):
+        self.redis_c.xrange.side_effect = ConnectionError("redis down")
+        self.assertIsNone(await endpoints._get_transcript_changes(1, self.redis_c, stream_id(30)))
+        self.assertIsNone(await endpoints._get_transcript_changes(1, None, stream_id(30)))
+
+
+class TestTranscriptSinceFallback(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        now = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+        meeting = SimpleNamespace(
+            id=1, user_id=1, platform="google_meet", native_meeting_id="abc", constructed_meeting_url=None,
+            status="active", bot_container_id=None, start_time=None, end_time=None, data={}, created_at=now, updated_at=now,
+        )
+        self.db = mock.AsyncMock()
+        self.db.execute.return_value = mock.Mock(scalars=lambda: mock.Mock(first=lambda: meeting))
+        self.redis_c = mock.AsyncMock()
+        self.request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(redis_client=self.redis_c)))
+
+    async def get_transcript(self, since):
+        return await endpoints.get_transcript_by_native_id(
+            Platform.GOOGLE_MEET, "abc", self.request, limit=None, cursor=None, format="json",
+            since=since, current_user=CachedUser(id=1), db=self.db,
+        )
+
+    async def test_expired_cursor_returns_full_transcript(self):
+        full_transcript = mock.AsyncMock(return_value=([], None))
+
+        with mock.patch.object(endpoints, "_get_transcript_page", full_transcript), \
+                mock.patch.object(endpoints, "current_change_cursor", mock.AsyncMock(return_value="5-0")):
+            response = await self.get_transcript(stream_id(endpoints.REDIS_SEGMENT_CHANGES_RETENTION + 60))
+
+        full_transcript.assert_awaited_once()
+        self.assertEqual(response.change_cursor, "5-0")
+        self.assertIsNone(response.removed_start_times)
+
+    async def test_since_response_lists_removed_segments(self):
+        last_id = stream_id(10)
+        self.redis_c.xrange.return_value = [(last_id, {"removed": json.dumps(["1.000"])})]
+
+        response = await self.get_transcript(stream_id(30))
+
+        self.assertEqual(response.segments, [])
+        self.assertEqual(response.removed_start_times, [1.0])
+        self.assertEqual(response.change_cursor, last_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from sqlalchemy.dialects import postgresql
+
+from api import endpoints
+from shared_models.models import Transcription, TranscriptionArchive
+from shared_models.schemas import MeetingResponse
+from shared_models.transcript_archive import ARCHIVE_FORMAT, encode_segments
+
+SESSION_START = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def transcription(session_uid, start, text, session_start=SESSION_START, meeting_id=1):
+    return SimpleNamespace(
+        meeting_id=meeting_id, session_uid=session_uid, start_time=start, end_time=start + 1.0, text=text,
+        language="en", speaker="Alice", created_at=datetime(2025, 1, 1, 13, 0),
+        absolute_start_time=session_start + timedelta(seconds=start),
+        absolute_end_time=session_start + timedelta(seconds=start + 1.0),
+    )
+
+
+def redis_segment(session_uid, start, text, session_start=SESSION_START):
+    return json.dumps({
+        "text": text, "end_time": start + 1.0, "language": "en", "session_uid": session_uid, "speaker": "Alice",
+        "absolute_start_time": (session_start + timedelta(seconds=start)).isoformat(),
+        "absolute_end_time": (session_start + timedelta(seconds=start + 1.0)).isoformat(),
+    })
+
+
+class FakeStream:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def __aiter__(self):
+        for row in self.rows:
+            yield row
+
+    async def close(self):
+        pass
+
+
+class FakeTranscriptDB:
+    """Answers the transcript queries of api.endpoints like PostgreSQL would, from in-memory rows.
+
+    The row query is checked as compiled for PostgreSQL and its cursor condition is read from the
+    bound parameters.
+    """
+
+    def __init__(self, rows, archive=None):
+        self.rows = rows
+        self.archive = archive
+        self.queries = []
+
+    async def execute(self, stmt):
+        assert stmt.column_descriptions[0]["entity"] is TranscriptionArchive
+        return mock.Mock(scalars=lambda: mock.Mock(first=lambda: self.archive))
+
+    async def stream_scalars(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.queries.append(str(compiled))
+        rows = [row for row in self.rows if row.meeting_id == compiled.params["meeting_id_1"]]
+        key = lambda row: (row.absolute_start_time, row.session_uid or "", row.start_time)
+        if "param_1" in compiled.params:
+            after = (compiled.params["param_1"], compiled.params["param_2"], compiled.params["param_3"])
+            rows = [row for row in rows if key(row) > after]
+        return FakeStream(sorted(rows, key=key))
+
+
+class TestTranscriptCursor(unittest.TestCase):
+    def test_round_trip(self):
+        key = (SESSION_START, "session-1", 12.5)
+        cursor = endpoints._encode_transcript_cursor(key)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(endpoints._decode_transcript_cursor(cursor), key)
+
+    def test_invalid_cursor(self):
+        for cursor in ("2025-01-01T12:00:00", "not base64!", endpoints._encode_transcript_cursor((SESSION_START, "s", 1.0))[:-4]):
+            with self.assertRaises(ValueError):
+                endpoints._decode_transcript_cursor(cursor)
+
+
+class TestTranscriptMerge(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Sessions s1 and s2 start at the same time, so their segments share absolute start times
+        self.db = FakeTranscriptDB(
+            rows=[transcription("s1", float(i), f"pg s1 {i}") for i in range(0, 6)]
+            + [transcription("s2", float(i), f"pg s2 {i}") for i in range(0, 6, 2)]
+            + [transcription("s1", 3.0, "other meeting", meeting_id=2)],
+            archive=SimpleNamespace(format=ARCHIVE_FORMAT, data=encode_segments([
+                transcription("s0", 0.5, "archived s0"),
+                transcription("s1", 7.0, "archived s1 7, replaced in redis"),
+            ])),
+        )
+        self.redis_c = mock.AsyncMock()
+        self.redis_c.hgetall.return_value = {
+            # Same session and start key as a PostgreSQL row: the Redis version wins
+            "2.000": redis_segment("s1", 2.0, "redis s1 2"),
+            "7.000": redis_segment("s1", 7.0, "redis s1 7"),
+            "8.000": redis_segment("s2", 8.0, "redis s2 8"),
+        }
+
+    async def all_segments(self):
+        return [segment.text for segment in await endpoints._get_full_transcript_segments(1, self.db, self.redis_c)]
+
+    async def test_merges_postgres_archive_and_redis(self):
+        self.assertEqual(await self.all_segments(), [
+            "pg s1 0", "pg s2 0", "archived s0", "pg s1 1", "redis s1 2", "pg s2 2", "pg s1 3",
+            "pg s1 4", "pg s2 4", "pg s1 5", "redis s1 7", "redis s2 8",
+        ])
+
+    async def test_pages_cover_transcript_without_gaps_or_repeats(self):
+        expected = await self.all_segments()
+        for limit in range(1, len(expected) + 1):
+            texts, cursor = [], None
+            while True:
+                after = endpoints._decode_transcript_cursor(cursor) if cursor else None
+                page, cursor = await endpoints._get_transcript_page(1, self.db, self.redis_c, after, limit)
+                texts += [segment.text for segment in page]
+                self.assertLessEqual(len(page), limit)
+                if cursor is None:
+                    break
+            self.assertEqual(texts, expected, f"limit={limit}")
+
+    async def test_row_query_uses_tie_breaking_order(self):
+        after = (SESSION_START, "s1", 0.0)
+        await endpoints._get_transcript_page(1, self.db, self.redis_c, after, 2)
+        query = self.db.queries[-1]
+        self.assertIn("transcriptions.absolute_start_time >= ", query)
+        self.assertIn('(transcriptions.absolute_start_time, coalesce(transcriptions.session_uid, %(coalesce_1)s) COLLATE "C", transcriptions.start_time) > ', query)
+        self.assertTrue(query.endswith('ORDER BY transcriptions.absolute_start_time, coalesce(transcriptions.session_uid, %(coalesce_1)s) COLLATE "C", transcriptions.start_time'))
+
+    async def test_ndjson_stream_ends_with_next_cursor(self):
+        meeting = MeetingResponse(id=1, user_id=1, platform="google_meet", native_meeting_id="abc", status="active",
+                                  created_at=SESSION_START, updated_at=SESSION_START)
+        session_factory = mock.MagicMock()
+        session_factory.return_value.__aenter__.return_value = self.db
+        with mock.patch.object(endpoints, "async_session_local", session_factory):
+            lines = [line async for line in endpoints._stream_transcript_ndjson(1, meeting, self.redis_c, None, 3)]
+
+        self.assertEqual(json.loads(lines[0])["id"], 1)
+        self.assertEqual([json.loads(line)["text"] for line in lines[1:4]], ["pg s1 0", "pg s2 0", "archived s0"])
+        cursor = json.loads(lines[4])["next_cursor"]
+        self.assertEqual(endpoints._decode_transcript_cursor(cursor), (SESSION_START + timedelta(seconds=0.5), "s0", 0.5))
+        self.assertEqual(len(lines), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -307,19 +307,23 @@ class VexaClient:
         """
         return meeting.get("data", {}).get("languages", [])
 
-    def get_transcript(self, platform: str, native_meeting_id: str) -> Dict[str, Any]:
+    def get_transcript(self, platform: str, native_meeting_id: str, since: Optional[str] = None) -> Dict[str, Any]:
         """
         Retrieves the transcript for a specific meeting using platform and native ID.
 
         Args:
             platform: Platform identifier (e.g., 'google_meet', 'zoom').
             native_meeting_id: The platform-specific meeting identifier.
+            since: Optional 'change_cursor' from a previous response. Only segments created or
+                   changed after it are returned; merge them into the previous ones by 'start',
+                   and drop the previous ones whose start is in 'removed_start_times'.
 
         Returns:
-            Dictionary containing meeting details and transcript segments.
+            Dictionary containing meeting details, transcript segments and the 'change_cursor' for the next poll.
         """
         path = f"/transcripts/{platform}/{native_meeting_id}"
-        return self._request("GET", path, api_type='user')
+        params = {"since": since} if since else None
+        return self._request("GET", path, api_type='user', params=params)
 
     def update_meeting_data(self, 
                            platform: str, 